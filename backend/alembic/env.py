@@ -20,7 +20,14 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # 모든 모델 import (autogenerate에 필요)
-from app.models import Base, DailyFocus, FocusSession, User  # noqa: E402, F401
+from app.models import (  # noqa: E402, F401
+    Base,
+    DailyFocus,
+    FocusSession,
+    RenderTask,
+    UploadedFile,
+    User,
+)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,50 @@
+"""add render_tasks uploaded_files tables
+
+Revision ID: 3c9a1e7d52b4
+Revises: fbf04bb24f1d
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a1e7d52b4"
+down_revision: str | None = "fbf04bb24f1d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # render_tasks 테이블 (렌더 작업 상태 공유)
+    op.create_table(
+        "render_tasks",
+        sa.Column("task_id", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("task_id", name=op.f("pk_render_tasks")),
+    )
+    op.create_index(op.f("ix_render_tasks_status"), "render_tasks", ["status"])
+
+    # uploaded_files 테이블 (업로드 메타데이터 공유)
+    op.create_table(
+        "uploaded_files",
+        sa.Column("file_id", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("file_id", name=op.f("pk_uploaded_files")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("uploaded_files")
+    op.drop_index(op.f("ix_render_tasks_status"), table_name="render_tasks")
+    op.drop_table("render_tasks")
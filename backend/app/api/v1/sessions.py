@@ -7,14 +7,28 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1 import timelapse
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_own_session
 from app.models.daily_focus import DailyFocus
 from app.models.session import FocusSession
 from app.models.user import User
-from app.schemas.session import SessionCreateRequest, SessionResponse, SessionUpdateRequest
+from app.schemas.session import (
+    SessionCreateRequest,
+    SessionFramesRequest,
+    SessionFramesResponse,
+    SessionResponse,
+    SessionUpdateRequest,
+)
+from app.services.render_queue import QueueFullError, render_lane
+from app.services.session_encoder import (
+    FrameOffsetMismatchError,
+    SessionClosedError,
+    SessionEncoder,
+)
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
+session_encoder = SessionEncoder(timelapse.timelapse_service)
 
 VALID_OUTPUT_SECONDS = {15, 30, 45, 60, 90, 120}
 VALID_ASPECT_RATIOS = {"9:16", "16:9", "1:1", "4:3"}
@@ -89,16 +103,13 @@ async def update_session(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
-    """세션 정보를 업데이트한다 (종료 시)."""
-    stmt = select(FocusSession).where(
-        FocusSession.id == uuid.UUID(session_id),
-        FocusSession.user_id == current_user.id,
-    )
-    result = await db.execute(stmt)
-    session = result.scalar_one_or_none()
+    """세션 정보를 업데이트한다 (종료 시).
 
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    녹화 중 받은 프레임이 있으면 종료할 때 최종 렌더를 시작한다. 대기열이 가득 차 429를 받으면
+    세션 종료는 이미 저장된 상태이므로 같은 요청을 다시 보내 렌더만 다시 시도한다.
+    """
+    session = await get_own_session(db, session_id, current_user)
+    was_recording = session.status == "recording"
 
     if request.duration is not None and request.duration < 0:
         raise HTTPException(status_code=422, detail="duration must be non-negative")
@@ -120,11 +131,27 @@ async def update_session(
     if request.task_id is not None:
         session.task_id = request.task_id
 
-    # 세션 완료 시 daily_focus 업데이트 & 유저 총 포커스 시간 갱신
-    if request.status == "completed" and session.duration:
+    # 세션 완료 시 daily_focus 업데이트 & 유저 총 포커스 시간 갱신 (녹화 → 완료일 때 한 번)
+    if request.status == "completed" and was_recording and session.duration:
         await _update_daily_focus(db, current_user, session.duration)
         current_user.total_focus_time += session.duration
 
+    # 녹화 중 받은 프레임이 있으면 미리 인코딩한 세그먼트를 이어 붙여 최종 영상 생성.
+    # 렌더를 시작하기 전에 세션 종료를 커밋한다 — 렌더 뒤에 커밋이 실패하면 어느 세션도
+    # 가리키지 않는 렌더가 남는다. task_id가 비어 있으면(이전 시도가 429) 다시 시도한다.
+    if request.status == "completed" and (was_recording or not session.task_id):
+        await db.commit()
+        try:
+            task_id = await session_encoder.finalize(
+                str(session.id), session.output_seconds, session.duration or 0,
+                lane=render_lane(current_user.subscription_status),
+                owner_id=str(current_user.id),
+            )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e)) from e
+        if task_id:
+            session.task_id = task_id
+
     await db.flush()
 
     return {
@@ -146,6 +173,67 @@ async def update_session(
     }
 
 
+@router.post(
+    "/{session_id}/frames",
+    summary="세션 프레임 추가",
+    response_model=dict,
+)
+async def append_session_frames(
+    session_id: str,
+    request: SessionFramesRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """녹화 중인 세션에 업로드한 사진(fileId)을 붙인다.
+
+    세그먼트 분량(session_segment_frames)이 찰 때마다 백그라운드에서 미리 인코딩하므로,
+    세션 종료(PUT status=completed) 시에는 남은 사진만 인코딩해 이어 붙인다.
+    """
+    session = await get_own_session(db, session_id, current_user)
+    if session.status != "recording":
+        raise HTTPException(status_code=409, detail="Session is not recording")
+    if not request.file_ids:
+        raise HTTPException(status_code=400, detail="file_ids must not be empty")
+
+    try:
+        result = await session_encoder.append_frames(
+            str(session.id),
+            session.aspect_ratio,
+            session.overlay_style,
+            request.file_ids,
+            offset=request.offset,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except SessionClosedError as e:
+        raise HTTPException(status_code=409, detail="Session is already finalized") from e
+    except FrameOffsetMismatchError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    return {"success": True, "data": SessionFramesResponse(**result).model_dump()}
+
+
+@router.get(
+    "/{session_id}/frames",
+    summary="세션 프레임 현황",
+    response_model=dict,
+)
+async def get_session_frames(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """받은 프레임 수와 미리 인코딩된 세그먼트 수를 조회한다 (재전송 offset 확인용)."""
+    session = await get_own_session(db, session_id, current_user)
+    result = await session_encoder.status(str(session.id)) or {
+        "frames": 0,
+        "segments": 0,
+        "segments_done": 0,
+        "incremental": SessionEncoder.incremental(session.overlay_style),
+    }
+    return {"success": True, "data": SessionFramesResponse(**result).model_dump()}
+
+
 @router.get(
     "",
     summary="내 세션 목록",
@@ -1,22 +1,42 @@
 from __future__ import annotations
 
 import os
-import uuid
+import re
 
-from fastapi import APIRouter, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.database import get_db
+from app.dependencies import get_optional_user, get_own_session
+from app.models.user import User
+from app.responses import AccelRedirectResponse, ImmutableFileResponse
 from app.schemas.timelapse import (
+    PhotoUploadResult,
     TimelapseCreateResponse,
     TimelapseFromPhotosRequest,
+    TimelapseOutput,
     TimelapseStatusResponse,
     UploadPhotosResponse,
 )
-from app.services.timelapse_service import TimelapseService
+from app.services.multipart_stream import MissingFileError, MultipartFileStream
+from app.services.render_queue import QueueFullError, render_lane
+from app.services.signed_url import media_uri, signed_media_url
+from app.services.timelapse_service import RenderNotOwnedError, TimelapseService
 from app.services.upload_service import UploadService
 
 router = APIRouter()
+VALID_RATIOS = ("9:16", "1:1", "4:5", "16:9")
+# 부가 출력 종류 → (Content-Type, 다운로드 파일명)
+SIDE_OUTPUT_TYPES = {
+    "poster": ("image/jpeg", "poster.jpg"),
+    "preview": ("video/mp4", "preview.mp4"),
+    "sprite": ("image/jpeg", "sprite.jpg"),
+    "thumbnails": ("text/vtt", "thumbnails.vtt"),
+}
+# HLS 출력 디렉토리에서 내보낼 수 있는 파일 (플레이리스트, 초기화 조각, 미디어 조각)
+STREAM_FILE_RE = re.compile(r"^(index\.m3u8|init\.mp4|seg_\d{5}\.m4s)$")
 upload_service = UploadService()
 timelapse_service = TimelapseService(upload_service)
 
@@ -27,12 +47,23 @@ timelapse_service = TimelapseService(upload_service)
     response_model=TimelapseCreateResponse,
     status_code=202,
 )
-async def create_timelapse(request: dict) -> TimelapseCreateResponse:
-    """업로드된 영상을 타임랩스로 변환하는 작업을 시작한다."""
+async def create_timelapse(
+    request: dict,
+    current_user: User | None = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db),
+) -> TimelapseCreateResponse:
+    """업로드된 영상을 타임랩스로 변환하는 작업을 시작한다.
+
+    로그인한 유료 / 체험 구독자의 작업은 대기열의 priority 레인으로 들어간다.
+    sessionId(본인 세션)를 보내면 같은 세션에서 진행 중이던 이전 렌더는 취소된다.
+    """
     file_id = request.get("fileId")
     output_seconds = request.get("outputSeconds")
     recording_seconds = request.get("recordingSeconds")
     aspect_ratio = request.get("aspectRatio", "9:16")
+    aspect_ratios = request.get("aspectRatios")
+    stream = bool(request.get("stream", False))
+    session_id = request.get("sessionId")
 
     if not file_id or output_seconds not in (15, 30, 45, 60, 90, 120):
         raise HTTPException(
@@ -44,20 +75,78 @@ async def create_timelapse(request: dict) -> TimelapseCreateResponse:
         raise HTTPException(status_code=400, detail="Invalid request: recordingSeconds is required")
     # recordingSeconds=0은 허용 (프론트 타이머 버그 대응, ffprobe로 보정)
 
-    valid_ratios = ("9:16", "1:1", "4:5", "16:9")
-    if aspect_ratio not in valid_ratios:
+    if aspect_ratio not in VALID_RATIOS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid aspectRatio: must be one of {valid_ratios}",
+            detail=f"Invalid aspectRatio: must be one of {VALID_RATIOS}",
         )
 
+    # aspectRatios: 여러 비율을 한 번의 디코딩으로 함께 출력 (중복은 한 번만)
+    if aspect_ratios is not None:
+        if (
+            not isinstance(aspect_ratios, list)
+            or not aspect_ratios
+            or any(ratio not in VALID_RATIOS for ratio in aspect_ratios)
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid aspectRatios: must be a non-empty list of {VALID_RATIOS}",
+            )
+        aspect_ratios = list(dict.fromkeys(aspect_ratios))
+
+    await _check_session_owner(db, session_id, current_user)
+    lane = render_lane(current_user.subscription_status if current_user else None)
+    owner_id = _owner_id(current_user)
     try:
-        task_id = await timelapse_service.create_task(
-            file_id, output_seconds, recording_seconds, aspect_ratio,
-        )
+        if aspect_ratios and len(aspect_ratios) > 1:
+            task_id = await timelapse_service.create_multi_task(
+                file_id, output_seconds, recording_seconds, aspect_ratios, stream=stream,
+                lane=lane, session_id=session_id, owner_id=owner_id,
+            )
+        else:
+            task_id = await timelapse_service.create_task(
+                file_id, output_seconds, recording_seconds,
+                aspect_ratios[0] if aspect_ratios else aspect_ratio,
+                stream=stream, lane=lane, session_id=session_id, owner_id=owner_id,
+            )
         return TimelapseCreateResponse(taskId=task_id)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail="File not found") from e
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+
+def _owner_id(user: User | None) -> str | None:
+    return str(user.id) if user else None
+
+
+async def _check_session_owner(
+    db: AsyncSession, session_id: str | None, user: User | None,
+) -> None:
+    """sessionId는 요청한 유저의 세션만 (다른 유저의 렌더를 대체로 취소하지 못하게). 아니면 404."""
+    if session_id is None:
+        return
+    if user is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await get_own_session(db, session_id, user)
+
+
+@router.get(
+    "/render/cache",
+    summary="렌더 캐시 통계",
+)
+async def get_render_cache_stats() -> dict:
+    """렌더 캐시 히트/미스 카운터와 현재 용량을 반환한다."""
+    return await timelapse_service.cache_stats()
+
+
+@router.get(
+    "/render/resources",
+    summary="렌더 자원 배분 현황",
+)
+async def get_render_resources() -> dict:
+    """코어 예산, 실행 중인 FFmpeg 작업별 스레드 배분, 대기열 상태를 반환한다."""
+    return timelapse_service.resource_stats()
 
 
 @router.get(
@@ -67,40 +156,191 @@ async def create_timelapse(request: dict) -> TimelapseCreateResponse:
 )
 async def get_timelapse_status(task_id: str) -> TimelapseStatusResponse:
     """변환 작업의 진행 상태를 조회한다."""
-    task = timelapse_service.get_task(task_id)
+    task = await timelapse_service.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    download_url = f"/api/download/{task_id}" if task["status"] == "completed" else None
+    completed = task["status"] == "completed"
+    download_url = download_expires_at = None
+    if completed:
+        download_url, download_expires_at = _download_url(task_id, task["output_path"])
+    side_urls: dict[str, str | None] = {}
+    for kind in SIDE_OUTPUT_TYPES:
+        path = timelapse_service.side_output(task, kind)
+        side_urls[kind] = None
+        if path:
+            # 색인(VTT)은 스프라이트를 상대 경로로 가리키므로 항상 같은 /api/download 아래로 준다
+            side_urls[kind] = (
+                signed_media_url(path)[0]
+                if settings.download_delivery == "signed" and kind != "thumbnails"
+                else f"/api/download/{task_id}/{kind}"
+            )
+    stream_url = None
+    if timelapse_service.stream_playlist(task):
+        stream_url = f"/api/stream/{task_id}/index.m3u8"
+    outputs = None
+    if task.get("outputs"):
+        outputs = [
+            TimelapseOutput(
+                aspectRatio=output["aspect_ratio"],
+                downloadUrl=(
+                    _download_url(task_id, output["output_path"], output["aspect_ratio"])[0]
+                    if completed else None
+                ),
+            )
+            for output in task["outputs"]
+        ]
 
     return TimelapseStatusResponse(
         taskId=task["task_id"],
         status=task["status"],
         progress=task["progress"],
+        queuePosition=timelapse_service.get_queue_position(task_id),
+        speed=task.get("speed"),
+        etaSeconds=task.get("eta_seconds"),
         outputSeconds=task.get("output_seconds"),
         downloadUrl=download_url,
+        downloadExpiresAt=download_expires_at,
+        posterUrl=side_urls["poster"],
+        previewUrl=side_urls["preview"],
+        spriteUrl=side_urls["sprite"],
+        thumbnailsUrl=side_urls["thumbnails"],
+        streamUrl=stream_url,
+        outputs=outputs,
     )
 
 
-@router.get(
+@router.delete(
+    "/timelapse/{task_id}",
+    summary="변환 취소",
+    status_code=204,
+)
+async def cancel_timelapse(
+    task_id: str, current_user: User | None = Depends(get_optional_user),
+) -> Response:
+    """대기 중이거나 진행 중인 변환을 취소한다 (FFmpeg 종료, 부분 출력 삭제).
+
+    작업을 만든 유저만 취소할 수 있다 (비로그인으로 만든 작업은 비로그인 요청으로).
+    다른 유저의 작업은 없는 작업처럼 404.
+    """
+    task = await timelapse_service.get_task(task_id)
+    if not task or task.get("owner_id") != _owner_id(current_user):
+        raise HTTPException(status_code=404, detail="Task not found")
+    try:
+        task = await timelapse_service.cancel_task(task_id)
+    except RenderNotOwnedError as e:
+        raise HTTPException(status_code=409, detail="Task is running on another worker") from e
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Task is already {task['status']}")
+    return Response(status_code=204)
+
+
+def _download_url(
+    task_id: str, output_path: str, aspect_ratio: str | None = None,
+) -> tuple[str, int | None]:
+    """완성본 URL과 만료 시각. signed 모드면 정적 서버가 바로 내보낼 서명 URL."""
+    if settings.download_delivery == "signed":
+        return signed_media_url(output_path)
+    url = f"/api/download/{task_id}"
+    if aspect_ratio:
+        url += f"?aspectRatio={aspect_ratio}"
+    return url, None
+
+
+@router.api_route(
     "/download/{task_id}",
+    methods=["GET", "HEAD"],
     summary="타임랩스 다운로드",
 )
-async def download_timelapse(task_id: str) -> FileResponse:
-    """완성된 타임랩스 영상을 다운로드한다."""
-    task = timelapse_service.get_task(task_id)
+async def download_timelapse(
+    task_id: str, aspect_ratio: str | None = Query(None, alias="aspectRatio"),
+) -> Response:
+    """완성된 타임랩스 영상을 다운로드한다. 여러 비율 작업은 aspectRatio로 출력을 고른다.
+
+    Range(206) / If-Range / If-None-Match(304)를 지원하고, 출력 내용 해시를 ETag로 쓴다.
+    accel 모드면 본문 대신 X-Accel-Redirect로 프록시가 파일을 보내게 한다.
+    """
+    task = await timelapse_service.get_task(task_id)
     if not task or task["status"] != "completed":
         raise HTTPException(status_code=404, detail="File not found or not ready")
 
     output_path = task["output_path"]
+    if aspect_ratio is not None:
+        outputs = task.get("outputs") or [task]
+        output_path = next(
+            (o["output_path"] for o in outputs if o.get("aspect_ratio") == aspect_ratio), None,
+        )
+        if output_path is None:
+            raise HTTPException(status_code=404, detail="No output for this aspectRatio")
     if not os.path.exists(output_path):
         raise HTTPException(status_code=404, detail="Output file not found")
 
-    return FileResponse(
-        path=output_path,
-        media_type="video/mp4",
-        filename="timelapse.mp4",
+    filename = (
+        f"timelapse_{aspect_ratio.replace(':', 'x')}.mp4" if aspect_ratio else "timelapse.mp4"
     )
+    return await _output_file_response(task, output_path, "video/mp4", filename)
+
+
+@router.api_route(
+    "/download/{task_id}/{kind}",
+    methods=["GET", "HEAD"],
+    summary="포스터 / 미리보기 / 스프라이트 다운로드",
+)
+async def download_side_output(task_id: str, kind: str) -> Response:
+    """완성된 작업의 부가 출력: poster (JPEG), preview (mp4 루프),
+    sprite (스크러빙 타일 격자 JPEG), thumbnails (sprite 타일 색인 WebVTT).
+    """
+    if kind not in SIDE_OUTPUT_TYPES:
+        raise HTTPException(status_code=404, detail="Unknown output kind")
+    task = await timelapse_service.get_task(task_id)
+    path = timelapse_service.side_output(task, kind) if task else None
+    if not path:
+        raise HTTPException(status_code=404, detail="File not found or not ready")
+
+    media_type, filename = SIDE_OUTPUT_TYPES[kind]
+    return await _output_file_response(task, path, media_type, filename)
+
+
+async def _output_file_response(
+    task: dict, path: str, media_type: str, filename: str,
+) -> Response:
+    """완성된 출력 파일 응답 (내용 해시 ETag, 전송 방식은 download_delivery)."""
+    content_hash = await timelapse_service.output_hash(task, path)
+    if settings.download_delivery == "accel":
+        return AccelRedirectResponse(
+            media_uri(path, settings.accel_redirect_prefix),
+            content_hash,
+            media_type=media_type,
+            filename=filename,
+        )
+    return ImmutableFileResponse(path, content_hash, media_type=media_type, filename=filename)
+
+
+@router.get(
+    "/stream/{task_id}/{filename}",
+    summary="렌더 중 스트리밍 (HLS)",
+)
+async def stream_timelapse(task_id: str, filename: str) -> FileResponse:
+    """stream 작업의 HLS 플레이리스트/조각을 내보낸다. 렌더 중에도 이미 나온 조각은 받을 수 있다."""
+    if not STREAM_FILE_RE.match(filename):
+        raise HTTPException(status_code=404, detail="File not found")
+    task = await timelapse_service.get_task(task_id)
+    if not task or not timelapse_service.stream_playlist(task):
+        raise HTTPException(status_code=404, detail="Stream not found or not started")
+
+    path = os.path.join(timelapse_service.stream_dir(task_id), filename)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if filename.endswith(".m3u8"):
+        # 렌더 중에는 조각이 계속 추가되므로 매번 다시 받게 한다
+        return FileResponse(
+            path, media_type="application/vnd.apple.mpegurl",
+            headers={"Cache-Control": "no-cache"},
+        )
+    return FileResponse(path, media_type="video/mp4")
 
 
 @router.post(
@@ -108,27 +348,50 @@ async def download_timelapse(task_id: str) -> FileResponse:
     summary="사진 배열 업로드",
     response_model=UploadPhotosResponse,
     status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "files": {
+                                "type": "array",
+                                "items": {"type": "string", "format": "binary"},
+                            },
+                        },
+                        "required": ["files"],
+                    },
+                },
+            },
+        },
+    },
 )
-async def upload_photos(files: list[UploadFile]) -> UploadPhotosResponse:
-    """여러 장의 JPEG 사진을 업로드하고 fileId 목록을 반환한다."""
-    if not files:
-        raise HTTPException(status_code=400, detail="No files provided")
-
-    os.makedirs(settings.upload_dir, exist_ok=True)
-    file_ids: list[str] = []
-
-    for file in files:
-        file_id = str(uuid.uuid4())
-        file_path = os.path.join(settings.upload_dir, f"{file_id}.jpg")
-
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        upload_service.store_photo(file_id, file_path)
-        file_ids.append(file_id)
+async def upload_photos(request: Request) -> UploadPhotosResponse:
+    """여러 장의 JPEG 사진을 업로드하고 fileId 목록과 파일별 결과를 반환한다.
 
-    return UploadPhotosResponse(fileIds=file_ids, count=len(file_ids))
+    form 필드 `files`를 반복해서 보낸다. 잘못된 사진은 results에서 error로 표시되고
+    나머지는 정상 등록된다. 임시 파일에 받아 두지 않고 받는 대로 저장 위치에 기록한다.
+    """
+    try:
+        photos = await MultipartFileStream.open(
+            request.headers.get("content-type"), request.stream(), field_name="files",
+        )
+    except MissingFileError as e:
+        raise HTTPException(status_code=400, detail="No files provided") from e
+    try:
+        results = await upload_service.upload_photos(photos)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    file_ids = [r["fileId"] for r in results if r["fileId"]]
+    return UploadPhotosResponse(
+        fileIds=file_ids,
+        count=len(file_ids),
+        failed=len(results) - len(file_ids),
+        results=[PhotoUploadResult(**r) for r in results],
+    )
 
 
 @router.post(
@@ -139,10 +402,16 @@ async def upload_photos(files: list[UploadFile]) -> UploadPhotosResponse:
 )
 async def create_timelapse_from_photos(
     request: TimelapseFromPhotosRequest,
+    current_user: User | None = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db),
 ) -> TimelapseCreateResponse:
-    """저장된 사진 ID 배열을 타임랩스 영상으로 변환하는 작업을 시작한다."""
+    """저장된 사진 ID 배열을 타임랩스 영상으로 변환하는 작업을 시작한다.
+
+    sessionId(본인 세션)를 보내면 같은 세션에서 진행 중이던 이전 렌더는 취소된다.
+    """
     if not request.fileIds:
         raise HTTPException(status_code=400, detail="fileIds must not be empty")
+    await _check_session_owner(db, request.sessionId, current_user)
 
     try:
         task_id = await timelapse_service.create_task_from_photos(
@@ -155,10 +424,15 @@ async def create_timelapse_from_photos(
             study_minutes=request.studyMinutes,
             recording_seconds=request.recordingSeconds,
             timer_mode=request.timerMode,
+            lane=render_lane(current_user.subscription_status if current_user else None),
+            session_id=request.sessionId,
+            owner_id=_owner_id(current_user),
         )
         return TimelapseCreateResponse(taskId=task_id)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
 
 
 @router.post(
@@ -168,15 +442,14 @@ async def create_timelapse_from_photos(
 )
 async def save_timelapse_meta(task_id: str, request: dict) -> dict:
     """프론트에서 오버레이 합성 후 테마 메타데이터를 기록한다."""
-    task = timelapse_service.get_task(task_id)
+    task = await timelapse_service.get_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # 메타데이터 저장 (현재 in-memory, 추후 DB)
+    # 메타데이터 저장 (작업 레지스트리에 병합)
     overlay = request.get("overlay", {})
     composited = request.get("composited", False)
 
-    task["overlay"] = overlay
-    task["composited"] = composited
+    await timelapse_service.update_task(task_id, overlay=overlay, composited=composited)
 
     return {"success": True}
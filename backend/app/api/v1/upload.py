@@ -1,23 +1,178 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi import APIRouter, Header, HTTPException, Request, Response
 
-from app.schemas.upload import UploadResponse
-from app.services.upload_service import UploadService
+from app.schemas.upload import (
+    ResumableUploadCreateRequest,
+    ResumableUploadStatusResponse,
+    UploadResponse,
+)
+from app.services.multipart_stream import MissingFileError, MultipartFileStream
+from app.services.resumable_upload_service import (
+    ResumableUploadService,
+    UploadBusyError,
+    UploadNotFoundError,
+    UploadOffsetMismatchError,
+)
+from app.services.upload_service import UploadService, UploadTooLargeError
 
 router = APIRouter()
 upload_service = UploadService()
+resumable_upload_service = ResumableUploadService(upload_service)
 
 
 @router.post(
     "/upload",
     summary="영상 파일 업로드",
     response_model=UploadResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    },
+                },
+            },
+        },
+    },
 )
-async def upload_file(file: UploadFile) -> UploadResponse:
-    """녹화된 영상 파일을 서버에 업로드한다."""
+async def upload_file(request: Request) -> UploadResponse:
+    """녹화된 영상 파일을 서버에 업로드한다.
+
+    form 필드 `file`을 임시 파일에 받아 두지 않고 받는 대로 저장 위치에 기록한다.
+    """
     try:
+        file = await MultipartFileStream.open(
+            request.headers.get("content-type"), request.stream(),
+        )
         result = await upload_service.upload(file)
         return UploadResponse(**result)
+    except MissingFileError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+
+
+# ── 이어 올리기 (resumable) ──
+
+
+@router.post(
+    "/uploads",
+    summary="이어 올리기 업로드 생성",
+    response_model=ResumableUploadStatusResponse,
+    status_code=201,
+)
+async def create_resumable_upload(
+    body: ResumableUploadCreateRequest,
+) -> ResumableUploadStatusResponse:
+    """전체 크기를 선언하고 uploadId를 받는다. 이후 PATCH로 청크를 보낸다."""
+    try:
+        result = await resumable_upload_service.create(body.filename, body.size, body.mimeType)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    return ResumableUploadStatusResponse(**result)
+
+
+@router.get(
+    "/uploads/{upload_id}",
+    summary="이어 올리기 상태 조회",
+    response_model=ResumableUploadStatusResponse,
+)
+async def get_resumable_upload(upload_id: str) -> ResumableUploadStatusResponse:
+    """서버에 기록된 오프셋을 조회한다 (끊긴 뒤 재개 지점)."""
+    try:
+        result = await resumable_upload_service.status(upload_id)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload not found") from e
+    return ResumableUploadStatusResponse(**result)
+
+
+@router.head("/uploads/{upload_id}", summary="이어 올리기 오프셋 조회")
+async def head_resumable_upload(upload_id: str) -> Response:
+    """오프셋을 Upload-Offset 헤더로만 돌려준다."""
+    try:
+        result = await resumable_upload_service.status(upload_id)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload not found") from e
+    return Response(
+        headers={
+            "Upload-Offset": str(result["offset"]),
+            "Upload-Length": str(result["size"]),
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.patch(
+    "/uploads/{upload_id}",
+    summary="청크 전송",
+    response_model=ResumableUploadStatusResponse,
+)
+async def patch_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+) -> ResumableUploadStatusResponse:
+    """요청 본문(application/octet-stream)을 Upload-Offset 위치에 이어 쓴다.
+
+    오프셋이 서버와 다르면 409 — GET/HEAD로 오프셋을 다시 받아 그 지점부터 보낸다.
+    """
+    try:
+        result = await resumable_upload_service.append(upload_id, upload_offset, request.stream())
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload not found") from e
+    except UploadBusyError as e:
+        raise HTTPException(status_code=409, detail="Upload is being written") from e
+    except UploadOffsetMismatchError as e:
+        raise HTTPException(
+            status_code=409, detail=str(e), headers={"Upload-Offset": str(e.expected)},
+        ) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    return ResumableUploadStatusResponse(**result)
+
+
+@router.post(
+    "/uploads/{upload_id}/complete",
+    summary="이어 올리기 완료",
+    response_model=UploadResponse,
+)
+async def complete_resumable_upload(upload_id: str) -> UploadResponse:
+    """모든 청크가 도착한 업로드를 확정하고 /api/timelapse에 쓸 fileId를 발급한다."""
+    try:
+        result = await resumable_upload_service.complete(upload_id)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload not found") from e
+    except UploadBusyError as e:
+        raise HTTPException(status_code=409, detail="Upload is being written") from e
+    except UploadOffsetMismatchError as e:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {e.received}/{e.expected} bytes",
+            headers={"Upload-Offset": str(e.received)},
+        ) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return UploadResponse(**result)
+
+
+@router.delete("/uploads/{upload_id}", summary="이어 올리기 취소", status_code=204)
+async def abort_resumable_upload(upload_id: str) -> Response:
+    """진행 중인 업로드와 받은 청크를 지운다."""
+    try:
+        await resumable_upload_service.abort(upload_id)
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail="Upload not found") from e
+    except UploadBusyError as e:
+        raise HTTPException(status_code=409, detail="Upload is being written") from e
+    return Response(status_code=204)
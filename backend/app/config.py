@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -16,6 +17,74 @@ class Settings(BaseSettings):
     # Upload
     upload_dir: str = "/code/uploads"
     max_upload_size_mb: int = 2048
+    # 이어 올리기: 이 시간 동안 청크가 없으면 partial 업로드를 정리
+    resumable_upload_ttl_hours: int = 24
+    resumable_chunk_size_mb: int = 8  # 클라이언트 권장 청크 크기
+    # 사진 배치 업로드
+    max_photo_size_mb: int = 20  # 사진 한 장 최대 크기
+    photo_upload_max_files: int = 5000  # 한 요청에 받을 최대 사진 수
+    photo_upload_max_batch_mb: int = 2048  # 한 요청 본문 최대 크기 (form 파싱 전에 거절)
+    photo_upload_concurrency: int = 8  # 동시에 디스크로 옮길 사진 수
+    # 사진 타임랩스 입력: sequence (번호 링크 + image2) | concat (filelist + concat demuxer)
+    photo_input_mode: str = "sequence"
+    # 업로드 시 렌더 크기 파생본 생성 (Pillow 필요: pip install .[images])
+    photo_normalize: bool = False
+    photo_normalize_workers: int = 2  # 파생본 생성 프로세스 수
+    # 정적 오버레이(워터마크, 스트릭, 진행 바)를 미리 그린 PNG 자산(upload_dir/overlay_cache)으로
+    # 합성 (Pillow 필요, 끄거나 없으면 drawtext / drawbox)
+    overlay_prerender: bool = True
+
+    # Registry: memory (단일 프로세스) | postgres (여러 워커/호스트 공유)
+    registry_backend: str = "memory"
+
+    # Render queue
+    render_workers: int = 2  # 동시에 실행할 FFmpeg 작업 수
+    render_queue_max: int = 50  # 대기열 최대 길이 (초과 시 429)
+    # 이 시간(초) 넘게 기다린 작업은 레인 / 예상 비용과 무관하게 도착 순으로 먼저 (기아 방지)
+    render_max_wait_seconds: int = 300
+    # 동시 FFmpeg 작업들이 나눠 쓸 코어 예산 (0 = 전체 코어). 작업마다 예산 ÷ 동시 작업 수 스레드
+    render_cores: int = 0
+    render_nice: int = 0  # 렌더 FFmpeg의 nice 값 (0보다 크면 SCHED_BATCH도 적용)
+    # 재시작으로 끊긴 작업은 시작 시 다시 대기열에 넣는다 (upload_dir/render_journal 기록).
+    # 이 횟수를 넘게 끊긴 작업은 실패 처리 (서버를 죽이는 작업의 무한 재시도 방지)
+    render_recovery_max_attempts: int = 2
+    # 종료(SIGTERM) 시 실행 중인 렌더가 끝나기를 기다리는 최대 시간 (초). 넘기면 다음 프로세스로
+    # 넘긴다. 컨테이너의 종료 유예(docker compose stop_grace_period)보다 짧아야 한다
+    shutdown_grace_seconds: int = 60
+
+    # Sparse sampling: auto (pick_every 기준 자동) | keyframe (항상) | off (항상 전체 디코딩)
+    sparse_sampling: str = "auto"
+    sparse_min_pick_every: int = 20
+    # 키프레임 간격 허용치 (샘플 간격 대비 배수). 1.0 = 출력 프레임마다 다른 원본 프레임 보장,
+    # 높이면 더 자주 keyframe 모드를 쓰지만 같은 프레임이 반복될 수 있다
+    sparse_keyframe_tolerance: float = 1.0
+
+    # Split encoding: auto (코어/길이에 따라 자동) | off (항상 한 프로세스)
+    split_encode: str = "auto"
+    split_min_segment_seconds: int = 300  # 조각 하나가 맡을 최소 원본 길이 (초)
+    split_max_parts: int = 16
+
+    # Streaming output (upload_dir/streams): 렌더 중 HLS(fMP4) 조각 길이 (초)
+    stream_segment_seconds: int = 2
+
+    # 다운로드 전송: api (앱이 직접 전송) | signed (서명 URL → 정적 서버가 검증·전송)
+    #             | accel (/api/download가 X-Accel-Redirect로 리버스 프록시에 넘김)
+    download_delivery: str = "api"
+    media_url_prefix: str = "/media"  # signed: 정적 서버가 upload_dir을 내보내는 경로
+    media_url_secret: str = ""  # signed: 정적 서버와 공유하는 서명 키 (signed면 필수)
+    media_url_ttl_seconds: int = 3600
+    accel_redirect_prefix: str = "/_media"  # accel: upload_dir을 가리키는 internal location
+
+    # Render cache (upload_dir/render_cache) — 완성된 작업 출력과 파일을 공유하므로 한도에 출력 포함
+    render_cache_max_mb: int = 10240
+    render_cache_max_age_hours: int = 168
+
+    # Session incremental encoding (upload_dir/sessions)
+    session_segment_frames: int = 300  # 세그먼트 하나에 넣을 사진 수 (30fps 기준 10초)
+    session_segment_workers: int = 1  # 동시에 인코딩할 세그먼트 수 (프로세스당)
+    session_segment_nice: int = 10  # 백그라운드 세그먼트 인코딩의 nice 값 (+ SCHED_BATCH)
+    # 다른 워커가 인코딩 중인 세그먼트를 기다리는 최대 시간 (넘으면 죽은 것으로 보고 이어받음)
+    session_segment_lease_seconds: int = 300
 
     # CORS
     cors_origins: str = "*"
@@ -35,5 +104,12 @@ class Settings(BaseSettings):
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
+    @model_validator(mode="after")
+    def check_media_url_secret(self) -> Settings:
+        # 서명 키가 없으면 정적 서버와 서명이 맞지 않으므로 시작 시점에 막는다
+        if self.download_delivery == "signed" and not self.media_url_secret:
+            raise ValueError("MEDIA_URL_SECRET is required when DOWNLOAD_DELIVERY=signed")
+        return self
+
 
 settings = Settings()
@@ -9,7 +9,15 @@ async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_
 
 
 async def get_db() -> AsyncSession:
-    """DB 세션 의존성."""
+    """DB 세션 의존성. 요청이 끝나면 커밋하고, 예외면 롤백한다.
+
+    핸들러가 중간에 db.commit()을 해도 된다 (외부 작업을 시작하기 전에 확정할 때) —
+    이후 변경은 새 트랜잭션으로 이어져 요청 끝에 커밋된다.
+    """
     async with async_session_maker() as session:
-        async with session.begin():
+        try:
             yield session
+        except BaseException:
+            await session.rollback()
+            raise
+        await session.commit()
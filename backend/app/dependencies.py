@@ -10,6 +10,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.models.session import FocusSession
 from app.models.user import User
 from app.services.jwt_service import verify_access_token
 
@@ -46,3 +47,30 @@ async def get_current_user(
         )
 
     return user
+
+
+async def get_optional_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User | None:
+    """토큰이 있으면 get_current_user와 같이 검증하고, 없으면 None (비로그인 요청 허용)."""
+    if not credentials:
+        return None
+    return await get_current_user(credentials, db)
+
+
+async def get_own_session(db: AsyncSession, session_id: str, user: User) -> FocusSession:
+    """user의 세션을 찾는다. 없거나 다른 유저의 세션이면 404 (존재 여부를 드러내지 않음)."""
+    try:
+        sid = uuid.UUID(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail="Session not found") from e
+    stmt = select(FocusSession).where(
+        FocusSession.id == sid,
+        FocusSession.user_id == user.id,
+    )
+    result = await db.execute(stmt)
+    session = result.scalar_one_or_none()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
@@ -1,18 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.v1 import timelapse, upload
 from app.api.v1.router import v1_router
 from app.config import settings
 from app.exceptions import AppError, app_exception_handler
+from app.middleware import UploadSizeLimitMiddleware
+from app.services.photo_normalizer import photo_normalizer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Study Timelapse", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # 재시작(배포)으로 끊긴 렌더를 다시 대기열에 넣고 주인 없는 부분 출력을 정리한다
+    await timelapse.timelapse_service.recover()
+    # 방치된 이어 올리기 업로드 정리 (주기적)
+    upload_cleanup = asyncio.create_task(upload.resumable_upload_service.run_cleanup())
+    yield
+    upload_cleanup.cancel()
+    # 종료: 실행 중인 렌더는 유예 시간까지 마저 하고, 남은 것은 다음 프로세스로 넘긴다
+    await timelapse.timelapse_service.drain(settings.shutdown_grace_seconds)
+    photo_normalizer.shutdown()
+
+
+app = FastAPI(title="Study Timelapse", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +40,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/upload": "max_upload_size_mb",
+        # 사진 배치는 본문을 받기 시작하기 전에 전체 크기로 막는다
+        "/api/upload-photos": "photo_upload_max_batch_mb",
+    },
+)
 
 app.add_exception_handler(AppError, app_exception_handler)
 app.include_router(v1_router, prefix="/api")
@@ -0,0 +1,53 @@
+"""공통 ASGI 미들웨어."""
+
+from __future__ import annotations
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+# multipart 경계/헤더 등 파일 외 오버헤드 허용치
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """업로드 본문이 경로별 한도를 넘으면 413으로 거절한다.
+
+    limits는 경로 → 한도(MB)를 담은 settings 속성 이름 (요청마다 읽는다).
+    선언된 Content-Length가 한도를 넘으면 본문을 받기 전에 응답하고, Content-Length 없이
+    들어오는 요청(chunked)은 받은 바이트가 한도를 넘는 순간 receive에서 413을 올린다.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, str]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        setting = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if setting is None:
+            await self.app(scope, receive, send)
+            return
+        max_mb = getattr(settings, setting)
+        max_bytes = max_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+        detail = f"File too large: max {max_mb}MB"
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > max_bytes:
+                response = JSONResponse(status_code=413, content={"detail": detail})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # 본문 파싱 중에 올라온 HTTPException은 FastAPI가 그대로 응답으로 바꾼다
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
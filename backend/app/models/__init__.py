@@ -1,6 +1,8 @@
 from app.models.base import Base
 from app.models.daily_focus import DailyFocus
+from app.models.render_task import RenderTask
 from app.models.session import FocusSession
+from app.models.uploaded_file import UploadedFile
 from app.models.user import User
 
-__all__ = ["Base", "DailyFocus", "FocusSession", "User"]
+__all__ = ["Base", "DailyFocus", "FocusSession", "RenderTask", "UploadedFile", "User"]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import copy
+from abc import ABC, abstractmethod
+
+from app.config import settings
+
+
+class Registry(ABC):
+    """렌더 작업 / 업로드 파일 메타데이터 저장소.
+
+    API 프로세스 간에 공유되어야 하는 상태는 모두 여기를 거친다.
+    반환되는 dict는 사본이므로 변경 후에는 반드시 save/update로 반영해야 한다.
+    """
+
+    # ── 렌더 작업 ──
+
+    @abstractmethod
+    async def get_task(self, task_id: str) -> dict | None: ...
+
+    @abstractmethod
+    async def save_task(self, task: dict) -> None:
+        """작업 레코드 전체를 저장한다 (upsert)."""
+
+    @abstractmethod
+    async def update_task(self, task_id: str, **fields) -> dict | None:
+        """지정한 필드만 병합 갱신하고 갱신된 레코드를 반환한다."""
+
+    @abstractmethod
+    async def delete_task(self, task_id: str) -> None: ...
+
+    # ── 업로드 파일 ──
+
+    @abstractmethod
+    async def get_file(self, file_id: str) -> dict | None: ...
+
+    @abstractmethod
+    async def get_files(self, file_ids: list[str]) -> dict[str, dict]:
+        """여러 파일을 한 번에 조회한다 (사진 배치용). 없는 ID는 결과에서 빠진다."""
+
+    @abstractmethod
+    async def save_file(self, info: dict) -> None:
+        """파일 메타데이터를 저장한다 (upsert)."""
+
+    async def save_files(self, infos: list[dict]) -> None:
+        """여러 파일 메타데이터를 한 번에 저장한다 (사진 배치용)."""
+        for info in infos:
+            await self.save_file(info)
+
+    @abstractmethod
+    async def delete_file(self, file_id: str) -> None: ...
+
+
+class InMemoryRegistry(Registry):
+    """프로세스 로컬 dict 기반 저장소 (단일 워커 / 테스트용)."""
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, dict] = {}
+        self.files: dict[str, dict] = {}
+
+    async def get_task(self, task_id: str) -> dict | None:
+        task = self.tasks.get(task_id)
+        return copy.deepcopy(task) if task is not None else None
+
+    async def save_task(self, task: dict) -> None:
+        self.tasks[task["task_id"]] = copy.deepcopy(task)
+
+    async def update_task(self, task_id: str, **fields) -> dict | None:
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        task.update(copy.deepcopy(fields))
+        return copy.deepcopy(task)
+
+    async def delete_task(self, task_id: str) -> None:
+        self.tasks.pop(task_id, None)
+
+    async def get_file(self, file_id: str) -> dict | None:
+        info = self.files.get(file_id)
+        return copy.deepcopy(info) if info is not None else None
+
+    async def get_files(self, file_ids: list[str]) -> dict[str, dict]:
+        return {
+            fid: copy.deepcopy(self.files[fid]) for fid in file_ids if fid in self.files
+        }
+
+    async def save_file(self, info: dict) -> None:
+        self.files[info["file_id"]] = copy.deepcopy(info)
+
+    async def delete_file(self, file_id: str) -> None:
+        self.files.pop(file_id, None)
+
+
+_registry: Registry | None = None
+
+
+def get_registry() -> Registry:
+    """설정(registry_backend)에 맞는 전역 저장소를 반환한다."""
+    global _registry
+    if _registry is None:
+        if settings.registry_backend == "postgres":
+            from app.repositories.sql_registry import SqlRegistry
+
+            _registry = SqlRegistry()
+        else:
+            _registry = InMemoryRegistry()
+    return _registry
+
+
+def set_registry(registry: Registry) -> None:
+    """전역 저장소를 교체한다 (테스트용)."""
+    global _registry
+    _registry = registry
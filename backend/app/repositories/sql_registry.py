@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from sqlalchemy import cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
+
+from app.database import async_session_maker
+from app.models.render_task import RenderTask
+from app.models.uploaded_file import UploadedFile
+from app.repositories.registry import Registry
+
+
+class SqlRegistry(Registry):
+    """Postgres 테이블 기반 저장소 (여러 API 프로세스/호스트가 공유).
+
+    app/database.py의 async 엔진을 그대로 사용하고, 호출마다 짧은 트랜잭션으로 처리한다.
+    """
+
+    # ── 렌더 작업 ──
+
+    async def get_task(self, task_id: str) -> dict | None:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(RenderTask.payload).where(RenderTask.task_id == task_id)
+            )
+            return result.scalar_one_or_none()
+
+    async def save_task(self, task: dict) -> None:
+        stmt = insert(RenderTask).values(
+            task_id=task["task_id"], status=task["status"], payload=task,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RenderTask.task_id],
+            set_={
+                "status": stmt.excluded.status,
+                "payload": stmt.excluded.payload,
+                "updated_at": func.now(),
+            },
+        )
+        async with async_session_maker() as session, session.begin():
+            await session.execute(stmt)
+
+    async def update_task(self, task_id: str, **fields) -> dict | None:
+        # payload || fields 로 서버에서 원자적으로 병합 (동시 갱신 시 필드 유실 방지)
+        values: dict = {
+            "payload": RenderTask.payload.op("||")(cast(fields, JSONB)),
+            "updated_at": func.now(),
+        }
+        if "status" in fields:
+            values["status"] = fields["status"]
+        stmt = (
+            update(RenderTask)
+            .where(RenderTask.task_id == task_id)
+            .values(**values)
+            .returning(RenderTask.payload)
+        )
+        async with async_session_maker() as session, session.begin():
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+    async def delete_task(self, task_id: str) -> None:
+        async with async_session_maker() as session, session.begin():
+            await session.execute(delete(RenderTask).where(RenderTask.task_id == task_id))
+
+    # ── 업로드 파일 ──
+
+    async def get_file(self, file_id: str) -> dict | None:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(UploadedFile.payload).where(UploadedFile.file_id == file_id)
+            )
+            return result.scalar_one_or_none()
+
+    async def get_files(self, file_ids: list[str]) -> dict[str, dict]:
+        if not file_ids:
+            return {}
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(UploadedFile.file_id, UploadedFile.payload)
+                .where(UploadedFile.file_id.in_(file_ids))
+            )
+            return {fid: payload for fid, payload in result.all()}
+
+    async def save_file(self, info: dict) -> None:
+        stmt = insert(UploadedFile).values(file_id=info["file_id"], payload=info)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UploadedFile.file_id],
+            set_={"payload": stmt.excluded.payload},
+        )
+        async with async_session_maker() as session, session.begin():
+            await session.execute(stmt)
+
+    async def save_files(self, infos: list[dict]) -> None:
+        # 사진 배치는 수천 건이므로 한 문장/한 트랜잭션으로 넣는다
+        if not infos:
+            return
+        stmt = insert(UploadedFile).values(
+            [{"file_id": info["file_id"], "payload": info} for info in infos]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UploadedFile.file_id],
+            set_={"payload": stmt.excluded.payload},
+        )
+        async with async_session_maker() as session, session.begin():
+            await session.execute(stmt)
+
+    async def delete_file(self, file_id: str) -> None:
+        async with async_session_maker() as session, session.begin():
+            await session.execute(delete(UploadedFile).where(UploadedFile.file_id == file_id))
@@ -41,3 +41,19 @@ class SessionResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class SessionFramesRequest(BaseModel):
+    """세션 프레임 추가 요청 (/api/upload-photos로 올린 사진)."""
+
+    file_ids: list[str]
+    offset: int | None = None  # 클라이언트가 이미 보낸 프레임 수 (재전송 중복 방지)
+
+
+class SessionFramesResponse(BaseModel):
+    """세션 프레임/세그먼트 현황."""
+
+    frames: int
+    segments: int
+    segments_done: int
+    incremental: bool  # False면 종료 후 전체 렌더 (종료 시점 값이 필요한 오버레이)
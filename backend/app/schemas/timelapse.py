@@ -23,24 +23,52 @@ class TimelapseCreateResponse(BaseModel):
     taskId: str
 
 
+class TimelapseOutput(BaseModel):
+    """여러 비율 작업의 비율별 출력."""
+
+    aspectRatio: str
+    downloadUrl: str | None = None
+
+
 class TimelapseStatusResponse(BaseModel):
     """타임랩스 상태 응답."""
 
     taskId: str
-    status: str
+    status: str  # queued | processing | completed | failed | cancelled
     progress: int
+    queuePosition: int | None = None  # queued일 때 대기 순번 (1부터)
+    speed: float | None = None  # 인코딩 속도 (실시간 대비 배수)
+    etaSeconds: int | None = None  # 남은 예상 시간 (초)
     outputSeconds: int | None = None
     downloadUrl: str | None = None
+    downloadExpiresAt: int | None = None  # 서명 URL 만료 시각 (유닉스 초, signed 모드)
+    posterUrl: str | None = None  # 완료 시 포스터 JPEG
+    previewUrl: str | None = None  # 완료 시 저해상도 미리보기 루프 (mp4, 약 3초)
+    spriteUrl: str | None = None  # 완료 시 스크러빙 스프라이트 (타일 격자 JPEG)
+    thumbnailsUrl: str | None = None  # 완료 시 스프라이트 타일 색인 (WebVTT)
+    streamUrl: str | None = None  # stream 작업: 첫 조각이 나온 뒤부터 HLS 플레이리스트
+    outputs: list[TimelapseOutput] | None = None  # aspectRatios 요청일 때만
 
 
 # ── 사진 배열 → 타임랩스 ──
 
 
+class PhotoUploadResult(BaseModel):
+    """사진 한 장의 업로드 결과."""
+
+    index: int  # 요청 내 순서 (0부터)
+    filename: str | None = None
+    fileId: str | None = None  # 실패 시 None
+    error: str | None = None
+
+
 class UploadPhotosResponse(BaseModel):
     """사진 업로드 응답."""
 
-    fileIds: list[str]
+    fileIds: list[str]  # 성공한 사진만, 요청 순서대로
     count: int
+    failed: int = 0
+    results: list[PhotoUploadResult] = []
 
 
 class TimelapseFromPhotosRequest(BaseModel):
@@ -55,6 +83,7 @@ class TimelapseFromPhotosRequest(BaseModel):
     studyMinutes: int = 0       # 공부 목표 시간 (분)
     recordingSeconds: int = 0   # 실제 녹화 시간 (초)
     timerMode: str = "countdown"  # countdown | countup
+    sessionId: str | None = None  # 같은 세션의 이전 렌더를 대체 (취소)
 
     @field_validator("aspectRatio")
     @classmethod
@@ -10,3 +10,24 @@ class UploadResponse(BaseModel):
     filename: str
     totalFrames: int = 0
     duration: float = 0.0
+
+
+# ── 이어 올리기 (resumable) ──
+
+
+class ResumableUploadCreateRequest(BaseModel):
+    """이어 올리기 세션 생성 요청."""
+
+    filename: str
+    size: int  # 전체 파일 크기 (바이트)
+    mimeType: str | None = None
+
+
+class ResumableUploadStatusResponse(BaseModel):
+    """이어 올리기 세션 상태."""
+
+    uploadId: str
+    offset: int  # 서버에 기록된 바이트 수 = 다음 청크의 시작 위치
+    size: int
+    expiresAt: float  # 청크가 더 오지 않으면 정리되는 시각 (epoch 초)
+    chunkSize: int  # 권장 청크 크기 (바이트)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+PROBE_CACHE_SIZE = 512
+KEYFRAME_PROBE_SECONDS = 60  # 키프레임 간격 측정에 읽을 앞부분 길이 (초)
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """컨테이너/스트림 헤더에서 읽은 메타데이터 (디코딩 없음)."""
+
+    duration: float = 0.0
+    frame_count: int = 0  # 헤더의 nb_frames (없으면 0 — webm, fragmented mp4 등)
+    frame_rate: float = 0.0
+    width: int = 0
+    height: int = 0
+    codec: str = ""
+
+    @property
+    def frames_exact(self) -> bool:
+        return self.frame_count > 0
+
+    def estimated_frames(self, fallback_fps: float) -> int:
+        """헤더 프레임 수, 없으면 길이 × 프레임레이트로 추정."""
+        if self.frame_count > 0:
+            return self.frame_count
+        return int(round(self.duration * (self.frame_rate or fallback_fps)))
+
+
+def _file_identity(path: str) -> tuple:
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _parse_rate(value: str | None) -> float:
+    if not value or value in ("N/A", "0/0"):
+        return 0.0
+    num, _, den = value.partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _parse_float(value: str | None) -> float:
+    try:
+        return float(value) if value not in (None, "", "N/A") else 0.0
+    except ValueError:
+        return 0.0
+
+
+class MediaProbe:
+    """미디어 검사 — ffprobe 결과를 파일 식별자(dev, inode, size, mtime) 기준으로 캐시한다.
+
+    - probe(): 컨테이너/스트림 메타데이터만 읽는다 (빠름, 업로드 시 사용)
+    - exact_frame_count(): 패킷을 세어 정확한 프레임 수를 구한다 (디코딩 없음, 필요할 때만)
+    - keyframe_interval(): 앞부분 패킷 헤더로 평균 키프레임 간격을 구한다
+    """
+
+    def __init__(self) -> None:
+        self._info: OrderedDict[tuple, MediaInfo] = OrderedDict()
+        self._frame_counts: OrderedDict[tuple, asyncio.Task] = OrderedDict()
+        self._keyframe_intervals: OrderedDict[tuple, float] = OrderedDict()
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: tuple, value) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > PROBE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    async def _ffprobe(self, *args: str) -> str:
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error", *args,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        out, _ = await proc.communicate()
+        return out.decode(errors="replace")
+
+    async def probe(self, path: str) -> MediaInfo:
+        """헤더 메타데이터. ffprobe 실패 시 빈 MediaInfo (모든 값 0)."""
+        try:
+            key = _file_identity(path)
+        except OSError:
+            return MediaInfo()
+        cached = self._info.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            out = await self._ffprobe(
+                "-select_streams", "v:0",
+                "-show_entries",
+                "stream=nb_frames,duration,avg_frame_rate,r_frame_rate,width,height,codec_name",
+                "-show_entries", "format=duration",
+                "-of", "json",
+                path,
+            )
+            data = json.loads(out)
+        except Exception as e:
+            logger.warning(f"ffprobe failed for {path}: {e}")
+            return MediaInfo()
+
+        stream = (data.get("streams") or [{}])[0]
+        duration = _parse_float(stream.get("duration"))
+        if duration <= 0:
+            duration = _parse_float(data.get("format", {}).get("duration"))
+        nb_frames = stream.get("nb_frames")
+        info = MediaInfo(
+            duration=duration,
+            frame_count=int(nb_frames) if nb_frames and nb_frames.isdigit() else 0,
+            frame_rate=_parse_rate(stream.get("avg_frame_rate"))
+            or _parse_rate(stream.get("r_frame_rate")),
+            width=int(stream.get("width") or 0),
+            height=int(stream.get("height") or 0),
+            codec=stream.get("codec_name", ""),
+        )
+        self._remember(self._info, key, info)
+        return info
+
+    async def exact_frame_count(self, path: str) -> int:
+        """패킷 수로 센 정확한 프레임 수. 같은 파일에 대한 진행 중인 계산이 있으면 합류한다.
+
+        실패 시 0.
+        """
+        try:
+            key = _file_identity(path)
+        except OSError:
+            return 0
+        task = self._frame_counts.get(key)
+        if task is None:
+            task = asyncio.create_task(self._count_packets(path))
+            self._remember(self._frame_counts, key, task)
+        return await asyncio.shield(task)
+
+    async def _count_packets(self, path: str) -> int:
+        # -count_packets는 디먹싱만 한다 (-count_frames와 달리 디코딩 없음)
+        try:
+            out = await self._ffprobe(
+                "-select_streams", "v:0",
+                "-count_packets",
+                "-show_entries", "stream=nb_read_packets",
+                "-of", "csv=p=0",
+                path,
+            )
+            return int(out.strip().split(",")[0])
+        except Exception as e:
+            logger.warning(f"packet count failed for {path}: {e}")
+            return 0
+
+    async def keyframe_interval(self, path: str) -> float:
+        """앞부분 패킷 헤더만 읽어 평균 키프레임 간격(초)을 구한다 (디코딩 없음). 실패 시 0."""
+        try:
+            key = _file_identity(path)
+        except OSError:
+            return 0.0
+        if key in self._keyframe_intervals:
+            return self._keyframe_intervals[key]
+
+        try:
+            out = await self._ffprobe(
+                "-select_streams", "v:0",
+                "-read_intervals", f"%+{KEYFRAME_PROBE_SECONDS}",
+                "-show_entries", "packet=pts_time,flags",
+                "-of", "csv=p=0",
+                path,
+            )
+        except Exception:
+            return 0.0
+
+        keyframes: list[float] = []
+        for line in out.splitlines():
+            pts, _, flags = line.partition(",")
+            if "K" in flags and pts not in ("", "N/A"):
+                keyframes.append(float(pts))
+        interval = 0.0
+        if len(keyframes) >= 2:
+            keyframes.sort()
+            interval = (keyframes[-1] - keyframes[0]) / (len(keyframes) - 1)
+        self._remember(self._keyframe_intervals, key, interval)
+        return interval
+
+
+media_probe = MediaProbe()
@@ -0,0 +1,157 @@
+"""multipart/form-data 본문에서 파일 필드 하나를 받는 대로 꺼내는 스트림.
+
+Starlette의 form 파싱은 파일 전체를 임시 파일에 받아 둔 뒤에 핸들러를 부르므로, 그 뒤에
+저장 위치로 옮기면 같은 내용을 두 번 쓰고 크기 / 시그니처 검사도 본문을 다 받은 뒤에야 된다.
+MultipartFileStream은 네트워크 청크를 받는 대로 파싱해 read()로 넘긴다.
+같은 이름의 파일 필드가 여러 개면 next_file()로 다음 파일로 넘어간다 (사진 배치).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class MissingFileError(ValueError):
+    """본문에 파일 필드가 없음 (multipart가 아니거나 필드 이름이 다름)."""
+
+
+class IncompleteBodyError(ValueError):
+    """파일 부분이 끝나기 전에 본문이 끝남 (전송 중단)."""
+
+
+@dataclass
+class _FilePart:
+    filename: str
+    content_type: str | None
+    buffer: bytearray = field(default_factory=bytearray)
+    done: bool = False
+
+
+class MultipartFileStream:
+    """field_name 파일의 내용만 읽는 UploadFile 호환 스트림 (filename, content_type, read).
+
+    파일 이외의 부분은 버린다. 메모리에는 read(size)가 요청한 만큼 + 네트워크 청크 하나만 둔다
+    (청크 하나에 작은 파일이 여러 개 들어 있으면 그 파일들은 아직 읽지 않은 부분으로 쌓아 둔다).
+    """
+
+    def __init__(self, body: AsyncIterator[bytes], boundary: bytes, field_name: str) -> None:
+        self._body = body
+        self._field_name = field_name
+        self._in_file = False
+        self._eof = False
+        self._parts: deque[_FilePart] = deque()
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    @classmethod
+    async def open(
+        cls, content_type: str | None, body: AsyncIterator[bytes], field_name: str = "file",
+    ) -> MultipartFileStream:
+        """파일 부분의 헤더까지 읽고 스트림을 반환한다. 파일 필드가 없으면 MissingFileError."""
+        media_type, options = parse_options_header(content_type or "")
+        boundary = options.get(b"boundary")
+        if media_type != b"multipart/form-data" or not boundary:
+            raise MissingFileError(f"Field '{field_name}' required (multipart/form-data)")
+        stream = cls(body, boundary, field_name)
+        while not stream._parts and not stream._eof:
+            await stream._feed()
+        if not stream._parts:
+            raise MissingFileError(f"Field '{field_name}' required")
+        return stream
+
+    @property
+    def filename(self) -> str | None:
+        return self._parts[0].filename if self._parts else None
+
+    @property
+    def content_type(self) -> str | None:
+        return self._parts[0].content_type if self._parts else None
+
+    async def read(self, size: int = -1) -> bytes:
+        """파일 내용을 최대 size바이트 읽는다 (파일 끝 전에는 size만큼 채운다). 끝이면 b""."""
+        if not self._parts:
+            return b""
+        part = self._parts[0]
+        while not part.done and (size < 0 or len(part.buffer) < size):
+            if self._eof:
+                raise IncompleteBodyError("Incomplete multipart body")
+            await self._feed()
+        n = len(part.buffer) if size < 0 else min(size, len(part.buffer))
+        chunk = bytes(part.buffer[:n])
+        del part.buffer[:n]
+        return chunk
+
+    async def next_file(self) -> bool:
+        """현재 파일의 남은 내용을 버리고 같은 이름의 다음 파일로 넘어간다. 없으면 False."""
+        if not self._parts:
+            return False
+        part = self._parts[0]
+        while not part.done:
+            if self._eof:
+                raise IncompleteBodyError("Incomplete multipart body")
+            part.buffer.clear()
+            await self._feed()
+        self._parts.popleft()
+        while not self._parts and not self._eof:
+            await self._feed()
+        return bool(self._parts)
+
+    async def _feed(self) -> None:
+        try:
+            chunk = await anext(self._body)
+        except StopAsyncIteration:
+            self._eof = True
+            self._parser.finalize()
+            return
+        if chunk:
+            self._parser.write(chunk)
+
+    # ── 파서 콜백 (data는 콜백 안에서만 유효 → 복사) ──
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" not in options:
+            return
+        if options.get(b"name", b"").decode("utf-8", "replace") != self._field_name:
+            return
+        self._in_file = True
+        self._parts.append(_FilePart(
+            options[b"filename"].decode("utf-8", "replace"),
+            self._headers.get(b"content-type", b"").decode("latin-1") or None,
+        ))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._parts[-1].buffer += data[start:end]
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._parts[-1].done = True
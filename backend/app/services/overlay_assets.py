@@ -0,0 +1,207 @@
+"""사진 타임랩스 오버레이를 미리 그린 RGBA 자산.
+
+워터마크 / 스트릭 문구 / 진행 바 같은 정적 레이어는 화면 모서리별로 잘라낸 PNG 한 장으로
+한 번만 그려 두고 렌더에서는 overlay로 합성만 한다 — drawtext가 프레임마다 하던 글꼴
+렌더링 / 그림자 계산이 없어진다. 자산은 (레이어 구성, 해상도) 해시로
+upload_dir/overlay_cache에 보관해 같은 스타일의 다음 렌더가 재사용한다.
+
+Pillow(선택 의존성 images)가 필요하다. 없으면 호출 측이 drawtext 필터로 돌아간다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+# 그리는 방식이 바뀌면 올린다 (자산 캐시 키에 포함)
+OVERLAY_ASSET_VERSION = 1
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+MARGIN = 14  # drawtext 배치(x=14, x=w-tw-14, y=14, y=h-th-14)와 같은 여백
+
+Color = tuple[int, int, int, int]
+# 우상단 글자 — 스트릭 / 고정 문구 (drawtext fontcolor=white, shadowcolor=black@0.6, shadowy=1)
+LABEL_FILL: Color = (255, 255, 255, 255)
+LABEL_SHADOW: Color = (0, 0, 0, 153)
+LABEL_SHADOW_OFFSET = (0, 1)
+
+
+@dataclass(frozen=True)
+class TextLayer:
+    """글자 한 줄 (drawtext의 fontcolor / shadowcolor / shadowx,y에 해당)."""
+
+    text: str
+    font_size: int
+    anchor: str  # "top-right" | "bottom-left"
+    fill: Color
+    shadow: Color
+    shadow_offset: tuple[int, int]
+
+
+@dataclass(frozen=True)
+class BoxLayer:
+    """채운 사각형 (drawbox t=fill에 해당, 프레임 좌표)."""
+
+    x: int
+    y: int
+    w: int
+    h: int
+    anchor: str
+    fill: Color
+
+
+@dataclass(frozen=True)
+class OverlayInput:
+    """렌더에 더할 overlay 입력 하나 — 정지 PNG와 프레임 안 위치."""
+
+    path: str
+    x: int
+    y: int
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class OverlayAssetCache:
+    """(레이어 구성, 해상도) → 미리 그린 자산 파일. 오래 쓰지 않은 항목은 정리한다."""
+
+    def __init__(self, cache_dir: str, max_age_seconds: float) -> None:
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_seconds
+
+    def static_layers(
+        self, layers: list[TextLayer | BoxLayer], frame_size: tuple[int, int],
+    ) -> list[OverlayInput]:
+        """정적 레이어를 모서리(anchor)별로 묶어 잘라낸 PNG로 (블로킹 — to_thread로 호출).
+
+        overlay는 입력 영역의 모든 픽셀을 합성하므로 프레임 전체 크기 레이어 한 장보다
+        보이는 부분만 자른 모서리별 레이어가 프레임당 비용이 작다.
+        """
+        groups: dict[str, list[TextLayer | BoxLayer]] = {}
+        for layer in layers:
+            groups.setdefault(layer.anchor, []).append(layer)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        inputs: list[OverlayInput] = []
+        for group in groups.values():
+            spec = {"frame": frame_size, "layers": [asdict(layer) for layer in group]}
+            key = self._key("static", spec)
+            path = os.path.join(self.cache_dir, f"{key}.png")
+            # 위치(json)를 PNG 다음에 써서 json이 보이면 PNG도 완성돼 있다
+            meta_path = os.path.join(self.cache_dir, f"{key}.json")
+            if not self._touch(path, meta_path):
+                image, x, y = _render_group(group, frame_size)
+                _save_atomic(path, lambda tmp, image=image: image.save(tmp, "PNG"))
+                offset = {"x": x, "y": y}
+                _save_atomic(meta_path, lambda tmp, offset=offset: _write_json(tmp, offset))
+            with open(meta_path) as f:
+                offset = json.load(f)
+            inputs.append(OverlayInput(path, offset["x"], offset["y"]))
+        self.prune()
+        return inputs
+
+    def prune(self) -> None:
+        """max_age 동안 쓰이지 않은 자산 삭제."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age_seconds:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+
+    @staticmethod
+    def _key(kind: str, spec: dict) -> str:
+        raw = json.dumps([OVERLAY_ASSET_VERSION, kind, spec], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def _touch(*paths: str) -> bool:
+        """모두 있으면 최근 사용 시각을 갱신하고 True."""
+        if not all(os.path.exists(path) for path in paths):
+            return False
+        for path in paths:
+            os.utime(path)
+        return True
+
+
+def _save_atomic(path: str, write: Callable[[str], None]) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_json(path: str, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _font(size: int):
+    from PIL import ImageFont
+
+    return ImageFont.truetype(FONT_PATH, size)
+
+
+def _draw_layer(canvas, draw: Callable) -> None:
+    """투명 레이어에 그린 뒤 알파 합성 (그림자 위에 글자가 덮이도록 한 겹씩)."""
+    from PIL import Image, ImageDraw
+
+    layer = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
+    draw(ImageDraw.Draw(layer))
+    canvas.alpha_composite(layer)
+
+
+def _draw_text(
+    canvas,
+    xy: tuple[int, int],
+    text: str,
+    font,
+    fill: Color,
+    shadow: Color,
+    shadow_offset: tuple[int, int],
+) -> None:
+    """drawtext처럼 그림자를 먼저, 글자를 위에."""
+    x, y = xy
+    sx, sy = shadow_offset
+    _draw_layer(canvas, lambda d: d.text((x + sx, y + sy), text, font=font, fill=shadow))
+    _draw_layer(canvas, lambda d: d.text((x, y), text, font=font, fill=fill))
+
+
+def _render_group(layers: list[TextLayer | BoxLayer], frame_size: tuple[int, int]):
+    """레이어들을 프레임 크기 캔버스에 그린 뒤 보이는 영역만 잘라 (이미지, x, y)로."""
+    from PIL import Image
+
+    width, height = frame_size
+    canvas = Image.new("RGBA", frame_size, (0, 0, 0, 0))
+    for layer in layers:
+        if isinstance(layer, BoxLayer):
+            box = (layer.x, layer.y, layer.x + layer.w - 1, layer.y + layer.h - 1)
+            _draw_layer(canvas, lambda d, box=box, fill=layer.fill: d.rectangle(box, fill=fill))
+            continue
+        font = _font(layer.font_size)
+        left, top, right, bottom = font.getbbox(layer.text)
+        # 글자 잉크 영역 기준 배치 (drawtext의 tw / th)
+        if layer.anchor == "top-right":
+            xy = (width - (right - left) - MARGIN - left, MARGIN - top)
+        else:
+            xy = (MARGIN - left, height - (bottom - top) - MARGIN - top)
+        _draw_text(canvas, xy, layer.text, font, layer.fill, layer.shadow, layer.shadow_offset)
+    box = canvas.getchannel("A").getbbox() or (0, 0, 1, 1)
+    return canvas.crop(box), box[0], box[1]
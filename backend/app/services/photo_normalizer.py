@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 사진 타임랩스 출력 크기 (TimelapseService._get_crop_and_scale의 scale과 같아야 함)
+RENDER_BOXES: dict[str, tuple[int, int]] = {
+    "9:16": (720, 1280),
+    "1:1": (720, 720),
+    "4:5": (720, 900),
+    "16:9": (1280, 720),
+}
+RENDER_JPEG_QUALITY = 92
+RENDER_SUFFIX = ".render.jpg"
+
+
+def render_size(width: int, height: int) -> tuple[int, int]:
+    """모든 출력 비율에서 축소만 일어나도록 하는 가장 작은 크기.
+
+    각 비율 박스에 맞춰 넣었을 때의 배율 중 최댓값으로 줄인다 → 어느 비율로 렌더해도
+    파생본을 다시 키우지 않는다. 원본이 이미 작으면 그대로.
+    """
+    scale = max(min(bw / width, bh / height) for bw, bh in RENDER_BOXES.values())
+    if scale >= 1:
+        return width, height
+    # 짝수로 맞춤 (yuv420p)
+    return max(2, round(width * scale / 2) * 2), max(2, round(height * scale / 2) * 2)
+
+
+def normalize_file(src: str, dst: str) -> bool:
+    """src JPEG을 렌더 크기로 줄여 dst에 저장한다 (프로세스 풀에서 실행).
+
+    JPEG draft 모드로 DCT 단계에서 먼저 줄여 디코딩하므로 12MP 원본도 빠르다.
+    EXIF(회전 정보 포함)는 그대로 옮겨 렌더러가 원본과 같은 방향으로 읽게 한다.
+    줄일 필요가 없으면 False.
+    """
+    from PIL import Image
+
+    with Image.open(src) as img:
+        width, height = img.size
+        target = render_size(width, height)
+        if target == (width, height):
+            return False
+        img.draft("RGB", target)
+        resized = img.convert("RGB").resize(target, Image.Resampling.LANCZOS)
+        exif = img.info.get("exif")
+
+    tmp = f"{dst}.tmp"
+    save_kwargs = {"quality": RENDER_JPEG_QUALITY}
+    if exif:
+        save_kwargs["exif"] = exif
+    resized.save(tmp, "JPEG", **save_kwargs)
+    os.replace(tmp, dst)
+    return True
+
+
+class PhotoNormalizer:
+    """업로드 사진의 렌더용 파생본({fileId}.render.jpg)을 만드는 프로세스 풀.
+
+    Pillow(선택 의존성 images)가 없거나 풀이 죽으면 파생본 없이 원본을 쓴다.
+    """
+
+    def __init__(self) -> None:
+        self._pool: ProcessPoolExecutor | None = None
+        self._available: bool | None = None
+
+    @property
+    def enabled(self) -> bool:
+        if not settings.photo_normalize:
+            return False
+        if self._available is None:
+            try:
+                import PIL  # noqa: F401
+
+                self._available = True
+            except ImportError:
+                logger.warning("photo_normalize is on but Pillow is not installed — skipping")
+                self._available = False
+        return self._available
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: 이벤트 루프/스레드를 가진 API 프로세스를 fork하지 않는다
+            self._pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.photo_normalize_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def normalize(self, src: str) -> str | None:
+        """파생본 경로를 반환한다. 만들지 않았으면(불필요/실패) None."""
+        if not self.enabled:
+            return None
+        dst = os.path.splitext(src)[0] + RENDER_SUFFIX
+        loop = asyncio.get_running_loop()
+        try:
+            made = await loop.run_in_executor(self._executor(), normalize_file, src, dst)
+        except BrokenProcessPool:
+            logger.exception("photo normalizer pool died — recreating")
+            self._pool = None
+            return None
+        except Exception as e:
+            logger.warning(f"photo normalize failed for {src}: {e}")
+            return None
+        return dst if made else None
+
+    def shutdown(self) -> None:
+        """프로세스 풀을 내린다 (앱 종료 시 lifespan에서 호출). 다음 normalize가 다시 만든다."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+photo_normalizer = PhotoNormalizer()
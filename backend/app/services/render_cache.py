@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """파일 내용의 sha256 (블로킹 — to_thread로 호출)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """내용 주소 기반 렌더 결과 캐시.
+
+    키 = 원본 내용 해시 + 출력에 영향을 주는 모든 파라미터의 sha256.
+    결과 파일은 cache_dir/{key}.mp4에 하드링크로 보관하므로 작업 출력과
+    디스크 공간을 공유하고, 작업 파일이 지워져도 캐시는 유지된다.
+    부가 출력(sidecar_suffixes, 예: 포스터)은 같은 이름 규칙으로 함께 보관·복원·정리된다.
+
+    작업 출력은 캐시 항목의 또 다른 이름이므로 캐시가 파일을 소유한다. 항목을 지울 때
+    linked_dir(작업 출력 디렉토리)에서 같은 inode를 가리키는 출력도 함께 지워야 디스크가
+    실제로 비워진다 — max_bytes / max_age_seconds는 작업 출력까지 포함한 한도다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        max_age_seconds: float,
+        sidecar_suffixes: tuple[str, ...] = (),
+        linked_dir: str | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.sidecar_suffixes = sidecar_suffixes
+        self.linked_dir = linked_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(kind: str, source_hashes: list[str], params: dict) -> str:
+        payload = json.dumps(
+            {"kind": kind, "sources": source_hashes, "params": params},
+            sort_keys=True, separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    def materialize(self, key: str, dest_path: str) -> bool:
+        """캐시된 결과를 dest_path에 연결한다. 히트 여부를 반환한다."""
+        cached = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(cached) > self.max_age_seconds:
+                raise FileNotFoundError(cached)
+            link_or_copy(cached, dest_path)
+            os.utime(cached)  # LRU: 최근 사용 시각 갱신
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        for suffix in self.sidecar_suffixes:
+            # 부가 출력이 없던 시절의 항목이면 건너뛴다
+            if os.path.exists(sidecar_path(cached, suffix)):
+                link_or_copy(sidecar_path(cached, suffix), sidecar_path(dest_path, suffix))
+        self.hits += 1
+        logger.info(f"render cache hit: {key[:12]} → {dest_path}")
+        return True
+
+    async def store(self, key: str, output_path: str) -> None:
+        """완료된 출력을 캐시에 등록하고 한도를 넘는 항목을 정리한다."""
+        await asyncio.to_thread(self._store, key, output_path)
+
+    def _store(self, key: str, output_path: str) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pairs = [(output_path, self._path(key))]
+        for suffix in self.sidecar_suffixes:
+            if os.path.exists(sidecar_path(output_path, suffix)):
+                pairs.append(
+                    (sidecar_path(output_path, suffix), sidecar_path(self._path(key), suffix))
+                )
+        # 부가 출력을 먼저 넣고 본 파일을 마지막에 교체 → 본 파일이 보이면 부가 출력도 있다
+        for src, dst in reversed(pairs):
+            tmp_path = f"{dst}.{os.getpid()}.tmp"
+            try:
+                link_or_copy(src, tmp_path)
+                os.replace(tmp_path, dst)
+            except OSError as e:
+                logger.warning(f"render cache store failed ({key[:12]}): {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+        self._evict()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """(mtime, size, path) 목록 — 오래된 순."""
+        entries: list[tuple[float, int, str]] = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(".mp4") or any(name.endswith(s) for s in self.sidecar_suffixes):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            size = st.st_size
+            for suffix in self.sidecar_suffixes:
+                try:
+                    size += os.path.getsize(sidecar_path(path, suffix))
+                except FileNotFoundError:
+                    pass
+            entries.append((st.st_mtime, size, path))
+        entries.sort()
+        return entries
+
+    def _evict(self) -> None:
+        """만료(max_age) 항목을 지우고, 총 용량이 max_bytes 이하가 될 때까지 LRU 순으로 지운다.
+
+        항목과 하드링크를 공유하는 작업 출력도 함께 지운다 (캐시 링크만 지우면 공간이 그대로).
+        """
+        now = time.time()
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        links: dict[tuple[int, int], list[str]] | None = None
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age_seconds and total <= self.max_bytes:
+                break
+            for victim in (path, *(sidecar_path(path, s) for s in self.sidecar_suffixes)):
+                try:
+                    st = os.stat(victim)
+                except FileNotFoundError:
+                    continue
+                if st.st_nlink > 1:
+                    if links is None:
+                        links = self._linked_outputs()
+                    for linked in links.get((st.st_dev, st.st_ino), []):
+                        with contextlib.suppress(FileNotFoundError):
+                            os.remove(linked)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(victim)
+            total -= size
+            logger.info(f"render cache evicted: {os.path.basename(path)}")
+
+    def _linked_outputs(self) -> dict[tuple[int, int], list[str]]:
+        """linked_dir 바로 아래에서 하드링크가 걸린 파일 — (장치, inode) → 경로 목록."""
+        links: dict[tuple[int, int], list[str]] = {}
+        if not self.linked_dir:
+            return links
+        try:
+            scan = os.scandir(self.linked_dir)
+        except FileNotFoundError:
+            return links
+        with scan:
+            for entry in scan:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if st.st_nlink > 1:
+                    links.setdefault((st.st_dev, st.st_ino), []).append(entry.path)
+        return links
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+
+def sidecar_path(output_path: str, suffix: str) -> str:
+    """출력 파일 옆 부가 출력 경로: a/b.mp4 + .poster.jpg → a/b.poster.jpg"""
+    return f"{os.path.splitext(output_path)[0]}{suffix}"
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """하드링크 (같은 볼륨이면 복사 없음), 실패 시 복사."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
@@ -0,0 +1,141 @@
+"""대기열에 들어간 렌더 작업을 디스크에 남겨 재시작 후 복구할 수 있게 하는 작업 기록.
+
+작업마다 journal_dir/{task_id}.json에 작업 레코드와 RenderJob(종류, 파라미터, 비용, 레인)을
+쓰고, 작업을 가진 프로세스가 끝날 때까지 그 파일에 flock을 잡아 둔다. 프로세스가 죽으면
+커널이 락을 풀어 주므로, 락을 잡을 수 있는 기록 = 주인이 죽어 중단된 작업이다.
+여러 API 워커가 upload_dir을 공유해도 살아 있는 워커의 작업은 건드리지 않는다.
+
+워커가 작업을 꺼내면 started로 다시 써 둔다 (복구 시 실행 중 끊긴 작업만 끊긴 횟수에 센다).
+작업이 끝나면(완료 / 실패 / 취소) 기록을 지운다. 정상 종료(drain) 때 유예 시간 안에 끝나지
+않은 작업은 checkpointed로 다시 써 두고 락만 놓는다.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+from dataclasses import asdict
+
+from app.services.render_queue import RenderJob
+
+logger = logging.getLogger(__name__)
+
+
+class RenderJournal:
+    """렌더 작업 기록 (파일 하나 = 작업 하나, 주인 프로세스가 flock 보유)."""
+
+    def __init__(self, journal_dir: str) -> None:
+        self.journal_dir = journal_dir
+        self._fds: dict[str, int] = {}
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.journal_dir, f"{task_id}.json")
+
+    def record(
+        self,
+        task: dict,
+        job: RenderJob,
+        attempts: int = 0,
+        checkpointed: bool = False,
+        started: bool = False,
+    ) -> None:
+        """작업을 기록하고 락을 잡는다 (블로킹 — to_thread로 호출).
+
+        attempts는 재시작으로 끊긴 횟수, checkpointed는 정상 종료 때 유예 시간을 넘겨 멈춘
+        작업 표시, started는 워커가 꺼내 실행을 시작한 작업 표시 (복구 시 started이고
+        checkpointed가 아닌 작업만 끊긴 횟수에 센다).
+
+        새 기록은 임시 이름으로 만들어 락을 잡은 뒤 제 이름으로 옮기므로, 다른 워커가 락 없는
+        기록을 보는 순간이 없다. 이미 잡고 있는 기록은 제자리에서 다시 쓴다 (락은 inode에 걸림).
+        """
+        data = json.dumps({
+            "task": task,
+            "job": {k: v for k, v in asdict(job).items() if k != "enqueued_at"},
+            "attempts": attempts,
+            "checkpointed": checkpointed,
+            "started": started,
+        }).encode()
+        fd = self._fds.get(job.task_id)
+        if fd is not None:
+            os.ftruncate(fd, 0)
+            os.pwrite(fd, data, 0)
+            os.fsync(fd)
+            return
+        os.makedirs(self.journal_dir, exist_ok=True)
+        tmp_path = f"{self._path(job.task_id)}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.write(fd, data)
+        os.fsync(fd)
+        os.replace(tmp_path, self._path(job.task_id))
+        self._fds[job.task_id] = fd
+
+    def release(self, task_id: str) -> None:
+        """작업이 끝나면 기록을 지우고 락을 푼다 (블로킹 — to_thread로 호출)."""
+        fd = self._fds.pop(task_id, None)
+        if fd is None:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path(task_id))
+        os.close(fd)
+
+    def task_ids(self) -> set[str]:
+        """기록이 남아 있는 작업 (이 프로세스 / 다른 워커 / 아직 복구 안 한 것 모두)."""
+        try:
+            names = os.listdir(self.journal_dir)
+        except FileNotFoundError:
+            return set()
+        return {name[:-len(".json")] for name in names if name.endswith(".json")}
+
+    def claim_orphans(self) -> list[dict]:
+        """주인이 죽은 기록의 락을 넘겨받고 내용을 돌려준다 (블로킹 — to_thread로 호출).
+
+        살아 있는 프로세스가 잡고 있는 기록은 건너뛰고, 읽을 수 없는(쓰다 끊긴) 기록은 지운다.
+        넘겨받은 기록은 record로 다시 쓰거나 release로 지운다.
+        """
+        entries: list[dict] = []
+        for task_id in sorted(self.task_ids() - self._fds.keys()):
+            try:
+                fd = os.open(self._path(task_id), os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            self._fds[task_id] = fd
+            try:
+                with open(self._path(task_id), "rb") as f:
+                    entry = json.loads(f.read())
+                entry["job"] = RenderJob(**entry["job"])
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"[{task_id}] unreadable render journal entry dropped: {e}")
+                self.release(task_id)
+                continue
+            entries.append(entry)
+        self._drop_stale_tmp()
+        return entries
+
+    def _drop_stale_tmp(self) -> None:
+        """기록하다 죽은 프로세스의 임시 파일 (제 이름으로 옮기기 전) 정리."""
+        if not os.path.isdir(self.journal_dir):
+            return
+        for name in os.listdir(self.journal_dir):
+            if not name.endswith(".json.tmp"):
+                continue
+            path = os.path.join(self.journal_dir, name)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.remove(path)
+            except (BlockingIOError, FileNotFoundError):
+                pass
+            finally:
+                os.close(fd)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LANE = "priority"  # 유료 / 체험 구독자
+FREE_LANE = "free"
+PRIORITY_SUBSCRIPTIONS = {"paid", "trial"}
+
+
+class QueueFullError(Exception):
+    """렌더 대기열이 가득 차 새 작업을 받을 수 없음."""
+
+
+@dataclass
+class RenderJob:
+    """대기열에 들어가는 렌더 작업 한 건."""
+
+    task_id: str
+    kind: str  # video | photos
+    params: dict
+    cost: float = 0.0  # 예상 처리량 (Mpx 프레임) — 같은 레인에서 작은 작업부터
+    lane: str = FREE_LANE
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+def render_lane(subscription_status: str | None) -> str:
+    """구독 상태 → 대기열 레인 (비로그인 / free는 일반 레인)."""
+    return PRIORITY_LANE if subscription_status in PRIORITY_SUBSCRIPTIONS else FREE_LANE
+
+
+class RenderQueue:
+    """동시 실행 수가 제한된 렌더 워커 풀 (레인 우선순위 + 짧은 작업 우선).
+
+    워커 수만큼만 FFmpeg 작업을 동시에 돌리고, 나머지는 다음 순서로 꺼낸다.
+    1. max_wait_seconds 넘게 기다린 작업 (도착 순) — 큰 작업 / 일반 레인의 기아 방지
+    2. priority 레인 (유료 / 체험 구독자)
+    3. 예상 비용(cost)이 작은 작업 — 짧은 렌더가 긴 렌더 뒤에서 기다리지 않도록
+    4. 도착 순
+    대기열이 max_pending을 넘으면 QueueFullError로 거절한다.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[RenderJob], Awaitable[None]],
+        workers: int,
+        max_pending: int,
+        max_wait_seconds: float = 300.0,
+    ) -> None:
+        self._runner = runner
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.max_wait_seconds = max_wait_seconds
+        self.accepting = True  # close() 이후에는 새 작업을 받지도, 대기 작업을 꺼내지도 않는다
+        self._pending: list[RenderJob] = []
+        # reserve()로 자리만 잡고 아직 submit하지 않은 작업 (대기열 길이에 포함)
+        self._reserved: set[str] = set()
+        self._running: dict[str, asyncio.Task] = {}
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    # ── 상태 조회 ──
+
+    def full(self) -> bool:
+        return (
+            not self.accepting or len(self._pending) + len(self._reserved) >= self.max_pending
+        )
+
+    def position(self, task_id: str) -> int | None:
+        """대기 중인 작업의 순번(1부터, 지금 기준 꺼낼 순서). 대기 중이 아니면 None."""
+        for idx, job in enumerate(self._ordered(), start=1):
+            if job.task_id == task_id:
+                return idx
+        return None
+
+    def is_running(self, task_id: str) -> bool:
+        return task_id in self._running
+
+    def contains(self, task_id: str) -> bool:
+        """이 대기열에서 대기 중이거나 실행 중인 작업인지."""
+        return task_id in self._running or any(job.task_id == task_id for job in self._pending)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def running_tasks(self) -> list[asyncio.Task]:
+        return list(self._running.values())
+
+    def pending_jobs(self) -> list[RenderJob]:
+        return list(self._pending)
+
+    def pending_by_lane(self) -> dict[str, int]:
+        counts = {PRIORITY_LANE: 0, FREE_LANE: 0}
+        for job in self._pending:
+            counts[job.lane] = counts.get(job.lane, 0) + 1
+        return counts
+
+    def _ordered(self) -> list[RenderJob]:
+        now = time.monotonic()
+        return sorted(self._pending, key=lambda job: self._order_key(job, now))
+
+    def _order_key(self, job: RenderJob, now: float) -> tuple:
+        if now - job.enqueued_at >= self.max_wait_seconds:
+            return (0, job.enqueued_at)
+        return (1, job.lane != PRIORITY_LANE, job.cost, job.enqueued_at)
+
+    # ── 작업 투입 ──
+
+    def reserve(self, task_id: str) -> None:
+        """대기열 자리를 미리 잡는다 (가득 찼으면 QueueFullError).
+
+        작업 레코드 저장 / 기록처럼 await가 끼는 준비 동안 다른 요청이 자리를 가져가지
+        않도록, 확인과 확보를 한 번에 한다. submit으로 쓰거나 unreserve로 돌려준다.
+        """
+        self._check_capacity()
+        self._reserved.add(task_id)
+
+    def unreserve(self, task_id: str) -> None:
+        self._reserved.discard(task_id)
+
+    def submit(self, job: RenderJob) -> int:
+        """작업을 대기열에 넣고 대기 순번을 반환한다 (reserve한 작업은 잡아 둔 자리에)."""
+        if job.task_id in self._reserved:
+            self._reserved.discard(job.task_id)
+            if not self.accepting:
+                raise QueueFullError("Render queue is closed (server shutting down)")
+        else:
+            self._check_capacity()
+        self._ensure_workers()
+        self._pending.append(job)
+        self._wakeup.set()
+        return self.position(job.task_id)
+
+    def _check_capacity(self) -> None:
+        if not self.accepting:
+            raise QueueFullError("Render queue is closed (server shutting down)")
+        if self.full():
+            raise QueueFullError(
+                f"Render queue is full ({len(self._pending)}/{self.max_pending})"
+            )
+
+    def close(self) -> None:
+        """종료 준비: 새 작업을 거절하고 대기 작업은 더 꺼내지 않는다 (실행 중인 작업은 계속)."""
+        self.accepting = False
+
+    def cancel(self, task_id: str) -> asyncio.Task | None:
+        """대기 중이면 대기열에서 빼고, 실행 중이면 작업을 취소한다.
+
+        실행 중이던 작업의 asyncio 태스크를 반환한다 (호출 측이 정리가 끝날 때까지 기다릴 수
+        있도록). 대기 중이었거나 없는 작업이면 None.
+        """
+        for job in self._pending:
+            if job.task_id == task_id:
+                self._pending.remove(job)
+                return None
+        task = self._running.get(task_id)
+        if task is not None:
+            task.cancel()
+        return task
+
+    def _ensure_workers(self) -> None:
+        """첫 투입 시점에 워커를 띄운다 (이벤트 루프가 떠 있어야 하므로 지연 생성)."""
+        self._workers = [w for w in self._workers if not w.done()]
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._pending or not self.accepting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            job = self._ordered()[0]
+            self._pending.remove(job)
+            task = asyncio.create_task(self._runner(job))
+            self._running[job.task_id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                # 작업만 취소된 경우 워커는 계속 돈다
+                if asyncio.current_task().cancelling():
+                    raise
+            except Exception as e:
+                logger.exception(f"[{job.task_id}] render job crashed: {e}")
+            finally:
+                self._running.pop(job.task_id, None)
@@ -0,0 +1,99 @@
+"""동시에 도는 FFmpeg 작업들에 코어 예산을 나눠 주는 자원 관리자.
+
+FFmpeg는 -threads 0이면 작업마다 코어 수만큼 스레드를 띄우므로 작업 여러 개가 동시에 돌면
+코어 수의 몇 배나 되는 스레드가 경쟁하고, 문맥 전환에 처리량을 잃는다. 작업이 시작될 때
+예산(render_cores)을 함께 도는 작업 수로 나눈 스레드 수를 정해 디코더 / 필터 / 인코더에
+적용한다. 실행 중인 프로세스의 스레드 수는 바꿀 수 없으므로 배분은 시작 시점에 정해지고
+작업이 끝나면 반납한다.
+
+nice가 0보다 큰 작업(세션 세그먼트 미리 인코딩 같은 백그라운드 작업)은 nice + SCHED_BATCH로
+실행해 사용자가 기다리는 렌더에 CPU를 양보한다.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class Allocation:
+    """작업 하나에 배분된 자원."""
+
+    job_id: str
+    kind: str  # render | segment
+    threads: int
+    nice: int = 0
+    started_at: float = field(default_factory=time.time)
+
+
+class ResourceGovernor:
+    """코어 예산(cores)을 실행 중인 작업들에 스레드 수로 나눠 준다."""
+
+    def __init__(self, cores: int) -> None:
+        self.cores = max(1, cores)
+        self._jobs: dict[str, Allocation] = {}
+
+    @contextlib.contextmanager
+    def allocate(
+        self, job_id: str, kind: str, *, demand: int = 1, nice: int = 0,
+    ) -> Iterator[Allocation]:
+        """작업이 도는 동안 스레드 몫을 잡아 두고 끝나면 반납한다.
+
+        몫 = 예산 ÷ max(실행 중인 작업 + 이 작업, demand). demand는 곧 함께 돌 작업 수
+        (대기열의 실행 + 대기, 워커 수 이하)로, 혼자 시작한 작업이 예산을 다 가져간 직후
+        다음 작업이 들어와 초과 배분되는 일을 줄인다.
+        """
+        share = self.cores // max(len(self._jobs) + 1, demand)
+        allocation = Allocation(job_id, kind, max(1, share), nice)
+        self._jobs[job_id] = allocation
+        try:
+            yield allocation
+        finally:
+            self._jobs.pop(job_id, None)
+
+    def threads(self, job_id: str) -> int:
+        """작업에 배분된 스레드 수. 배분 없이 실행되는 작업은 예산 전체."""
+        allocation = self._jobs.get(job_id)
+        return allocation.threads if allocation else self.cores
+
+    def preexec(self, job_id: str) -> Callable[[], None] | None:
+        """자식 프로세스에서 exec 전에 우선순위를 낮추는 함수 (낮출 필요 없으면 None)."""
+        allocation = self._jobs.get(job_id)
+        if allocation is None or allocation.nice <= 0:
+            return None
+        return lambda: lower_priority(allocation.nice)
+
+    def stats(self) -> dict:
+        jobs = list(self._jobs.values())
+        return {
+            "cores": self.cores,
+            "allocated_threads": sum(job.threads for job in jobs),
+            "jobs": [asdict(job) for job in jobs],
+        }
+
+
+def lower_priority(nice: int) -> None:
+    """현재 프로세스의 nice 값을 올리고, 가능하면 SCHED_BATCH(비대화형 CPU 작업)로 바꾼다."""
+    os.nice(nice)
+    if hasattr(os, "sched_setscheduler"):
+        with contextlib.suppress(OSError):
+            os.sched_setscheduler(0, os.SCHED_BATCH, os.sched_param(0))
+
+
+def filter_thread_args(threads: int) -> list[str]:
+    """필터 그래프 스레드 수 (전역 옵션: -vf 체인과 -filter_complex 모두)."""
+    return ["-filter_threads", str(threads), "-filter_complex_threads", str(threads)]
+
+
+def with_threads(encoder_args: list[str], threads: int) -> list[str]:
+    """인코더 인자의 -threads 값을 바꾼 사본."""
+    args = list(encoder_args)
+    if "-threads" in args:
+        args[args.index("-threads") + 1] = str(threads)
+    else:
+        args.extend(["-threads", str(threads)])
+    return args
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator
+from typing import BinaryIO
+
+from app.config import settings
+from app.services.render_cache import hash_file
+from app.services.upload_service import (
+    SIGNATURE_BYTES,
+    UploadService,
+    UploadTooLargeError,
+    _remove_quietly,
+    check_signature,
+    validate_extension,
+)
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_DIR_NAME = "partial"
+CLEANUP_INTERVAL_SECONDS = 600  # 만료 업로드 정리 주기
+
+
+class UploadNotFoundError(Exception):
+    """존재하지 않거나 만료된 업로드 세션."""
+
+
+class UploadBusyError(Exception):
+    """다른 요청(다른 워커일 수도 있음)이 같은 업로드에 쓰는 중."""
+
+
+class UploadOffsetMismatchError(Exception):
+    """요청한 오프셋이 서버에 기록된 오프셋과 다름 (클라이언트는 HEAD로 재동기화)."""
+
+    def __init__(self, expected: int, received: int) -> None:
+        super().__init__(f"Upload-Offset mismatch: expected {expected}, got {received}")
+        self.expected = expected
+        self.received = received
+
+
+class ResumableUploadService:
+    """이어 올리기 가능한 청크 업로드.
+
+    업로드마다 upload_dir/partial/{uploadId}.part (데이터)와 .json (메타데이터)을 둔다.
+    현재 오프셋은 .part 파일 크기 자체이므로, 연결이 끊겨 청크 일부만 기록돼도
+    클라이언트는 HEAD로 받은 오프셋부터 이어 보내면 된다.
+    완료 시 .part를 rename으로 일반 업로드 위치에 옮기므로 파일 전체 복사는 없다.
+    같은 업로드에 쓰는 요청은 .part의 flock으로 막는다 (upload_dir을 공유하는 모든 워커).
+    """
+
+    def __init__(self, upload_service: UploadService) -> None:
+        self.upload_service = upload_service
+
+    @property
+    def partial_dir(self) -> str:
+        return os.path.join(settings.upload_dir, PARTIAL_DIR_NAME)
+
+    def _paths(self, upload_id: str) -> tuple[str, str]:
+        # uploadId는 경로에 쓰이므로 UUID 형식만 허용
+        try:
+            uuid.UUID(upload_id)
+        except ValueError as e:
+            raise UploadNotFoundError(upload_id) from e
+        base = os.path.join(self.partial_dir, upload_id)
+        return f"{base}.part", f"{base}.json"
+
+    # ── 세션 ──
+
+    async def create(
+        self, filename: str | None, size: int, mime_type: str | None = None,
+    ) -> dict:
+        """업로드 세션을 만든다. size는 전체 파일 크기(바이트)."""
+        validate_extension(filename)
+        if size <= 0:
+            raise ValueError("Empty file")
+        if size > settings.max_upload_size_mb * 1024 * 1024:
+            raise UploadTooLargeError(f"File too large: max {settings.max_upload_size_mb}MB")
+
+        upload_id = str(uuid.uuid4())
+        part_path, meta_path = self._paths(upload_id)
+        meta = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "mime_type": mime_type,
+            "size": size,
+            "created_at": time.time(),
+        }
+        await asyncio.to_thread(_create_files, part_path, meta_path, meta)
+        logger.info(f"[{upload_id}] resumable upload created: {filename} ({size} bytes)")
+        return self._status(meta, 0, meta["created_at"])
+
+    async def status(self, upload_id: str) -> dict:
+        meta = await self._load(upload_id)
+        part_path, _ = self._paths(upload_id)
+        try:
+            st = await asyncio.to_thread(os.stat, part_path)
+            offset, touched_at = st.st_size, st.st_mtime
+        except FileNotFoundError:
+            offset, touched_at = 0, meta["created_at"]
+        return self._status(meta, offset, touched_at)
+
+    def _status(self, meta: dict, offset: int, touched_at: float) -> dict:
+        return {
+            "uploadId": meta["upload_id"],
+            "offset": offset,
+            "size": meta["size"],
+            "expiresAt": touched_at + settings.resumable_upload_ttl_hours * 3600,
+            "chunkSize": settings.resumable_chunk_size_mb * 1024 * 1024,
+        }
+
+    async def _load(self, upload_id: str) -> dict:
+        part_path, meta_path = self._paths(upload_id)
+        try:
+            meta = await asyncio.to_thread(_read_json, meta_path)
+        except FileNotFoundError as e:
+            raise UploadNotFoundError(upload_id) from e
+        # 정리 전이라도 expiresAt이 지난 업로드는 없는 것으로 본다
+        last_activity = await asyncio.to_thread(_last_activity, part_path, meta_path)
+        if time.time() - last_activity > settings.resumable_upload_ttl_hours * 3600:
+            raise UploadNotFoundError(upload_id)
+        return meta
+
+    # ── 청크 ──
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        """offset 위치에 요청 본문을 이어 쓴다. offset은 현재 기록된 크기와 같아야 한다.
+
+        본문은 받는 대로 .part 끝에 기록하므로 메모리 사용량은 네트워크 청크 크기로 고정된다.
+        컨테이너 시그니처는 파일 앞 SIGNATURE_BYTES가 모이는 대로 검사한다 (요청 / 청크가
+        그보다 작게 나뉘어 와도 된다).
+        """
+        meta = await self._load(upload_id)
+        part_path, _ = self._paths(upload_id)
+        f = await asyncio.to_thread(_open_locked, part_path, upload_id)
+        try:
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetMismatchError(current, offset)
+            # 앞 요청까지 받은 시그니처 조각 (이미 검사했으면 None)
+            head = None
+            if current < SIGNATURE_BYTES:
+                head = await asyncio.to_thread(_read_head, part_path, current)
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if head is not None and len(head) < SIGNATURE_BYTES:
+                    head += chunk[:SIGNATURE_BYTES - len(head)]
+                    if len(head) == SIGNATURE_BYTES:
+                        try:
+                            check_signature(head)
+                        except ValueError:
+                            # 앞 요청에서 받은 몇 바이트도 버린다 — 처음부터 다시 보내야 한다
+                            await asyncio.to_thread(f.truncate, 0)
+                            raise
+                if current + len(chunk) > meta["size"]:
+                    raise UploadTooLargeError(
+                        f"Chunk exceeds declared size ({meta['size']} bytes)"
+                    )
+                await asyncio.to_thread(f.write, chunk)
+                current += len(chunk)
+        finally:
+            # 끊긴 청크도 받은 만큼은 남긴다 — 다음 요청이 그 지점부터 이어 쓴다
+            await asyncio.to_thread(f.close)
+        return self._status(meta, current, time.time())
+
+    async def complete(self, upload_id: str) -> dict:
+        """모든 바이트가 도착한 업로드를 일반 업로드 파일로 확정하고 fileId를 발급한다."""
+        meta = await self._load(upload_id)
+        part_path, meta_path = self._paths(upload_id)
+        f = await asyncio.to_thread(_open_locked, part_path, upload_id)
+        try:
+            received = os.fstat(f.fileno()).st_size
+            if received != meta["size"]:
+                raise UploadOffsetMismatchError(meta["size"], received)
+            # 선언 크기가 SIGNATURE_BYTES보다 작으면 append에서 검사할 기회가 없었다
+            check_signature(await asyncio.to_thread(_read_head, part_path, SIGNATURE_BYTES))
+
+            file_id = str(uuid.uuid4())
+            ext = validate_extension(meta["filename"])
+            file_path = os.path.join(settings.upload_dir, f"{file_id}{ext}")
+            # partial_dir은 upload_dir 아래이므로 같은 볼륨 — rename만으로 이동
+            await asyncio.to_thread(os.replace, part_path, file_path)
+            await asyncio.to_thread(_remove_quietly, meta_path)
+        finally:
+            await asyncio.to_thread(f.close)
+
+        content_hash = await asyncio.to_thread(hash_file, file_path)
+        logger.info(f"[{upload_id}] resumable upload completed → {file_id}")
+        return await self.upload_service.register_video(
+            file_id, file_path, meta["filename"], meta["mime_type"], content_hash,
+        )
+
+    async def abort(self, upload_id: str) -> None:
+        part_path, meta_path = self._paths(upload_id)
+        await self._load(upload_id)
+        f = await asyncio.to_thread(_open_locked, part_path, upload_id)
+        try:
+            await asyncio.to_thread(_remove_quietly, part_path)
+            await asyncio.to_thread(_remove_quietly, meta_path)
+        finally:
+            await asyncio.to_thread(f.close)
+
+    # ── 정리 ──
+
+    async def run_cleanup(self) -> None:
+        """만료된 업로드를 주기적으로 정리한다 (앱 수명 동안 도는 백그라운드 작업)."""
+        while True:
+            try:
+                removed = await asyncio.to_thread(
+                    cleanup_stale_uploads,
+                    self.partial_dir, settings.resumable_upload_ttl_hours * 3600,
+                )
+            except OSError as e:
+                logger.warning(f"partial upload cleanup failed: {e}")
+            else:
+                if removed:
+                    logger.info(f"removed {removed} abandoned partial uploads")
+            await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+
+
+def cleanup_stale_uploads(partial_dir: str, max_age_seconds: float) -> int:
+    """max_age 동안 청크가 추가되지 않은 업로드(.part/.json)를 지우고 지운 개수를 반환한다."""
+    try:
+        names = os.listdir(partial_dir)
+    except FileNotFoundError:
+        return 0
+    now = time.time()
+    removed = 0
+    for name in names:
+        upload_id, ext = os.path.splitext(name)
+        if ext != ".json":
+            continue
+        meta_path = os.path.join(partial_dir, name)
+        part_path = os.path.join(partial_dir, f"{upload_id}.part")
+        if now - _last_activity(part_path, meta_path) > max_age_seconds:
+            _remove_quietly(part_path)
+            _remove_quietly(meta_path)
+            removed += 1
+    return removed
+
+
+def _create_files(part_path: str, meta_path: str, meta: dict) -> None:
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    open(part_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+
+def _read_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _read_head(path: str, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(size)
+
+
+def _last_activity(part_path: str, meta_path: str) -> float:
+    """마지막으로 청크가 기록된 시각 (파일이 없으면 0)."""
+    try:
+        return max(os.path.getmtime(meta_path), os.path.getmtime(part_path))
+    except FileNotFoundError:
+        return 0.0
+
+
+def _open_locked(part_path: str, upload_id: str) -> BinaryIO:
+    """.part를 이어 쓰기로 열고 flock을 잡는다 (블로킹 — to_thread로 호출).
+
+    다른 요청이 락을 잡고 있으면 기다리지 않고 UploadBusyError. 열고 잠그는 사이에
+    complete / abort가 파일을 옮기거나 지웠으면 UploadNotFoundError. 락은 close로 풀린다.
+    """
+    try:
+        fd = os.open(part_path, os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError as e:
+        raise UploadNotFoundError(upload_id) from e
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        if os.stat(part_path).st_ino != os.fstat(fd).st_ino:
+            raise FileNotFoundError(part_path)
+    except BlockingIOError as e:
+        os.close(fd)
+        raise UploadBusyError(upload_id) from e
+    except FileNotFoundError as e:
+        os.close(fd)
+        raise UploadNotFoundError(upload_id) from e
+    return os.fdopen(fd, "ab")
@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+
+from app.config import settings
+from app.services.render_queue import FREE_LANE
+from app.services.resource_governor import filter_thread_args, with_threads
+from app.services.timelapse_service import (
+    BASE_FPS,
+    PHOTO_ENCODER_ARGS,
+    STDERR_TAIL_LINES,
+    TimelapseService,
+    build_photo_input,
+    overlay_graph,
+    overlay_input_args,
+)
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_DIR_NAME = "sessions"
+SEGMENT_POLL_SECONDS = 1.0  # 다른 워커가 인코딩 중인 세그먼트를 기다릴 때 매니페스트 확인 간격
+# 종료 시점의 값(녹화 시간, streak 등)이 필요한 오버레이 — 미리 인코딩할 수 없어 종료 후 전체 렌더
+FINAL_ONLY_OVERLAY_STYLES = {"timer", "progress", "streak"}
+# 세션 오버레이 테마(FocusSession.overlay_style) → (렌더 overlay_style, timer_mode).
+# 시계 테마는 녹화 경과 시간을 센다. 세션에는 목표 시간이 없어 progress-bar는 진행 바를 그릴 수
+# 없으므로 매핑하지 않는다 (없는 값은 그대로 → 워터마크만)
+SESSION_OVERLAY_STYLES = {
+    "stopwatch": ("timer", "countup"),
+    "analog-clock": ("timer", "countup"),
+    "minimal": ("none", "countdown"),
+}
+
+
+def render_overlay(overlay_style: str) -> tuple[str, str]:
+    """세션 오버레이 테마를 사진 타임랩스 렌더의 (overlay_style, timer_mode)로 바꾼다."""
+    return SESSION_OVERLAY_STYLES.get(overlay_style, (overlay_style, "countdown"))
+
+
+class SessionClosedError(Exception):
+    """이미 종료(finalize)된 세션에 프레임을 추가하려 함."""
+
+
+class FrameOffsetMismatchError(Exception):
+    """클라이언트가 보낸 프레임 오프셋이 서버에 기록된 프레임 수와 다름."""
+
+    def __init__(self, expected: int, received: int) -> None:
+        super().__init__(f"Frame offset mismatch: expected {expected}, got {received}")
+        self.expected = expected
+        self.received = received
+
+
+class SessionEncoder:
+    """녹화 중인 세션의 사진을 짧은 세그먼트로 미리 인코딩한다.
+
+    세션마다 upload_dir/sessions/{sessionId}/에
+    - frames.txt: 받은 사진 (fileId<TAB>경로, 추가만 함)
+    - manifest.json: 프레임 수, 세그먼트 목록 [{index, start, end, done}]
+    - seg_000001.mp4…: session_segment_frames장씩 인코딩한 세그먼트
+    를 둔다. 세션 종료 시 남은 사진만 꼬리 세그먼트로 인코딩하고 -c copy로 이어 붙이므로
+    종료 후 대기 시간이 세션 길이와 무관하다.
+
+    세그먼트는 모두 같은 필터/인코더 설정으로 만들어지므로 재인코딩 없이 이어 붙일 수 있다.
+    매니페스트 갱신은 세션 디렉토리의 파일 락으로 직렬화한다 (여러 API 워커 공유).
+    세그먼트를 인코딩하는 워커는 매니페스트에 claim(워커 ID, 시각)을 남기고, 다른 워커는
+    session_segment_lease_seconds 동안 그 세그먼트를 건드리지 않는다.
+    """
+
+    def __init__(self, timelapse_service: TimelapseService) -> None:
+        self.timelapse_service = timelapse_service
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._tasks: dict[tuple[str, int], asyncio.Task] = {}
+        self._finishers: set[asyncio.Task] = set()
+        self._encode_slots: asyncio.Semaphore | None = None
+        self._worker_id = uuid.uuid4().hex
+
+    # ── 경로 / 락 ──
+
+    def _dir(self, session_id: str) -> str:
+        return os.path.join(settings.upload_dir, SESSIONS_DIR_NAME, str(uuid.UUID(session_id)))
+
+    def _manifest_path(self, session_id: str) -> str:
+        return os.path.join(self._dir(session_id), "manifest.json")
+
+    def _segment_path(self, session_id: str, index: int) -> str:
+        return os.path.join(self._dir(session_id), f"seg_{index:06d}.mp4")
+
+    @contextlib.asynccontextmanager
+    async def _locked(self, session_id: str) -> AsyncIterator[None]:
+        async with self._locks.setdefault(session_id, asyncio.Lock()):
+            fd = await asyncio.to_thread(_flock, os.path.join(self._dir(session_id), ".lock"))
+            try:
+                yield
+            finally:
+                os.close(fd)
+
+    def _load(self, session_id: str) -> dict | None:
+        try:
+            with open(self._manifest_path(session_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save(self, session_id: str, manifest: dict) -> None:
+        path = self._manifest_path(session_id)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _frames(self, session_id: str) -> list[tuple[str, str]]:
+        """(fileId, 경로) 목록 — 받은 순서."""
+        with open(os.path.join(self._dir(session_id), "frames.txt")) as f:
+            return [tuple(line.rstrip("\n").split("\t", 1)) for line in f if line.strip()]
+
+    # ── 프레임 추가 ──
+
+    async def append_frames(
+        self,
+        session_id: str,
+        aspect_ratio: str,
+        overlay_style: str,
+        file_ids: list[str],
+        offset: int | None = None,
+    ) -> dict:
+        """업로드된 사진(fileId)을 세션 끝에 붙이고, 세그먼트 분량이 차면 백그라운드 인코딩한다.
+
+        offset을 주면 서버의 프레임 수와 같을 때만 추가한다 (재전송 중복 방지).
+        """
+        infos = await self.timelapse_service.upload_service.get_files(file_ids)
+        missing = [fid for fid in file_ids if fid not in infos]
+        if missing:
+            raise FileNotFoundError(f"Photo {missing[0]} not found")
+
+        os.makedirs(self._dir(session_id), exist_ok=True)
+        async with self._locked(session_id):
+            manifest = self._load(session_id) or {
+                "session_id": session_id,
+                "aspect_ratio": aspect_ratio,
+                "overlay_style": overlay_style,
+                "frames": 0,
+                "segments": [],
+                "finalized": False,
+            }
+            if manifest["finalized"]:
+                raise SessionClosedError(session_id)
+            if offset is not None and offset != manifest["frames"]:
+                raise FrameOffsetMismatchError(manifest["frames"], offset)
+
+            lines = []
+            for fid in file_ids:
+                info = infos[fid]
+                path = info.get("render_path") or info["file_path"]
+                lines.append(f"{fid}\t{path}\n")
+            frames_path = os.path.join(self._dir(session_id), "frames.txt")
+            await asyncio.to_thread(_append_lines, frames_path, lines)
+            manifest["frames"] += len(file_ids)
+
+            new_segments = self._cut_segments(manifest, final=False)
+            await asyncio.to_thread(self._save, session_id, manifest)
+
+        for segment in new_segments:
+            self._start_segment(session_id, manifest, segment)
+        return self._status(manifest)
+
+    def _cut_segments(self, manifest: dict, final: bool) -> list[dict]:
+        """아직 세그먼트에 들어가지 않은 프레임을 session_segment_frames 단위로 자른다.
+
+        final이면 남은 프레임 전부를 마지막(꼬리) 세그먼트로 만든다.
+        """
+        if not self.incremental(manifest["overlay_style"]):
+            return []
+        size = max(1, settings.session_segment_frames)
+        start = manifest["segments"][-1]["end"] if manifest["segments"] else 0
+        cut: list[dict] = []
+        while manifest["frames"] - start >= size or (final and manifest["frames"] > start):
+            end = min(start + size, manifest["frames"])
+            segment = {
+                "index": len(manifest["segments"]) + 1, "start": start, "end": end, "done": False,
+            }
+            manifest["segments"].append(segment)
+            cut.append(segment)
+            start = end
+        return cut
+
+    @staticmethod
+    def incremental(overlay_style: str) -> bool:
+        return render_overlay(overlay_style)[0] not in FINAL_ONLY_OVERLAY_STYLES
+
+    async def status(self, session_id: str) -> dict | None:
+        manifest = await asyncio.to_thread(self._load, session_id)
+        return self._status(manifest) if manifest else None
+
+    def _status(self, manifest: dict) -> dict:
+        return {
+            "frames": manifest["frames"],
+            "segments": len(manifest["segments"]),
+            "segments_done": sum(1 for s in manifest["segments"] if s["done"]),
+            "incremental": self.incremental(manifest["overlay_style"]),
+        }
+
+    # ── 세그먼트 인코딩 ──
+
+    def _start_segment(self, session_id: str, manifest: dict, segment: dict) -> None:
+        key = (session_id, segment["index"])
+        if key in self._tasks:
+            return
+        task = asyncio.create_task(self._encode_segment(session_id, manifest, segment))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    async def _encode_segment(
+        self, session_id: str, manifest: dict, segment: dict,
+    ) -> bool | None:
+        """세그먼트를 인코딩한다. 실패면 False, 다른 워커가 맡았거나 이미 끝났으면 None."""
+        if self._encode_slots is None:
+            self._encode_slots = asyncio.Semaphore(max(1, settings.session_segment_workers))
+        job_id = f"session:{session_id}:{segment['index']}"
+        governor = self.timelapse_service.governor
+        async with self._encode_slots:
+            if not await self._claim(session_id, segment["index"]):
+                return None
+            frames = await asyncio.to_thread(self._frames, session_id)
+            paths = [path for _, path in frames[segment["start"]:segment["end"]]]
+            output = self._segment_path(session_id, segment["index"])
+            # lease가 끝나 다른 워커가 이어받아도 서로의 임시 파일을 덮어쓰지 않게 워커별로
+            tmp_output = f"{output}.{self._worker_id}.tmp.mp4"
+            work_dir = f"{output}.{self._worker_id}.frames"
+            try:
+                input_args = await asyncio.to_thread(build_photo_input, paths, work_dir, "sequence")
+                # 녹화 중 미리 인코딩은 백그라운드 작업 — 렌더에 CPU를 양보한다
+                with governor.allocate(job_id, "segment", nice=settings.session_segment_nice):
+                    threads = governor.threads(job_id)
+                    cmd = [
+                        "ffmpeg", "-y", "-v", "error", *filter_thread_args(threads),
+                        "-threads", str(threads),
+                        *input_args,
+                        *await self._segment_filter_args(manifest),
+                        "-r", str(BASE_FPS),
+                        *with_threads(PHOTO_ENCODER_ARGS, threads),
+                        tmp_output,
+                    ]
+                    returncode, stderr_tail = await self._run(cmd, governor.preexec(job_id))
+            finally:
+                await asyncio.to_thread(shutil.rmtree, work_dir, True)
+
+            if returncode != 0:
+                logger.error(
+                    f"[session {session_id}] segment {segment['index']} failed: "
+                    f"{stderr_tail[-500:]}"
+                )
+                await self._update_segment(session_id, segment["index"], claim=None)
+                return False
+            await asyncio.to_thread(os.replace, tmp_output, output)
+
+        await self._update_segment(session_id, segment["index"], done=True, claim=None)
+        logger.info(
+            f"[session {session_id}] segment {segment['index']} encoded "
+            f"(frames {segment['start']}–{segment['end']})"
+        )
+        return True
+
+    async def _claim(self, session_id: str, index: int) -> bool:
+        """세그먼트를 이 워커가 맡는다. 이미 끝났거나 다른 워커가 lease 안에서 맡고 있으면 False."""
+        async with self._locked(session_id):
+            current = await asyncio.to_thread(self._load, session_id)
+            segment = next(s for s in current["segments"] if s["index"] == index)
+            if segment["done"] or self._claimed_elsewhere(segment):
+                return False
+            segment["claim"] = {"worker": self._worker_id, "at": time.time()}
+            await asyncio.to_thread(self._save, session_id, current)
+        return True
+
+    def _claimed_elsewhere(self, segment: dict) -> bool:
+        claim = segment.get("claim")
+        return bool(
+            claim and claim["worker"] != self._worker_id
+            and time.time() - claim["at"] < settings.session_segment_lease_seconds
+        )
+
+    async def _update_segment(self, session_id: str, index: int, **fields) -> None:
+        async with self._locked(session_id):
+            current = await asyncio.to_thread(self._load, session_id)
+            for segment in current["segments"]:
+                if segment["index"] == index:
+                    segment.update(fields)
+            await asyncio.to_thread(self._save, session_id, current)
+
+    async def _complete_segments(self, session_id: str) -> dict:
+        """모든 세그먼트가 done이 되면 매니페스트를 반환한다.
+
+        빠진 세그먼트(실패 / 재시작 / lease 만료)는 여기서 인코딩하고, 다른 워커가 인코딩 중인
+        세그먼트는 끝날 때까지 기다린다 — 쓰는 중인 세그먼트를 이어 붙이지 않도록.
+        """
+        while True:
+            current = await asyncio.to_thread(self._load, session_id)
+            pending = [s for s in current["segments"] if not s["done"]]
+            if not pending:
+                return current
+            waiting = False
+            for segment in pending:
+                encoded = await self._encode_segment(session_id, current, segment)
+                if encoded is False:
+                    raise RuntimeError(f"segment {segment['index']} failed")
+                waiting = waiting or encoded is None
+            if waiting:
+                await asyncio.sleep(SEGMENT_POLL_SECONDS)
+
+    async def _segment_filter_args(self, manifest: dict) -> list[str]:
+        """세그먼트 필터 인자 (미리 그린 오버레이 입력 포함) — 사진 타임랩스 렌더와 같은 합성."""
+        service = self.timelapse_service
+        _, scale_filter, pad_filter = service._get_crop_and_scale(manifest["aspect_ratio"])
+        vf = [f"{scale_filter}:force_original_aspect_ratio=decrease", pad_filter]
+        overlay_style, timer_mode = render_overlay(manifest["overlay_style"])
+        overlay_args = (
+            overlay_style, "", 0, 0, 0, timer_mode, 0, manifest["aspect_ratio"],
+        )
+        prerendered = await service._prerender_overlay(*overlay_args)
+        if prerendered is None:
+            prerendered = [], service._build_overlay_filters(*overlay_args)
+        overlays, overlay_filters = prerendered
+        vf.extend(overlay_filters)
+        return [
+            *overlay_input_args(overlays),
+            "-filter_complex", ";".join(overlay_graph(f"[0:v]{','.join(vf)}", overlays, "[out]")),
+            "-map", "[out]",
+        ]
+
+    async def _run(
+        self, cmd: list[str], preexec_fn: Callable[[], None] | None = None,
+    ) -> tuple[int, str]:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+            preexec_fn=preexec_fn,
+        )
+        try:
+            _, stderr = await process.communicate()
+        finally:
+            # 취소(세션 렌더 취소 / 대체)되면 FFmpeg도 멈춘다
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        tail = deque(stderr.decode(errors="replace").splitlines(), maxlen=STDERR_TAIL_LINES)
+        return process.returncode, "\n".join(tail)
+
+    # ── 종료 ──
+
+    async def finalize(
+        self, session_id: str, output_seconds: int, recording_seconds: int = 0,
+        lane: str = FREE_LANE, owner_id: str | None = None,
+    ) -> str | None:
+        """세션을 닫고 최종 타임랩스 작업을 만든다. 받은 프레임이 없으면 None.
+
+        미리 인코딩한 세션은 꼬리 세그먼트 + 이어 붙이기만 백그라운드로 돌리고,
+        종료 시점 값이 필요한 오버레이는 기존 사진 타임랩스 렌더(대기열, lane 레인)로 넘긴다.
+        owner_id는 세션 주인 (작업 취소 권한).
+        """
+        if not os.path.isdir(self._dir(session_id)):
+            return None
+        async with self._locked(session_id):
+            manifest = await asyncio.to_thread(self._load, session_id)
+            if not manifest or manifest["frames"] == 0 or manifest["finalized"]:
+                return None
+            manifest["finalized"] = True
+            tail = self._cut_segments(manifest, final=True)
+            await asyncio.to_thread(self._save, session_id, manifest)
+
+        overlay_style, timer_mode = render_overlay(manifest["overlay_style"])
+        if not self.incremental(manifest["overlay_style"]):
+            frames = await asyncio.to_thread(self._frames, session_id)
+            try:
+                task_id = await self.timelapse_service.create_task_from_photos(
+                    [fid for fid, _ in frames],
+                    output_seconds,
+                    manifest["aspect_ratio"],
+                    overlay_style=overlay_style,
+                    recording_seconds=recording_seconds,
+                    timer_mode=timer_mode,
+                    lane=lane,
+                    session_id=session_id,
+                    owner_id=owner_id,
+                )
+            except BaseException:
+                await self._reopen(session_id)
+                raise
+            await asyncio.to_thread(shutil.rmtree, self._dir(session_id), True)
+            return task_id
+
+        task_id = str(uuid.uuid4())
+        output_path = os.path.join(settings.upload_dir, f"{task_id}_timelapse.mp4")
+        try:
+            await self.timelapse_service.registry.save_task({
+                "task_id": task_id,
+                "session_id": session_id,
+                "owner_id": owner_id,
+                "output_seconds": output_seconds,
+                "aspect_ratio": manifest["aspect_ratio"],
+                "overlay_style": overlay_style,
+                "status": "processing",
+                "progress": 0,
+                "output_path": output_path,
+            })
+        except BaseException:
+            await self._reopen(session_id)
+            raise
+        finisher = asyncio.create_task(
+            self._finish(session_id, task_id, output_path, manifest, tail),
+        )
+        self._finishers.add(finisher)
+        finisher.add_done_callback(self._finishers.discard)
+        await self.timelapse_service.attach(task_id, finisher, session_id)
+        return task_id
+
+    async def _reopen(self, session_id: str) -> None:
+        """렌더 작업을 만들지 못한 finalize를 되돌린다 (대기열 포화 등 — 다시 종료할 수 있게)."""
+        async with self._locked(session_id):
+            manifest = await asyncio.to_thread(self._load, session_id)
+            if manifest:
+                manifest["finalized"] = False
+                await asyncio.to_thread(self._save, session_id, manifest)
+
+    async def _finish(
+        self, session_id: str, task_id: str, output_path: str, manifest: dict, tail: list[dict],
+    ) -> None:
+        registry = self.timelapse_service.registry
+        try:
+            for segment in tail:
+                self._start_segment(session_id, manifest, segment)
+            # 이 프로세스에서 돌고 있는 세그먼트는 기다리고, 나머지는 매니페스트로 맞춘다
+            running = [t for (sid, _), t in self._tasks.items() if sid == session_id]
+            await asyncio.gather(*running, return_exceptions=True)
+            current = await self._complete_segments(session_id)
+            await registry.update_task(task_id, progress=90)
+
+            list_path = os.path.join(self._dir(session_id), "segments.txt")
+            await asyncio.to_thread(_write_lines, list_path, [
+                f"file '{self._segment_path(session_id, segment['index'])}'\n"
+                for segment in current["segments"]
+            ])
+            returncode, stderr_tail = await self._run([
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-c", "copy", "-movflags", "+faststart",
+                output_path,
+            ])
+            if returncode != 0 or not os.path.exists(output_path):
+                await registry.update_task(task_id, status="failed", stderr_tail=stderr_tail)
+                logger.error(f"[{task_id}] session join failed: {stderr_tail[-500:]}")
+                return
+
+            await registry.update_task(task_id, status="completed", progress=100, eta_seconds=0)
+            await asyncio.to_thread(shutil.rmtree, self._dir(session_id), True)
+            logger.info(
+                f"[{task_id}] session {session_id} joined: "
+                f"{len(current['segments'])} segments, {current['frames']} frames"
+            )
+        except asyncio.CancelledError:
+            # 취소된 세션 렌더는 다시 마무리할 수 없으므로 세그먼트도 지운다.
+            # 돌고 있는 세그먼트 인코딩을 먼저 멈춰야 지운 디렉토리에 다시 쓰지 않는다
+            running = [t for (sid, _), t in self._tasks.items() if sid == session_id]
+            for t in running:
+                t.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            await asyncio.to_thread(shutil.rmtree, self._dir(session_id), True)
+            raise
+        except Exception as e:
+            await registry.update_task(task_id, status="failed")
+            logger.exception(f"[{task_id}] session finalize error: {e}")
+
+
+def _flock(path: str) -> int:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    return fd
+
+
+def _append_lines(path: str, lines: list[str]) -> None:
+    with open(path, "a") as f:
+        f.writelines(lines)
+
+
+def _write_lines(path: str, lines: list[str]) -> None:
+    with open(path, "w") as f:
+        f.writelines(lines)
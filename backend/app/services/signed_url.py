@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+import time
+from urllib.parse import quote
+
+from app.config import settings
+
+# 만료 시각을 이 단위로 올림 → 폴링마다 같은 URL이 나와 클라이언트/CDN 캐시가 맞는다
+EXPIRY_BUCKET_SECONDS = 300
+
+
+def sign(uri: str, expires: int, secret: str) -> str:
+    """nginx secure_link 서명: base64url(md5("{expires}{uri} {secret}")), 패딩 없음.
+
+    nginx 설정의 `secure_link_md5 "$secure_link_expires$uri $secret";`와 같은 값이다.
+    """
+    digest = hashlib.md5(f"{expires}{uri} {secret}".encode(), usedforsecurity=False).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def verify(uri: str, md5: str, expires: int, secret: str, now: float | None = None) -> bool:
+    """서명/만료 검증 (정적 서버 없이 테스트하거나 앱에서 직접 확인할 때)."""
+    if expires < (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(sign(uri, expires, secret), md5)
+
+
+def media_uri(file_path: str, prefix: str) -> str:
+    """upload_dir 아래 파일의 공개 경로 (prefix + upload_dir 기준 상대 경로)."""
+    relative = os.path.relpath(file_path, settings.upload_dir)
+    if relative.startswith(".."):
+        raise ValueError(f"{file_path} is outside upload_dir")
+    return f"{prefix.rstrip('/')}/{quote(relative)}"
+
+
+def signed_media_url(file_path: str, now: float | None = None) -> tuple[str, int]:
+    """정적 서버가 검증·전송할 서명 URL과 만료 시각(유닉스 초)."""
+    uri = media_uri(file_path, settings.media_url_prefix)
+    deadline = (now if now is not None else time.time()) + settings.media_url_ttl_seconds
+    expires = (int(deadline) // EXPIRY_BUCKET_SECONDS + 1) * EXPIRY_BUCKET_SECONDS
+    return f"{uri}?md5={sign(uri, expires, settings.media_url_secret)}&expires={expires}", expires
@@ -1,27 +1,146 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import math
 import os
+import re
+import shutil
+import time
 import uuid
+from collections import deque
 
 from app.config import settings
+from app.repositories.registry import Registry, get_registry
+from app.services.media_probe import media_probe
+from app.services.overlay_assets import (
+    FONT_PATH,
+    LABEL_FILL,
+    LABEL_SHADOW,
+    LABEL_SHADOW_OFFSET,
+    OVERLAY_ASSET_VERSION,
+    BoxLayer,
+    OverlayAssetCache,
+    OverlayInput,
+    TextLayer,
+    pillow_available,
+)
+from app.services.render_cache import RenderCache, hash_file, link_or_copy, sidecar_path
+from app.services.render_journal import RenderJournal
+from app.services.render_queue import FREE_LANE, QueueFullError, RenderJob, RenderQueue
+from app.services.resource_governor import ResourceGovernor, filter_thread_args, with_threads
 from app.services.upload_service import UploadService
 
 logger = logging.getLogger(__name__)
 
-task_store: dict[str, dict] = {}
-
 BASE_FPS = 30
 MAX_PICK_EVERY = 60  # 이 이상이면 뚝뚝 끊김 → fps 올려서 보상
+STDERR_TAIL_LINES = 40  # 진단용으로 보관할 stderr 마지막 줄 수
+PROGRESS_PERSIST_INTERVAL = 1.0  # 진행률을 저장소에 반영하는 최소 간격 (초)
+FRAME_ESTIMATE_MARGIN = 0.05  # 헤더 기반 프레임 수 추정의 허용 오차
+STREAMS_DIR_NAME = "streams"  # upload_dir 아래 HLS 출력 디렉토리
+STREAM_PLAYLIST_NAME = "index.m3u8"
+ACTIVE_STATUSES = ("queued", "processing")  # 취소 / 합류 / 대체 대상이 되는 상태
+JOURNAL_DIR_NAME = "render_journal"  # upload_dir 아래 작업 기록 (재시작 복구용)
+# 재시작 정리 대상: upload_dir 바로 아래의 작업별 출력 / 작업 디렉토리 ({task_id}_...)
+TASK_ARTIFACT_RE = re.compile(
+    r"^(?P<task_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})_"
+    r"(?:(?:.*_)?timelapse\..+|frames)$"
+)
+
+# 인코더 설정 — 렌더 캐시 키에 포함되므로 바꾸면 기존 캐시는 자동으로 무효화된다
+VIDEO_ENCODER_ARGS = [
+    "-c:v", "libx264",
+    "-profile:v", "high",
+    "-level", "4.1",
+    "-pix_fmt", "yuv420p",
+    "-threads", "0",
+    "-crf", "23",
+    "-maxrate", "5M",
+    "-bufsize", "10M",
+    "-preset", "ultrafast",
+]
+# 영상 필터 체인이 바뀌면 올린다 (렌더 캐시 키에 포함)
+VIDEO_PIPELINE_VERSION = 3
+PHOTO_ENCODER_ARGS = [
+    "-c:v", "libx264",
+    "-preset", "ultrafast",
+    "-crf", "23",
+    "-pix_fmt", "yuv420p",
+]
+
+WATERMARK_TEXT = "FocusTimelapse"  # 항상 표시 (좌하단)
+
+# 렌더 비용 추정(대기열 정렬)에서 해상도를 모를 때 가정하는 원본 크기
+DEFAULT_SOURCE_PIXELS = 1920 * 1080
+PHOTO_SOURCE_PIXELS = 4032 * 3024  # 렌더 파생본이 없는 12MP 폰 사진
+
+# 부가 출력 (같은 ffmpeg 그래프에서 본 출력과 함께 만든다) — 출력 파일 옆 접미사
+SIDE_OUTPUTS = {
+    "poster": ".poster.jpg",
+    "preview": ".preview.mp4",
+    "sprite": ".sprite.jpg",
+    "thumbnails": ".sprite.vtt",  # 스프라이트 타일 색인 (ffmpeg 출력이 아니라 렌더 후 작성)
+}
+POSTER_QUALITY = 3  # mjpeg -q:v (2~31, 낮을수록 고화질)
+PREVIEW_SECONDS = 3  # 미리보기 루프 길이
+PREVIEW_FPS = 10
+PREVIEW_WIDTH = 240
+PREVIEW_ENCODER_ARGS = [
+    "-c:v", "libx264",
+    "-preset", "ultrafast",
+    "-crf", "32",
+    "-pix_fmt", "yuv420p",
+]
+# 스크러빙용 스프라이트: 일정 간격 프레임을 축소해 한 장의 격자 JPEG로 (최대 타일 수 제한)
+SPRITE_TILE_WIDTH = 160
+SPRITE_COLUMNS = 10
+SPRITE_MAX_TILES = 100
+SPRITE_QUALITY = 5
+# WebVTT에서 스프라이트를 가리키는 상대 경로 — 색인과 같은 디렉토리의 /sprite로 풀린다
+SPRITE_VTT_IMAGE = "sprite"
+
+
+class RenderNotOwnedError(Exception):
+    """다른 프로세스(워커)가 맡고 있는 렌더 — 이 프로세스에서는 취소할 수 없다."""
 
 
 class TimelapseService:
     """타임랩스 변환 서비스."""
 
-    def __init__(self, upload_service: UploadService) -> None:
+    def __init__(self, upload_service: UploadService, registry: Registry | None = None) -> None:
         self.upload_service = upload_service
+        self.registry = registry or get_registry()
+        self.render_queue = RenderQueue(
+            self._run_job,
+            workers=settings.render_workers,
+            max_pending=settings.render_queue_max,
+            max_wait_seconds=settings.render_max_wait_seconds,
+        )
+        # 동시에 도는 FFmpeg 작업(렌더, 세션 세그먼트)에 코어 예산을 스레드 수로 나눠 준다
+        self.governor = ResourceGovernor(settings.render_cores or os.cpu_count() or 1)
+        self.render_cache = RenderCache(
+            os.path.join(settings.upload_dir, "render_cache"),
+            max_bytes=settings.render_cache_max_mb * 1024 * 1024,
+            max_age_seconds=settings.render_cache_max_age_hours * 3600,
+            sidecar_suffixes=tuple(SIDE_OUTPUTS.values()),
+            linked_dir=settings.upload_dir,
+        )
+        self.overlay_assets = OverlayAssetCache(
+            os.path.join(settings.upload_dir, "overlay_cache"),
+            max_age_seconds=settings.render_cache_max_age_hours * 3600,
+        )
+        # 같은 캐시 키로 렌더 중인 작업 (재시도 요청은 이 작업에 합류)
+        self._inflight: dict[str, str] = {}
+        # 세션(sessionId)별 진행 중인 렌더 — 같은 세션의 새 렌더가 들어오면 이전 것을 취소
+        self._session_tasks: dict[str, str] = {}
+        # 대기열 밖에서 도는 작업 (세션 마무리) — 취소할 수 있도록 등록해 둔다
+        self._attached: dict[str, asyncio.Task] = {}
+        # 대기열에 들어간 작업의 디스크 기록 — 재시작 후 recover()가 다시 대기열에 넣는다
+        self.journal = RenderJournal(os.path.join(settings.upload_dir, JOURNAL_DIR_NAME))
+        # drain() 중이면 취소된 렌더를 지우지 않고 다음 프로세스에 넘긴다 (_checkpoint)
+        self._draining = False
 
     async def create_task(
         self,
@@ -29,18 +148,33 @@ class TimelapseService:
         output_seconds: int,
         recording_seconds: float,
         aspect_ratio: str = "9:16",
+        stream: bool = False,
+        lane: str = FREE_LANE,
+        session_id: str | None = None,
+        owner_id: str | None = None,
     ) -> str:
-        file_info = self.upload_service.get_file(file_id)
+        """영상 → 타임랩스 작업. stream이면 렌더 중에 HLS 조각도 함께 쓴다 (stream_playlist).
+
+        lane은 대기열 레인 (render_lane — 유료 / 체험 구독자는 priority).
+        session_id가 있으면 같은 세션의 이전 렌더를 취소한다 (_supersede).
+        owner_id는 요청한 유저 (비로그인이면 None) — 취소 권한 확인과 렌더 합류 범위에 쓴다.
+        """
+        file_info = await self.upload_service.get_file(file_id)
         if not file_info:
             raise FileNotFoundError(f"File {file_id} not found")
 
+        cache_key = self._video_cache_key(
+            await self._content_hash(file_info), output_seconds, recording_seconds, aspect_ratio,
+            stream,
+        )
+
         task_id = str(uuid.uuid4())
         output_path = os.path.join(settings.upload_dir, f"{task_id}_timelapse.mp4")
 
         total_frames = file_info.get("total_frames", 0)
         duration = file_info.get("duration", 0.0)
 
-        task_store[task_id] = {
+        task = {
             "task_id": task_id,
             "file_id": file_id,
             "output_seconds": output_seconds,
@@ -48,23 +182,559 @@ class TimelapseService:
             "aspect_ratio": aspect_ratio,
             "total_frames": total_frames,
             "duration": duration,
-            "status": "processing",
+            "status": "queued",
             "progress": 0,
             "output_path": output_path,
+            "cache_key": cache_key,
+            "stream": stream,
+            "lane": lane,
+            "session_id": session_id,
+            "owner_id": owner_id,
+        }
+        reused = await self._reuse_render(task)
+        if reused:
+            return await self._supersede(session_id, reused)
+
+        self.render_queue.reserve(task_id)
+
+        cost = self._video_cost(file_info, output_seconds, [aspect_ratio])
+        await self._enqueue(task, RenderJob(task_id, "video", {
+            "input_path": file_info["file_path"],
+            "output_path": output_path,
+            "output_seconds": output_seconds,
+            "total_frames": total_frames,
+            "duration": duration,
+            "recording_seconds": recording_seconds,
+            "aspect_ratio": aspect_ratio,
+            "frames_exact": file_info.get("frames_exact", True),
+            "stream_dir": self.stream_dir(task_id) if stream else None,
+        }, cost=cost, lane=lane))
+
+        return await self._supersede(session_id, task_id)
+
+    async def create_multi_task(
+        self,
+        file_id: str,
+        output_seconds: int,
+        recording_seconds: float,
+        aspect_ratios: list[str],
+        stream: bool = False,
+        lane: str = FREE_LANE,
+        session_id: str | None = None,
+        owner_id: str | None = None,
+    ) -> str:
+        """한 번의 디코딩으로 여러 비율을 함께 출력하는 작업을 만든다.
+
+        비율마다 단일 요청과 같은 캐시 키를 쓰므로 캐시에 있는 비율은 그대로 연결하고
+        나머지만 한 ffmpeg 그래프(샘플링 1회 → split → 비율별 crop/scale)로 렌더한다.
+        출력 목록은 task["outputs"]에, 첫 비율은 기존 필드(output_path 등)에도 기록한다.
+        stream이면 렌더하는 첫 비율을 HLS로도 내보낸다. 같은 비율 조합의 렌더가 진행 중이면
+        create_task처럼 그 작업에 합류한다 (task["cache_key"] = 비율별 캐시 키의 조합).
+        """
+        file_info = await self.upload_service.get_file(file_id)
+        if not file_info:
+            raise FileNotFoundError(f"File {file_id} not found")
+        content_hash = await self._content_hash(file_info)
+
+        task_id = str(uuid.uuid4())
+        outputs = [
+            {
+                "aspect_ratio": ratio,
+                "output_path": os.path.join(
+                    settings.upload_dir,
+                    f"{task_id}_{ratio.replace(':', 'x')}_timelapse.mp4",
+                ),
+                "cache_key": self._video_cache_key(
+                    content_hash, output_seconds, recording_seconds, ratio, stream,
+                ),
+            }
+            for ratio in aspect_ratios
+        ]
+        total_frames = file_info.get("total_frames", 0)
+        duration = file_info.get("duration", 0.0)
+        task = {
+            "task_id": task_id,
+            "file_id": file_id,
+            "output_seconds": output_seconds,
+            "recording_seconds": recording_seconds,
+            "aspect_ratio": outputs[0]["aspect_ratio"],
+            "total_frames": total_frames,
+            "duration": duration,
+            "status": "queued",
+            "progress": 0,
+            "output_path": outputs[0]["output_path"],
+            "outputs": outputs,
+            "cache_key": self.render_cache.make_key(
+                "multi", [output["cache_key"] for output in outputs], {},
+            ),
+            "stream": stream,
+            "lane": lane,
+            "session_id": session_id,
+            "owner_id": owner_id,
         }
 
-        asyncio.create_task(
-            self._run_ffmpeg(
-                task_id, file_info["file_path"], output_path,
-                output_seconds, total_frames, duration,
-                recording_seconds, aspect_ratio,
+        joined = await self._join_inflight(task)
+        if joined:
+            return await self._supersede(session_id, joined)
+
+        pending: list[dict] = []
+        for output in outputs:
+            hit = await asyncio.to_thread(
+                self.render_cache.materialize, output["cache_key"], output["output_path"],
             )
+            if not hit:
+                pending.append(output)
+        if not pending:
+            task.update(status="completed", progress=100, cached=True)
+            await self.registry.save_task(task)
+            return await self._supersede(session_id, task_id)
+
+        cost = self._video_cost(
+            file_info, output_seconds, [output["aspect_ratio"] for output in pending],
         )
+        try:
+            self.render_queue.reserve(task_id)
+            await self._enqueue(task, RenderJob(task_id, "video", {
+                "input_path": file_info["file_path"],
+                "output_path": pending[0]["output_path"],
+                "output_seconds": output_seconds,
+                "total_frames": total_frames,
+                "duration": duration,
+                "recording_seconds": recording_seconds,
+                "aspect_ratio": pending[0]["aspect_ratio"],
+                "frames_exact": file_info.get("frames_exact", True),
+                "variants": [[o["aspect_ratio"], o["output_path"]] for o in pending],
+                "stream_dir": self.stream_dir(task_id) if stream else None,
+            }, cost=cost, lane=lane))
+        except Exception:
+            # 캐시에서 연결해 둔 비율의 출력(부가 출력 포함)을 되돌린다
+            hits = [output["output_path"] for output in outputs if output not in pending]
+            await asyncio.to_thread(self._discard_outputs, task_id, hits)
+            raise
+
+        return await self._supersede(session_id, task_id)
+
+    async def get_task(self, task_id: str) -> dict | None:
+        return await self.registry.get_task(task_id)
+
+    async def output_hash(self, task: dict, output_path: str) -> str:
+        """완성된 출력 파일의 sha256 (다운로드 ETag). 처음 한 번 계산해 작업 레코드에 남긴다."""
+        hashes = task.setdefault("output_hashes", {})
+        name = os.path.basename(output_path)
+        if name not in hashes:
+            hashes[name] = await asyncio.to_thread(hash_file, output_path)
+            await self.registry.update_task(task["task_id"], output_hashes=hashes)
+        return hashes[name]
 
+    def side_output(self, task: dict, kind: str) -> str | None:
+        """완성된 작업의 부가 출력(poster | preview | sprite | thumbnails) 경로. 없으면 None.
+
+        여러 비율 작업은 부가 출력을 만든 비율(렌더한 첫 비율 또는 캐시 복원분)을 찾는다.
+        """
+        if task.get("status") != "completed":
+            return None
+        for output in [task, *(task.get("outputs") or [])]:
+            path = sidecar_path(output["output_path"], SIDE_OUTPUTS[kind])
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def stream_dir(task_id: str) -> str:
+        return os.path.join(settings.upload_dir, STREAMS_DIR_NAME, task_id)
+
+    def stream_playlist(self, task: dict) -> str | None:
+        """스트리밍 작업의 HLS 플레이리스트 경로. 첫 조각이 나오기 전이면 None."""
+        if not task.get("stream"):
+            return None
+        playlist = os.path.join(self.stream_dir(task["task_id"]), STREAM_PLAYLIST_NAME)
+        return playlist if os.path.exists(playlist) else None
+
+    async def update_task(self, task_id: str, **fields) -> dict | None:
+        return await self.registry.update_task(task_id, **fields)
+
+    def get_queue_position(self, task_id: str) -> int | None:
+        """대기 중인 작업의 대기 순번 (1부터). 대기 중이 아니면 None."""
+        return self.render_queue.position(task_id)
+
+    # ── 취소 ──
+
+    async def cancel_task(self, task_id: str) -> dict | None:
+        """작업을 취소한다: 대기열에서 빼거나 실행 중인 FFmpeg를 종료하고 남은 출력을 지운다.
+
+        취소 후 작업 레코드를 반환한다 (없으면 None, 이미 끝난 작업은 그대로).
+        이 프로세스의 대기열 / 세션 마무리에 없는 작업은 다른 워커가 출력을 쓰고 있을 수 있으므로
+        건드리지 않고 RenderNotOwnedError를 낸다.
+        """
+        task = await self.registry.get_task(task_id)
+        if task is None or task["status"] not in ACTIVE_STATUSES:
+            return task
+        if not self.render_queue.contains(task_id) and task_id not in self._attached:
+            raise RenderNotOwnedError(task_id)
+
+        running = self.render_queue.cancel(task_id)
+        if running is None and task_id in self._attached:
+            running = self._attached[task_id]
+            running.cancel()
+        if running is not None:
+            # FFmpeg 종료와 작업 디렉토리 정리(각 단계의 finally)가 끝날 때까지 기다린다
+            await asyncio.wait({running})
+        for key, holder in list(self._inflight.items()):
+            if holder == task_id:
+                del self._inflight[key]
+        self._release_session(task.get("session_id"), task_id)
+        await asyncio.to_thread(self.journal.release, task_id)
+        await asyncio.to_thread(
+            self._discard_outputs, task_id,
+            [output["output_path"] for output in [task, *(task.get("outputs") or [])]],
+        )
+        logger.info(f"[{task_id}] cancelled while {task['status']}")
+        return await self.registry.update_task(task_id, status="cancelled", eta_seconds=0)
+
+    async def attach(self, task_id: str, job: asyncio.Task, session_id: str | None = None) -> None:
+        """대기열 밖에서 도는 작업(세션 마무리)을 cancel_task로 취소할 수 있게 등록한다."""
+        self._attached[task_id] = job
+
+        def detach(_: asyncio.Task) -> None:
+            self._attached.pop(task_id, None)
+            self._release_session(session_id, task_id)
+
+        job.add_done_callback(detach)
+        await self._supersede(session_id, task_id)
+
+    async def _supersede(self, session_id: str | None, task_id: str) -> str:
+        """같은 세션의 이전 렌더를 취소하고 이 작업을 세션의 렌더로 기록한다. task_id를 반환."""
+        if not session_id:
+            return task_id
+        previous = self._session_tasks.pop(session_id, None)
+        if previous and previous != task_id:
+            logger.info(f"[{previous}] superseded by {task_id} (session {session_id})")
+            try:
+                await self.cancel_task(previous)
+            except RenderNotOwnedError:
+                logger.warning(f"[{previous}] not owned by this process, left running")
+        task = await self.registry.get_task(task_id)
+        if task and task["status"] in ACTIVE_STATUSES:
+            self._session_tasks[session_id] = task_id
         return task_id
 
-    def get_task(self, task_id: str) -> dict | None:
-        return task_store.get(task_id)
+    def _release_session(self, session_id: str | None, task_id: str) -> None:
+        if session_id and self._session_tasks.get(session_id) == task_id:
+            del self._session_tasks[session_id]
+
+    def _discard_outputs(self, task_id: str, output_paths: list[str]) -> None:
+        """작업의 출력(본 출력, 부가 출력, HLS 조각)과 남은 작업 디렉토리를 지운다."""
+        for path in output_paths:
+            for leftover in [path, *(sidecar_path(path, s) for s in SIDE_OUTPUTS.values())]:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(leftover)
+            shutil.rmtree(f"{path}.parts", ignore_errors=True)
+        shutil.rmtree(self.stream_dir(task_id), ignore_errors=True)
+        shutil.rmtree(os.path.join(settings.upload_dir, f"{task_id}_frames"), ignore_errors=True)
+
+    async def _enqueue(self, task: dict, job: RenderJob) -> None:
+        """작업 레코드를 저장하고 기록한 뒤 대기열에 넣는다 (기록이 있어야 재시작 후 복구된다).
+
+        호출 측이 render_queue.reserve로 자리를 잡아 둔다. 그래도 넣지 못하면 (준비 중에 종료
+        시작, 저장 실패) 레코드 / 진행 중 표시 / 기록을 되돌려 재시도가 없는 작업에 합류하지
+        않게 한다.
+        """
+        cache_key = task.get("cache_key")
+        try:
+            await self.registry.save_task(task)
+            if cache_key:
+                self._inflight[cache_key] = job.task_id
+            await asyncio.to_thread(self.journal.record, task, job)
+            self.render_queue.submit(job)
+        except Exception:
+            self.render_queue.unreserve(job.task_id)
+            if cache_key and self._inflight.get(cache_key) == job.task_id:
+                del self._inflight[cache_key]
+            await asyncio.to_thread(self.journal.release, job.task_id)
+            await self.registry.delete_task(job.task_id)
+            raise
+
+    # ── 재시작 복구 ──
+
+    async def recover(self) -> dict[str, int]:
+        """시작 시 복구: 주인 프로세스가 죽은 작업 기록을 넘겨받아 다시 대기열에 넣거나 실패로
+        기록하고, 주인 없는 부분 출력 / 작업 디렉토리를 지운다. 처리 건수를 반환한다.
+        """
+        stats = {"requeued": 0, "failed": 0, "finished": 0, "removed": 0}
+        for entry in await asyncio.to_thread(self.journal.claim_orphans):
+            # 실행 중에 끊긴 작업만 끊긴 횟수에 센다 (대기 중 / 정상 종료 때 넘겨받은 것 제외).
+            # started가 없는 기록(이전 버전)은 실행 중이었다고 본다
+            interrupted = entry.get("started", True) and not entry.get("checkpointed")
+            attempts = entry["attempts"] + (1 if interrupted else 0)
+            stats[await self._recover_job(entry["job"], entry["task"], attempts)] += 1
+        stats["removed"] = await self._sweep_artifacts()
+        if any(stats.values()):
+            logger.info(f"render recovery: {stats}")
+        return stats
+
+    async def drain(self, grace_seconds: float) -> dict[str, int]:
+        """종료 준비: 새 작업을 받지 않고 실행 중인 렌더가 끝나기를 grace_seconds까지 기다린다.
+
+        그때까지 끝나지 않은 렌더는 FFmpeg를 멈추고 작업 기록을 queued로 남겨(_checkpoint)
+        다음 프로세스의 recover()가 다시 대기열에 넣게 한다. 대기 중인 작업은 꺼내지 않고
+        checkpointed로 다시 기록해 넘긴다. 대기열 밖의 세션 마무리는 이어 받을 수 없으므로
+        실패로 기록한다.
+        """
+        self.render_queue.close()
+        self._draining = True
+        attached = dict(self._attached)
+        running = {*self.render_queue.running_tasks(), *attached.values()}
+        if running:
+            logger.info(f"draining {len(running)} running render(s), up to {grace_seconds}s")
+            _, unfinished = await asyncio.wait(running, timeout=grace_seconds)
+        else:
+            unfinished = set()
+        for job in unfinished:
+            job.cancel()
+        if unfinished:
+            await asyncio.wait(unfinished)
+        for task_id, job in attached.items():
+            if job in unfinished:
+                await self.registry.update_task(
+                    task_id, status="failed", stderr_tail="session render interrupted by shutdown",
+                )
+        for job in self.render_queue.pending_jobs():
+            # 배포마다 넘겨지는 대기 작업이 끊긴 횟수에 쌓이지 않도록
+            task = await self.registry.get_task(job.task_id)
+            if task is not None:
+                await asyncio.to_thread(
+                    self.journal.record, task, job, task.get("recovered", 0), checkpointed=True,
+                )
+        stats = {
+            "finished": len(running) - len(unfinished),
+            "checkpointed": len(unfinished) - sum(job in unfinished for job in attached.values()),
+            "handed_over": self.render_queue.pending_count,
+        }
+        logger.info(f"render drain: {stats}")
+        return stats
+
+    async def _checkpoint(self, job: RenderJob) -> None:
+        """유예 시간을 넘겨 멈춘 렌더를 다음 프로세스가 처음부터 다시 하도록 기록해 둔다."""
+        task = await self.registry.update_task(
+            job.task_id, status="queued", progress=0, speed=None, eta_seconds=None,
+        )
+        if task is not None:
+            await asyncio.to_thread(
+                self.journal.record, task, job, task.get("recovered", 0), checkpointed=True,
+            )
+        logger.info(f"[{job.task_id}] checkpointed for the next process")
+
+    async def _recover_job(self, job: RenderJob, recorded: dict, attempts: int) -> str:
+        """중단된 작업 하나를 처리한다: requeued | failed | finished (이미 끝난 작업)."""
+        task = await self.registry.get_task(job.task_id)
+        if task is not None and task["status"] not in ACTIVE_STATUSES:
+            # 끝난 뒤 기록을 지우기 전에 죽은 경우
+            await asyncio.to_thread(self.journal.release, job.task_id)
+            return "finished"
+        # 메모리 저장소면 레코드가 사라졌으므로 기록해 둔 것으로 되살린다
+        task = task or recorded
+        variants = job.params.get("variants") or [[None, job.params["output_path"]]]
+        await asyncio.to_thread(
+            self._discard_outputs, job.task_id, [path for _, path in variants],
+        )
+        inputs = job.params.get("photo_paths") or [job.params.get("input_path")]
+        inputs_exist = await asyncio.to_thread(
+            lambda: all(path and os.path.exists(path) for path in inputs),
+        )
+
+        if attempts > settings.render_recovery_max_attempts:
+            reason = f"render interrupted by restart {attempts} times"
+        elif not inputs_exist:
+            reason = "render input missing after restart"
+        else:
+            task.update(
+                status="queued", progress=0, speed=None, eta_seconds=None, recovered=attempts,
+            )
+            await self.registry.save_task(task)
+            await asyncio.to_thread(self.journal.record, task, job, attempts)
+            try:
+                self.render_queue.submit(job)
+            except QueueFullError:
+                reason = "render queue full during restart recovery"
+            else:
+                if task.get("cache_key"):
+                    self._inflight[task["cache_key"]] = job.task_id
+                if task.get("session_id"):
+                    self._session_tasks[task["session_id"]] = job.task_id
+                logger.info(f"[{job.task_id}] re-queued after restart (attempt {attempts})")
+                return "requeued"
+
+        task.update(status="failed", stderr_tail=reason)
+        await self.registry.save_task(task)
+        await asyncio.to_thread(self.journal.release, job.task_id)
+        logger.warning(f"[{job.task_id}] {reason}")
+        return "failed"
+
+    async def _sweep_artifacts(self) -> int:
+        """주인 없는 작업 파일을 지우고 지운 개수를 반환한다.
+
+        기록이 남은 작업(이 프로세스가 다시 넣은 작업, 다른 워커가 돌리는 작업)의 파일은 두고,
+        나머지 중 작업 디렉토리(사진 입력 목록, 분할 조각)는 항상, 출력(본 출력, 부가 출력,
+        HLS 조각)은 작업 레코드가 없거나 실패 / 취소된 작업의 것만 지운다.
+        """
+        if not os.path.isdir(settings.upload_dir):
+            return 0
+        journaled = await asyncio.to_thread(self.journal.task_ids)
+        artifacts: dict[str, list[str]] = {}
+        for name in await asyncio.to_thread(os.listdir, settings.upload_dir):
+            match = TASK_ARTIFACT_RE.match(name)
+            if match and match["task_id"] not in journaled:
+                path = os.path.join(settings.upload_dir, name)
+                artifacts.setdefault(match["task_id"], []).append(path)
+        stream_root = os.path.join(settings.upload_dir, STREAMS_DIR_NAME)
+        if os.path.isdir(stream_root):
+            for task_id in await asyncio.to_thread(os.listdir, stream_root):
+                if task_id not in journaled:
+                    artifacts.setdefault(task_id, []).append(self.stream_dir(task_id))
+
+        removed = 0
+        for task_id, paths in artifacts.items():
+            task = await self.registry.get_task(task_id)
+            orphaned = task is None or task["status"] in ("failed", "cancelled")
+            for path in paths:
+                if orphaned or path.endswith((".parts", "_frames")):
+                    await asyncio.to_thread(_remove_path, path)
+                    removed += 1
+        return removed
+
+    async def cache_stats(self) -> dict:
+        stats = await asyncio.to_thread(self.render_cache.stats)
+        return {**stats, "inflight": len(self._inflight)}
+
+    def resource_stats(self) -> dict:
+        """코어 예산과 작업별 스레드 배분, 대기열 상태."""
+        return {
+            **self.governor.stats(),
+            "workers": self.render_queue.workers,
+            "running": self.render_queue.running_count,
+            "pending": self.render_queue.pending_count,
+            "pending_by_lane": self.render_queue.pending_by_lane(),
+        }
+
+    def _video_cache_key(
+        self,
+        content_hash: str,
+        output_seconds: int,
+        recording_seconds: float,
+        aspect_ratio: str,
+        stream: bool = False,
+    ) -> str:
+        params = {
+            "output_seconds": output_seconds,
+            "recording_seconds": recording_seconds,
+            "aspect_ratio": aspect_ratio,
+            "encoder": VIDEO_ENCODER_ARGS,
+            "pipeline": VIDEO_PIPELINE_VERSION,
+            "sampling": [
+                settings.sparse_sampling,
+                settings.sparse_min_pick_every,
+                settings.sparse_keyframe_tolerance,
+            ],
+        }
+        if stream:
+            # 스트리밍 출력은 조각 경계마다 키프레임을 강제하므로 인코딩 결과가 다르다
+            params["stream_keyframes"] = settings.stream_segment_seconds
+        return self.render_cache.make_key("video", [content_hash], params)
+
+    async def _content_hash(self, file_info: dict) -> str:
+        """업로드 시 계산해 둔 내용 해시. 없으면 (이전 업로드) 파일에서 계산한다."""
+        content_hash = file_info.get("content_hash")
+        if not content_hash:
+            content_hash = await asyncio.to_thread(hash_file, file_info["file_path"])
+        return content_hash
+
+    async def _reuse_render(self, task: dict) -> str | None:
+        """같은 캐시 키의 결과가 있으면 재사용하고 task_id를 반환한다.
+
+        - 같은 유저의 렌더 중인 동일 요청이 있으면 그 작업 ID (클라이언트 재시도). 다른 유저의
+          작업에 합류하면 서로의 렌더를 취소할 수 있게 되므로 합류하지 않는다
+        - 캐시에 완성본이 있으면 즉시 completed 상태의 새 작업
+        """
+        cache_key = task["cache_key"]
+        joined = await self._join_inflight(task)
+        if joined:
+            return joined
+
+        hit = await asyncio.to_thread(
+            self.render_cache.materialize, cache_key, task["output_path"],
+        )
+        if not hit:
+            return None
+        task.update(status="completed", progress=100, cached=True)
+        await self.registry.save_task(task)
+        return task["task_id"]
+
+    async def _join_inflight(self, task: dict) -> str | None:
+        """같은 유저의 같은 캐시 키 렌더가 대기 / 진행 중이면 그 작업 ID."""
+        cache_key = task["cache_key"]
+        inflight_id = self._inflight.get(cache_key)
+        if not inflight_id:
+            return None
+        inflight = await self.registry.get_task(inflight_id)
+        if (
+            inflight
+            and inflight["status"] in ACTIVE_STATUSES
+            and inflight.get("owner_id") == task.get("owner_id")
+        ):
+            logger.info(f"[{inflight_id}] joined in-flight render ({cache_key[:12]})")
+            return inflight_id
+        return None
+
+    async def _run_job(self, job: RenderJob) -> None:
+        """렌더 워커가 대기열에서 꺼낸 작업을 실행한다."""
+        task = await self.registry.update_task(job.task_id, status="processing")
+        if task is None:
+            return
+        await asyncio.to_thread(
+            self.journal.record, task, job, task.get("recovered", 0), started=True,
+        )
+        cache_key = task.get("cache_key")
+        # 곧 함께 돌 작업 수 (이 작업 포함, 워커 수 이하)로 코어 예산을 나눈다
+        demand = min(
+            self.render_queue.workers,
+            self.render_queue.running_count + self.render_queue.pending_count,
+        )
+
+        checkpointed = False
+        try:
+            with self.governor.allocate(
+                job.task_id, "render", demand=demand, nice=settings.render_nice,
+            ):
+                if job.kind == "video":
+                    await self._run_ffmpeg(job.task_id, **job.params)
+                elif job.kind == "photos":
+                    await self._run_ffmpeg_from_photos(job.task_id, **job.params)
+                else:
+                    await self.registry.update_task(job.task_id, status="failed")
+                    logger.error(f"[{job.task_id}] unknown render job kind: {job.kind}")
+                    return
+
+            done = await self.registry.get_task(job.task_id)
+            if done and done["status"] == "completed":
+                # 다운로드 ETag용 내용 해시를 미리 계산 (첫 다운로드가 기다리지 않도록)
+                for output in done.get("outputs") or [done]:
+                    await self.output_hash(done, output["output_path"])
+                if done.get("outputs"):
+                    for output in done["outputs"]:
+                        await self.render_cache.store(output["cache_key"], output["output_path"])
+                elif cache_key:
+                    await self.render_cache.store(cache_key, done["output_path"])
+        except asyncio.CancelledError:
+            if self._draining:
+                checkpointed = True
+                await self._checkpoint(job)
+            raise
+        finally:
+            if cache_key and self._inflight.get(cache_key) == job.task_id:
+                del self._inflight[cache_key]
+            self._release_session(task.get("session_id"), job.task_id)
+            if not checkpointed:
+                await asyncio.to_thread(self.journal.release, job.task_id)
 
     async def create_task_from_photos(
         self,
@@ -77,38 +747,113 @@ class TimelapseService:
         study_minutes: int = 0,
         recording_seconds: int = 0,
         timer_mode: str = "countdown",
+        lane: str = FREE_LANE,
+        session_id: str | None = None,
+        owner_id: str | None = None,
     ) -> str:
         """저장된 사진 ID 배열로 타임랩스 영상 생성 태스크를 만든다."""
+        infos = await self.upload_service.get_files(file_ids)
         photo_paths: list[str] = []
+        content_hashes: list[str] = []
+        output_width, output_height = self._output_size(aspect_ratio)
+        # 예상 비용 (Mpx 프레임): 사진 디코딩 + 사진 한 장당 출력 프레임 하나 인코딩
+        decode_pixels = 0
         for fid in file_ids:
-            info = self.upload_service.get_file(fid)
+            info = infos.get(fid)
             if not info:
                 raise FileNotFoundError(f"Photo {fid} not found")
-            photo_paths.append(info["file_path"])
+            # 렌더용 파생본이 있으면 그것을 읽는다 (원본 12MP 디코딩 생략)
+            render_path = info.get("render_path")
+            content_hash = await self._content_hash(info)
+            if render_path and os.path.exists(render_path):
+                photo_paths.append(render_path)
+                content_hashes.append(f"{content_hash}:render")
+                decode_pixels += output_width * output_height
+            else:
+                photo_paths.append(info["file_path"])
+                content_hashes.append(content_hash)
+                decode_pixels += PHOTO_SOURCE_PIXELS
+
+        cache_key = self.render_cache.make_key(
+            "photos",
+            content_hashes,
+            {
+                "output_seconds": output_seconds,
+                "aspect_ratio": aspect_ratio,
+                "overlay_style": overlay_style,
+                "overlay_text": overlay_text,
+                "streak": streak,
+                "study_minutes": study_minutes,
+                "recording_seconds": recording_seconds,
+                "timer_mode": timer_mode,
+                "encoder": PHOTO_ENCODER_ARGS,
+                # 입력 방식 / 오버레이 그리는 방식이 바뀌면 출력 픽셀도 바뀐다
+                "input_mode": settings.photo_input_mode,
+                "overlay": (
+                    OVERLAY_ASSET_VERSION
+                    if settings.overlay_prerender and pillow_available() else "drawtext"
+                ),
+            },
+        )
 
         task_id = str(uuid.uuid4())
         output_path = os.path.join(settings.upload_dir, f"{task_id}_timelapse.mp4")
 
-        task_store[task_id] = {
+        task = {
             "task_id": task_id,
             "file_ids": file_ids,
             "output_seconds": output_seconds,
             "aspect_ratio": aspect_ratio,
             "overlay_style": overlay_style,
-            "status": "processing",
+            "status": "queued",
             "progress": 0,
             "output_path": output_path,
+            "cache_key": cache_key,
+            "lane": lane,
+            "session_id": session_id,
+            "owner_id": owner_id,
         }
+        reused = await self._reuse_render(task)
+        if reused:
+            return await self._supersede(session_id, reused)
 
-        asyncio.create_task(
-            self._run_ffmpeg_from_photos(
-                task_id, photo_paths, output_path, output_seconds, aspect_ratio,
-                overlay_style, overlay_text, streak,
-                study_minutes, recording_seconds, timer_mode,
-            )
-        )
+        self.render_queue.reserve(task_id)
 
-        return task_id
+        cost = (decode_pixels + len(photo_paths) * output_width * output_height) / 1e6
+        await self._enqueue(task, RenderJob(task_id, "photos", {
+            "photo_paths": photo_paths,
+            "output_path": output_path,
+            "output_seconds": output_seconds,
+            "aspect_ratio": aspect_ratio,
+            "overlay_style": overlay_style,
+            "overlay_text": overlay_text,
+            "streak": streak,
+            "study_minutes": study_minutes,
+            "recording_seconds": recording_seconds,
+            "timer_mode": timer_mode,
+        }, cost=cost, lane=lane))
+
+        return await self._supersede(session_id, task_id)
+
+    def _video_cost(
+        self, file_info: dict, output_seconds: int, aspect_ratios: list[str],
+    ) -> float:
+        """영상 렌더의 예상 비용 (Mpx 프레임) — 원본 디코딩 + 비율별 출력 인코딩.
+
+        출력 프레임 수는 _calc_timelapse_params의 case / 출력 fps로, 원본 해상도는 업로드 때
+        probe한 값으로 (없으면 1080p 가정) 계산한다. 대기열에서 작은 작업을 먼저 꺼내는 데만
+        쓰므로 상대적인 크기만 맞으면 된다.
+        """
+        total_frames = file_info.get("total_frames") or int(
+            file_info.get("duration", 0) * BASE_FPS
+        )
+        case, _, output_fps = self._calc_timelapse_params(total_frames, output_seconds)
+        output_frames = total_frames if case == "case2" else output_fps * output_seconds
+        source_pixels = (file_info.get("width") or 0) * (file_info.get("height") or 0)
+        output_pixels = sum(w * h for w, h in map(self._output_size, aspect_ratios))
+        return (
+            total_frames * (source_pixels or DEFAULT_SOURCE_PIXELS) + output_frames * output_pixels
+        ) / 1e6
 
     # ── 타임랩스 파라미터 계산 ──
 
@@ -199,6 +944,12 @@ class TimelapseService:
         }
         return configs.get(aspect_ratio, configs["16:9"])
 
+    def _output_size(self, aspect_ratio: str) -> tuple[int, int]:
+        """비율별 출력 해상도 (scale 필터의 W:H)."""
+        _, scale_filter, _ = self._get_crop_and_scale(aspect_ratio)
+        width, height = scale_filter.removeprefix("scale=").split(":")
+        return int(width), int(height)
+
     # ── FFmpeg 실행 ──
 
     async def _run_ffmpeg(
@@ -211,92 +962,470 @@ class TimelapseService:
         duration: float,
         recording_seconds: float,
         aspect_ratio: str = "9:16",
+        frames_exact: bool = True,
+        variants: list[list[str]] | None = None,
+        stream_dir: str | None = None,
     ) -> None:
-        task = task_store[task_id]
+        """영상 → 타임랩스. variants=[[비율, 출력 경로], ...]이면 한 번 디코딩해 모두 출력한다.
+
+        stream_dir이 있으면 첫 출력을 tee로 HLS(fMP4 조각)에도 써서 렌더 중에 재생할 수 있다.
+        """
+        variants = variants or [[aspect_ratio, output_path]]
+        aspect_ratios = [ratio for ratio, _ in variants]
+        output_paths = [path for _, path in variants]
         try:
-            # 프레임수/길이 파악 (업로드 시 실패했을 경우 재시도)
-            if total_frames <= 0 or duration <= 0:
-                total_frames, duration = await self._probe_clean(input_path, recording_seconds)
+            # 프레임수/길이 파악 (업로드 시 실패했거나 추정값인 경우)
+            if total_frames <= 0 or duration <= 0 or not frames_exact:
+                total_frames, duration = await self._resolve_source_frames(
+                    input_path, output_seconds, recording_seconds,
+                )
                 logger.info(f"[{task_id}] probed: frames={total_frames}, duration={duration}s")
 
             # recordingSeconds가 0이면 ffprobe duration으로 대체
             if recording_seconds <= 0 and duration > 0:
                 recording_seconds = duration
-                task["recording_seconds"] = recording_seconds
+                await self.registry.update_task(task_id, recording_seconds=recording_seconds)
                 logger.warning(f"[{task_id}] recordingSeconds was 0, using duration={duration}s")
 
             case, pick_every, actual_fps = self._calc_timelapse_params(total_frames, output_seconds)
 
             if case == "case2":
                 actual_output = max(1, total_frames // BASE_FPS)
-                task["output_seconds"] = actual_output
+                await self.registry.update_task(task_id, output_seconds=actual_output)
 
             # ── Pass 2: clean mp4 → 타임랩스 ──
             source_duration = duration if duration > 0 else recording_seconds
             if source_duration > 0 and case != "case2":
                 needed_frames = actual_fps * output_seconds
                 sample_fps = needed_frames / source_duration
+                expected_frames = needed_frames
             else:
                 sample_fps = BASE_FPS
+                expected_frames = total_frames
 
-            crop_filter, scale_filter, pad_filter = self._get_crop_and_scale(aspect_ratio)
+            sampling = await self._choose_sampling(input_path, case, pick_every, sample_fps)
+            await self.registry.update_task(task_id, sampling=sampling)
 
-            filters = [f"fps={sample_fps:.4f}"]
-            if crop_filter:
-                filters.append(crop_filter)
-            filters.extend([
-                f"setpts=N/{actual_fps}/TB",
-                f"{scale_filter}:force_original_aspect_ratio=decrease",
-                pad_filter,
-            ])
-            filter_str = ",".join(filters)
+            # 포스터/미리보기/스프라이트는 첫 출력에서 갈라져 나온다 (원본 추가 디코딩 없음)
+            side_paths = {
+                kind: sidecar_path(output_paths[0], suffix) for kind, suffix in SIDE_OUTPUTS.items()
+            }
 
             logger.info(
                 f"[{task_id}] [{case}] sample_fps={sample_fps:.4f}, "
-                f"output_fps={actual_fps}"
+                f"output_fps={actual_fps}, sampling={sampling}, outputs={aspect_ratios}"
             )
 
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", input_path,
-                "-vf", filter_str,
-                "-r", str(actual_fps),
-                "-an",
-                "-c:v", "libx264",
-                "-profile:v", "high",
-                "-level", "4.1",
-                "-pix_fmt", "yuv420p",
-                "-threads", "0",
-                "-crf", "23",
-                "-maxrate", "5M",
-                "-bufsize", "10M",
-                "-preset", "ultrafast",
-                "-movflags", "+faststart",
-                output_path,
-            ]
+            threads = self.governor.threads(task_id)
+            # 스트리밍은 앞부분부터 순서대로 나와야 하므로 분할하지 않는다
+            parts = (
+                1 if case == "case2" or stream_dir
+                else self._split_count(source_duration, threads)
+            )
+            if stream_dir:
+                await asyncio.to_thread(os.makedirs, stream_dir, exist_ok=True)
+            if parts > 1:
+                await self.registry.update_task(task_id, split_parts=parts)
+                returncode, stderr_tail = await self._run_split(
+                    task_id, input_path, output_paths,
+                    sampling=sampling, aspect_ratios=aspect_ratios, side_paths=side_paths,
+                    output_fps=actual_fps, sample_fps=sample_fps,
+                    expected_frames=expected_frames, parts=parts,
+                )
+            else:
+                side_plan = plan_side_outputs(
+                    expected_frames, frame_size=self._output_size(aspect_ratios[0]),
+                )
+                filter_args, labels, side_labels = self._video_filter_args(
+                    sample_fps, actual_fps, aspect_ratios, side_plan,
+                )
+                cmd = [
+                    "ffmpeg", "-y", *filter_thread_args(threads),
+                    "-threads", str(threads),
+                    *self._sampling_input_args(sampling, input_path),
+                    *filter_args,
+                    "-progress", "pipe:1", "-nostats",
+                    *_video_output_args(
+                        labels, output_paths, actual_fps,
+                        with_threads(VIDEO_ENCODER_ARGS, threads), stream_dir=stream_dir,
+                    ),
+                    *side_output_args(side_labels, side_paths, side_plan),
+                ]
+                logger.info(f"[{task_id}] pass2 cmd: {' '.join(cmd)}")
+                returncode, stderr_tail = await self._exec_ffmpeg(task_id, cmd, expected_frames)
+            logger.info(f"[{task_id}] pass2 exit: {returncode}")
+
+            if returncode == 0 and all(os.path.exists(path) for path in output_paths):
+                await self._write_sprite_index(
+                    side_paths, expected_frames, actual_fps, self._output_size(aspect_ratios[0]),
+                )
+                await self.registry.update_task(
+                    task_id, status="completed", progress=100, eta_seconds=0,
+                )
+            else:
+                await self.registry.update_task(
+                    task_id, status="failed", stderr_tail=stderr_tail,
+                )
+                logger.error(
+                    f"[{task_id}] pass2 failed (code {returncode}): {stderr_tail[-500:]}"
+                )
+                if stream_dir:
+                    await asyncio.to_thread(shutil.rmtree, stream_dir, True)
 
-            logger.info(f"[{task_id}] pass2 cmd: {' '.join(cmd)}")
+        except Exception as e:
+            await self.registry.update_task(task_id, status="failed")
+            logger.exception(f"[{task_id}] Conversion error: {e}")
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    def _video_filter_args(
+        self,
+        sample_fps: float,
+        output_fps: int,
+        aspect_ratios: list[str],
+        side: dict | None = None,
+    ) -> tuple[list[str], list[str | None], dict[str, str]]:
+        """샘플링 + 비율별 crop/scale/pad 필터 인자와 출력별 -map 라벨을 만든다.
+
+        비율이 하나이고 부가 출력이 없으면 기존처럼 -vf 체인 (라벨 None), 아니면 샘플링
+        결과를 split으로 나눠 비율마다 [vN] 출력으로 보내는 -filter_complex 그래프.
+        side(plan_side_outputs)가 있으면 첫 비율에서 부가 출력을 갈라 {종류: 라벨}로 돌려준다.
+        """
+        head = [
+            f"fps={sample_fps:.4f}",
+            # fps 필터 출력의 시간 기준(1/sample_fps)에서는 N/output_fps가 정수로 반올림돼
+            # 프레임이 겹치고 -r이 중복/누락으로 메운다 → 마이크로초 기준으로 바꾼 뒤 매긴다
+            "settb=AVTB",
+            f"setpts=N/{output_fps}/TB",
+        ]
+        tails: list[str] = []
+        for ratio in aspect_ratios:
+            crop_filter, scale_filter, pad_filter = self._get_crop_and_scale(ratio)
+            chain = [f"{scale_filter}:force_original_aspect_ratio=decrease", pad_filter]
+            if crop_filter:
+                chain.insert(0, crop_filter)
+            tails.append(",".join(chain))
+
+        if len(tails) == 1 and not side:
+            return ["-vf", ",".join([*head, tails[0]])], [None], {}
+        # 부가 출력이 있으면 첫 비율 결과를 [m0]으로 받아 다시 나눈다
+        first = "[m0]" if side else "[v0]"
+        if len(tails) == 1:
+            graph = [f"[0:v]{','.join(head)},{tails[0]}{first}"]
+        else:
+            branches = "".join(f"[b{i}]" for i in range(len(tails)))
+            graph = [f"[0:v]{','.join(head)},split={len(tails)}{branches}"]
+            graph.extend(
+                f"[b{i}]{tail}{first if i == 0 else f'[v{i}]'}" for i, tail in enumerate(tails)
             )
-            _, stderr = await process.communicate()
+        side_labels: dict[str, str] = {}
+        if side:
+            side_graph, side_labels = branch_side_outputs("[m0]", "[v0]", side)
+            graph.extend(side_graph)
+        labels: list[str | None] = [f"[v{i}]" for i in range(len(tails))]
+        return ["-filter_complex", ";".join(graph)], labels, side_labels
+
+    @staticmethod
+    def _sampling_input_args(sampling: str, input_path: str, start: float = 0.0) -> list[str]:
+        args: list[str] = []
+        if sampling == "keyframe":
+            # 키프레임만 디코딩 — 버려질 프레임은 디코더를 거치지 않는다
+            args.extend(["-skip_frame", "nokey"])
+        if start > 0:
+            # 입력 옵션 -ss: 직전 키프레임부터 디코딩해 start 이전 프레임을 버린다 (정확한 탐색)
+            args.extend(["-ss", f"{start:.6f}"])
+        args.extend(["-i", input_path])
+        return args
+
+    def _split_count(self, source_duration: float, job_cores: int) -> int:
+        """분할 인코딩 조각 수. 1이면 기존처럼 한 프로세스로 인코딩한다.
+
+        이 작업에 배분된 코어 수(ResourceGovernor)와
+        원본 길이(조각당 최소 split_min_segment_seconds) 중 작은 쪽을 쓴다.
+        """
+        if settings.split_encode == "off" or source_duration <= 0:
+            return 1
+        by_duration = int(source_duration // max(1, settings.split_min_segment_seconds))
+        return max(1, min(job_cores, by_duration, settings.split_max_parts))
 
-            stderr_text = stderr.decode() if stderr else ""
-            logger.info(f"[{task_id}] pass2 exit: {process.returncode}")
-            if stderr_text:
-                logger.info(f"[{task_id}] pass2 stderr (last 500): {stderr_text[-500:]}")
+    async def _run_split(
+        self,
+        task_id: str,
+        input_path: str,
+        output_paths: list[str],
+        *,
+        sampling: str,
+        aspect_ratios: list[str],
+        side_paths: dict[str, str],
+        output_fps: int,
+        sample_fps: float,
+        expected_frames: int,
+        parts: int,
+    ) -> tuple[int, str]:
+        """원본을 샘플링 격자에 맞춘 구간으로 나눠 병렬 인코딩하고 -c copy로 이어 붙인다.
+
+        조각 i는 출력 프레임 [a, b)를 담당하고 원본 a / sample_fps초부터 읽어 정확히 b - a장만
+        인코딩한다 (마지막 조각은 끝까지). 각 조각의 fps 필터 격자가 전체 격자와 같으므로
+        한 번에 인코딩했을 때와 같은 원본 프레임이 선택되고, setpts로 0부터 다시 매긴 뒤
+        concat하면 타임스탬프도 이어진다. 출력이 여러 개면 조각마다 모든 출력을 만들고
+        출력별로 이어 붙인다. 포스터는 해당 프레임이 든 조각이, 미리보기는 각 조각이
+        전체 기준 간격으로 골라 만든 뒤 이어 붙인다. 스프라이트도 조각마다 타일만 만들고
+        마지막에 격자로 붙인다.
+        """
+        work_dir = f"{output_paths[0]}.parts"
+        await asyncio.to_thread(os.makedirs, work_dir, exist_ok=True)
+        # 작업에 배분된 스레드를 조각들이 나눠 쓴다
+        threads = max(1, self.governor.threads(task_id) // parts)
+        encoder_args = with_threads(VIDEO_ENCODER_ARGS, threads)
+        progress = SplitProgress()
+        # part_paths[출력][조각]
+        part_paths: list[list[str]] = [[] for _ in output_paths]
+        # side_parts[종류] = 그 부가 출력을 만든 조각 파일들
+        side_parts: dict[str, list[str]] = {kind: [] for kind in side_paths}
+        commands: list[list[str]] = []
+        frame_size = self._output_size(aspect_ratios[0])
+        for idx, (start_frame, frames) in enumerate(plan_split(expected_frames, parts)):
+            paths = [
+                os.path.join(work_dir, f"out{out}_part_{idx:03d}.mp4")
+                for out in range(len(output_paths))
+            ]
+            for out, path in enumerate(paths):
+                part_paths[out].append(path)
+            side_plan = plan_side_outputs(expected_frames, start_frame, frames, frame_size)
+            filter_args, labels, side_labels = self._video_filter_args(
+                sample_fps, output_fps, aspect_ratios, side_plan,
+            )
+            part_side_paths = {
+                kind: os.path.join(
+                    work_dir,
+                    f"{kind}_part_{idx:03d}" + (".mkv" if kind == "sprite" else SIDE_OUTPUTS[kind]),
+                )
+                for kind in side_labels
+            }
+            for kind, path in part_side_paths.items():
+                side_parts[kind].append(path)
+            commands.append([
+                "ffmpeg", "-y", *filter_thread_args(threads),
+                "-threads", str(threads),
+                *self._sampling_input_args(sampling, input_path, start_frame / sample_fps),
+                *filter_args,
+                "-progress", "pipe:1", "-nostats",
+                *_video_output_args(
+                    labels, paths, output_fps, encoder_args, frames=frames, faststart=False,
+                ),
+                *side_output_args(side_labels, part_side_paths, side_plan),
+            ])
+        logger.info(
+            f"[{task_id}] split encode: {parts} parts × {threads} threads, "
+            f"first cmd: {' '.join(commands[0])}"
+        )
 
-            if process.returncode == 0 and os.path.exists(output_path):
-                task["status"] = "completed"
-                task["progress"] = 100
-            else:
-                task["status"] = "failed"
-                logger.error(f"[{task_id}] pass2 failed (code {process.returncode})")
+        try:
+            results = await asyncio.gather(*(
+                self._exec_ffmpeg(task_id, cmd, expected_frames, split=(progress, idx))
+                for idx, cmd in enumerate(commands)
+            ))
+            for returncode, stderr_tail in results:
+                if returncode != 0:
+                    return returncode, stderr_tail
+
+            for out, output_path in enumerate(output_paths):
+                returncode, stderr_tail = await self._concat_parts(
+                    task_id, part_paths[out], output_path,
+                    os.path.join(work_dir, f"out{out}_parts.txt"),
+                )
+                if returncode != 0:
+                    return returncode, stderr_tail
+
+            # 부가 출력은 없거나 실패해도 본 출력에 영향 없음
+            posters = [p for p in side_parts.get("poster", []) if os.path.exists(p)]
+            if posters:
+                await asyncio.to_thread(os.replace, posters[0], side_paths["poster"])
+            previews = [p for p in side_parts.get("preview", []) if os.path.exists(p)]
+            if previews:
+                await self._concat_parts(
+                    task_id, previews, side_paths["preview"],
+                    os.path.join(work_dir, "preview_parts.txt"),
+                )
+            sprites = [p for p in side_parts.get("sprite", []) if os.path.exists(p)]
+            if sprites:
+                await self._join_sprite(
+                    task_id, sprites, side_paths["sprite"],
+                    os.path.join(work_dir, "sprite_parts.txt"),
+                    sprite_plan(expected_frames, frame_size),
+                )
+            return returncode, stderr_tail
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+
+    async def _concat_parts(
+        self, task_id: str, part_paths: list[str], output_path: str, list_path: str,
+    ) -> tuple[int, str]:
+        """같은 설정으로 인코딩한 조각들을 concat demuxer + -c copy로 이어 붙인다."""
+        await asyncio.to_thread(_write_concat_list, list_path, part_paths)
+        return await self._exec_ffmpeg(task_id, [
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", "-movflags", "+faststart",
+            output_path,
+        ], 0)
+
+    async def _join_sprite(
+        self, task_id: str, part_paths: list[str], output_path: str, list_path: str,
+        sprite: dict,
+    ) -> tuple[int, str]:
+        """분할 조각들이 만든 타일 프레임(MJPEG)을 이어 읽어 스프라이트 격자 한 장으로 붙인다."""
+        await asyncio.to_thread(_write_concat_list, list_path, part_paths)
+        return await self._exec_ffmpeg(task_id, [
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-vf", f"tile={sprite['columns']}x{sprite['rows']}",
+            "-frames:v", "1", "-q:v", str(SPRITE_QUALITY), "-update", "1",
+            output_path,
+        ], 0)
+
+    async def _write_sprite_index(
+        self,
+        side_paths: dict[str, str],
+        total_frames: int,
+        output_fps: int,
+        frame_size: tuple[int, int],
+    ) -> None:
+        """스프라이트가 만들어졌으면 옆에 WebVTT 타일 색인을 쓴다."""
+        if total_frames <= 0 or not await asyncio.to_thread(os.path.exists, side_paths["sprite"]):
+            return
+        index = sprite_vtt(total_frames, output_fps, sprite_plan(total_frames, frame_size))
+        await asyncio.to_thread(_write_text, side_paths["thumbnails"], index)
+
+    async def _resolve_source_frames(
+        self, input_path: str, output_seconds: int, fallback_seconds: float,
+    ) -> tuple[int, float]:
+        """렌더에 쓸 (총 프레임 수, 길이)를 구한다.
+
+        헤더 값으로 충분하면 그대로 쓰고, 추정값의 오차 범위(±FRAME_ESTIMATE_MARGIN) 안에서
+        _calc_timelapse_params의 결과가 달라질 수 있을 때만 패킷을 세어 정확한 값을 얻는다.
+        """
+        info = await media_probe.probe(input_path)
+        duration = info.duration if info.duration > 0 else fallback_seconds
+        if info.frames_exact:
+            return info.frame_count, duration
+
+        estimated = info.estimated_frames(fallback_fps=BASE_FPS)
+        if estimated <= 0:
+            estimated = int(duration * BASE_FPS)
+        low = int(estimated * (1 - FRAME_ESTIMATE_MARGIN))
+        high = int(estimated * (1 + FRAME_ESTIMATE_MARGIN))
+        if self._calc_timelapse_params(low, output_seconds) == self._calc_timelapse_params(
+            high, output_seconds,
+        ):
+            return estimated, duration
+
+        exact = await media_probe.exact_frame_count(input_path)
+        return (exact or estimated), duration
+
+    async def _choose_sampling(
+        self, input_path: str, case: str, pick_every: int, sample_fps: float,
+    ) -> str:
+        """프레임 샘플링 방식 결정: keyframe (키프레임만 디코딩) | full (전체 디코딩).
 
-        except Exception as e:
-            task["status"] = "failed"
-            logger.exception(f"[{task_id}] Conversion error: {e}")
+        pick_every가 클수록 대부분의 디코딩 결과가 fps 필터에서 버려진다.
+        키프레임 간격이 샘플 간격 × sparse_keyframe_tolerance 이하일 때만 keyframe 모드를
+        쓰므로, 출력 프레임마다 서로 다른 원본 프레임이 보장된다 (tolerance 1.0 기준).
+        """
+        mode = settings.sparse_sampling
+        if mode == "off" or case == "case2" or sample_fps <= 0:
+            return "full"
+        if mode == "keyframe":
+            return "keyframe"
+        if pick_every < settings.sparse_min_pick_every:
+            return "full"
+
+        keyframe_interval = await media_probe.keyframe_interval(input_path)
+        sample_interval = 1.0 / sample_fps
+        if 0 < keyframe_interval <= sample_interval * settings.sparse_keyframe_tolerance:
+            return "keyframe"
+        logger.info(
+            f"keyframe sampling skipped: keyframe_interval={keyframe_interval:.2f}s, "
+            f"sample_interval={sample_interval:.2f}s"
+        )
+        return "full"
+
+    async def _exec_ffmpeg(
+        self,
+        task_id: str,
+        cmd: list[str],
+        expected_frames: int,
+        split: tuple[SplitProgress, int] | None = None,
+    ) -> tuple[int, str]:
+        """FFmpeg를 실행하면서 -progress 출력으로 진행률/속도/ETA를 갱신한다.
+
+        stdout은 `-progress pipe:1`의 key=value 블록, stderr는 진단용으로
+        마지막 STDERR_TAIL_LINES 줄만 보관한다. (종료 코드, stderr 꼬리)를 반환한다.
+        split=(합산기, 조각 번호)이면 분할 인코딩 조각들의 프레임을 합산해 진행률을 낸다.
+        """
+        throttle = split[0] if split else SplitProgress()
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            preexec_fn=self.governor.preexec(task_id),
+        )
+        started = time.monotonic()
+        stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+
+        async def read_progress() -> None:
+            block: dict[str, str] = {}
+            async for raw in process.stdout:
+                key, _, value = raw.decode(errors="replace").strip().partition("=")
+                if key != "progress":
+                    block[key] = value
+                    continue
+                if split and block.get("frame", "").isdigit():
+                    block["frame"] = str(split[0].update(split[1], int(block["frame"])))
+                    block.pop("speed", None)  # 조각별 속도는 전체 속도가 아님
+                now = time.monotonic()
+                updates = self._parse_progress(block, expected_frames, now - started)
+                block = {}
+                # 저장소 쓰기 횟수 제한 (Postgres 백엔드 부하)
+                if updates and now - throttle.last_persist >= PROGRESS_PERSIST_INTERVAL:
+                    throttle.last_persist = now
+                    await self.registry.update_task(task_id, **updates)
+
+        async def read_stderr() -> None:
+            async for raw in process.stderr:
+                stderr_tail.append(raw.decode(errors="replace").rstrip())
+
+        try:
+            await asyncio.gather(read_progress(), read_stderr())
+            returncode = await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        return returncode, "\n".join(stderr_tail)
+
+    def _parse_progress(
+        self, block: dict[str, str], expected_frames: int, elapsed: float,
+    ) -> dict:
+        """-progress 블록 하나를 태스크 레코드 갱신값(progress/speed/eta_seconds)으로 바꾼다."""
+        updates: dict = {}
+        try:
+            frame = int(block.get("frame", "0"))
+        except ValueError:
+            return updates
+
+        if expected_frames > 0:
+            # 완료 표시는 프로세스 종료 후에만 100으로 올린다
+            updates["progress"] = min(99, frame * 100 // expected_frames)
+
+        speed = block.get("speed", "N/A").rstrip("x").strip()
+        if speed and speed != "N/A":
+            try:
+                updates["speed"] = round(float(speed), 2)
+            except ValueError:
+                pass
+
+        if frame > 0 and elapsed > 0 and expected_frames > frame:
+            rate = frame / elapsed
+            updates["eta_seconds"] = math.ceil((expected_frames - frame) / rate)
+
+        return updates
 
     def _build_overlay_filters(
         self,
@@ -309,27 +1438,18 @@ class TimelapseService:
         output_seconds: int,
         aspect_ratio: str,
     ) -> list[str]:
-        """오버레이 스타일에 따른 FFmpeg drawtext/drawbox 필터 목록 반환."""
-        filters: list[str] = []
+        """오버레이 스타일에 따른 FFmpeg drawtext/drawbox 필터 목록 반환.
 
-        # 영상 크기 결정
-        size_map = {
-            "9:16": (720, 1280),
-            "1:1": (720, 720),
-            "4:5": (720, 900),
-            "16:9": (1280, 720),
-        }
-        vid_w, vid_h = size_map.get(aspect_ratio, (720, 1280))
+        overlay_prerender를 끄거나 Pillow가 없을 때 쓴다 (_prerender_overlay와 같은 배치).
+        """
+        filters: list[str] = []
 
-        # 폰트 크기 (영상 너비 기준)
-        font_size = max(28, int(vid_w * 0.05))
-        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+        vid_w, vid_h, font_size, watermark_size = self._overlay_metrics(aspect_ratio)
+        font_path = FONT_PATH
 
         # 워터마크 (항상 표시: 좌하단)
-        watermark_text = "FocusTimelapse"
-        watermark_size = max(18, int(vid_w * 0.032))
         filters.append(
-            f"drawtext=text='{watermark_text}'"
+            f"drawtext=text='{WATERMARK_TEXT}'"
             f":fontfile={font_path}"
             f":fontsize={watermark_size}"
             f":fontcolor=white@0.9"
@@ -342,33 +1462,6 @@ class TimelapseService:
 
         # 타이머 오버레이: 우상단에 타이머 텍스트 표시
         if overlay_style == "timer":
-            # 영상 재생 시간에 따라 타이머 값 변화
-            goal_seconds = study_minutes * 60
-            if timer_mode == "countdown":
-                # 카운트다운: 목표시간에서 감소
-                start_val = goal_seconds
-                # FFmpeg pts 기반: 시작값 - (경과시간 / 출력시간 * 녹화시간)
-                speed = recording_seconds / max(1, output_seconds)
-                timer_expr = (
-                    f"drawtext=text='%{{eif\\:max(0\\,{start_val}-t*{speed:.4f})\\:d}}'"
-                    f":fontfile={font_path}"
-                    f":fontsize={font_size}"
-                    f":fontcolor=white"
-                    f":x=w-tw-14:y=14"
-                    f":shadowcolor=black@0.6:shadowx=0:shadowy=1"
-                )
-            else:
-                # 카운트업: 0에서 증가
-                speed = recording_seconds / max(1, output_seconds)
-                timer_expr = (
-                    f"drawtext=text='%{{eif\\:min({recording_seconds}\\,t*{speed:.4f})\\:d}}'"
-                    f":fontfile={font_path}"
-                    f":fontsize={font_size}"
-                    f":fontcolor=white"
-                    f":x=w-tw-14:y=14"
-                    f":shadowcolor=black@0.6:shadowx=0:shadowy=1"
-                )
-            # HH:MM:SS 형식으로 drawtext pts 활용
             if overlay_text:
                 # 고정 텍스트로 표시 (시뮬레이션 불필요 시)
                 safe_text = overlay_text.replace("'", "\\'").replace(":", "\\:")
@@ -381,7 +1474,9 @@ class TimelapseService:
                     f":shadowcolor=black@0.6:shadowx=0:shadowy=1"
                 )
             else:
-                filters.append(timer_expr)
+                filters.append(_timer_drawtext(
+                    timer_mode, study_minutes * 60, recording_seconds, output_seconds, font_size,
+                ))
 
         elif overlay_style == "progress":
             # 진행 바: 우상단
@@ -405,10 +1500,7 @@ class TimelapseService:
                 )
 
         elif overlay_style == "streak":
-            streak_label = f"Day {streak} Streak"
-            if streak == 1:
-                streak_label = "1 Day Streak"
-            safe_streak = streak_label.replace("'", "\\'")
+            safe_streak = _streak_label(streak).replace("'", "\\'")
             filters.append(
                 f"drawtext=text='{safe_streak}'"
                 f":fontfile={font_path}"
@@ -420,6 +1512,82 @@ class TimelapseService:
 
         return filters
 
+    @staticmethod
+    def _overlay_metrics(aspect_ratio: str) -> tuple[int, int, int, int]:
+        """(영상 너비, 높이, 글자 크기, 워터마크 글자 크기) — 글자는 영상 너비 기준."""
+        size_map = {
+            "9:16": (720, 1280),
+            "1:1": (720, 720),
+            "4:5": (720, 900),
+            "16:9": (1280, 720),
+        }
+        vid_w, vid_h = size_map.get(aspect_ratio, (720, 1280))
+        return vid_w, vid_h, max(28, int(vid_w * 0.05)), max(18, int(vid_w * 0.032))
+
+    async def _prerender_overlay(
+        self,
+        overlay_style: str,
+        overlay_text: str,
+        streak: int,
+        study_minutes: int,
+        recording_seconds: int,
+        timer_mode: str,
+        output_seconds: int,
+        aspect_ratio: str,
+    ) -> tuple[list[OverlayInput], list[str]] | None:
+        """_build_overlay_filters와 같은 오버레이를 (미리 그린 overlay 입력, 남는 필터)로.
+
+        정적 레이어(워터마크, 스트릭 / 고정 문구, 진행 바)는 모서리별 PNG로 그려 두고,
+        프레임마다 값이 바뀌는 타이머만 drawtext로 남긴다 — 움직이는 overlay 입력은
+        프레임마다 합성 비용이 drawtext보다 크다 (benchmarks/overlay.py).
+        설정으로 껐거나 Pillow가 없거나 그리기에 실패하면 None (drawtext 필터를 쓴다).
+        """
+        if not settings.overlay_prerender or not pillow_available():
+            return None
+        vid_w, vid_h, font_size, watermark_size = self._overlay_metrics(aspect_ratio)
+        layers: list[TextLayer | BoxLayer] = [
+            TextLayer(
+                WATERMARK_TEXT, watermark_size, "bottom-left",
+                fill=(255, 255, 255, 230), shadow=(0, 0, 0, 128), shadow_offset=(1, 1),
+            ),
+        ]
+        label = None
+        filters: list[str] = []
+        if overlay_style == "timer":
+            if overlay_text:
+                label = overlay_text
+            else:
+                filters.append(_timer_drawtext(
+                    timer_mode, study_minutes * 60, recording_seconds, output_seconds, font_size,
+                ))
+        elif overlay_style == "progress" and study_minutes > 0:
+            bar_w = int(vid_w * 0.25)
+            bar_x = vid_w - bar_w - 14
+            achieved = min(1.0, recording_seconds / (study_minutes * 60))
+            layers.extend([
+                BoxLayer(bar_x, 14, bar_w, 6, "top-right", fill=(255, 255, 255, 89)),
+                BoxLayer(
+                    bar_x, 14, max(2, int(bar_w * achieved)), 6, "top-right",
+                    fill=(255, 255, 255, 242),
+                ),
+            ])
+        elif overlay_style == "streak":
+            label = _streak_label(streak)
+        if label:
+            layers.append(TextLayer(
+                label, font_size, "top-right",
+                fill=LABEL_FILL, shadow=LABEL_SHADOW, shadow_offset=LABEL_SHADOW_OFFSET,
+            ))
+
+        try:
+            overlays = await asyncio.to_thread(
+                self.overlay_assets.static_layers, layers, (vid_w, vid_h),
+            )
+        except OSError as e:
+            logger.warning(f"overlay prerender failed, using drawtext: {e}")
+            return None
+        return overlays, filters
+
     async def _run_ffmpeg_from_photos(
         self,
         task_id: str,
@@ -434,22 +1602,12 @@ class TimelapseService:
         recording_seconds: int = 0,
         timer_mode: str = "countdown",
     ) -> None:
-        """사진 목록을 concat 방식으로 타임랩스 영상으로 변환한다 (오버레이 합성 포함)."""
-        task = task_store[task_id]
-        filelist_path = os.path.join(settings.upload_dir, f"{task_id}_filelist.txt")
+        """사진 목록을 타임랩스 영상으로 변환한다 (오버레이 합성 포함)."""
+        work_dir = os.path.join(settings.upload_dir, f"{task_id}_frames")
         try:
-            frame_duration = 1.0 / BASE_FPS  # 각 사진 = 1/30초 (1프레임)
-
-            # filelist.txt 생성
-            lines: list[str] = []
-            for path in photo_paths:
-                lines.append(f"file '{path}'")
-                lines.append(f"duration {frame_duration:.6f}")
-            # concat demuxer 마지막 항목 처리 (마지막 파일도 한 번 더 기록)
-            if photo_paths:
-                lines.append(f"file '{photo_paths[-1]}'")
-            with open(filelist_path, "w") as f:
-                f.write("\n".join(lines) + "\n")
+            input_args = await asyncio.to_thread(
+                build_photo_input, photo_paths, work_dir, settings.photo_input_mode,
+            )
 
             _, scale_filter, pad_filter = self._get_crop_and_scale(aspect_ratio)
 
@@ -459,101 +1617,385 @@ class TimelapseService:
                 pad_filter,
             ]
 
-            # 오버레이 필터 추가
-            overlay_filters = self._build_overlay_filters(
+            # 오버레이: 미리 그린 자산을 overlay로 합성, 안 되면 drawtext 필터
+            overlay_args = (
                 overlay_style, overlay_text, streak,
                 study_minutes, recording_seconds, timer_mode,
                 output_seconds, aspect_ratio,
             )
+            prerendered = await self._prerender_overlay(*overlay_args)
+            if prerendered is None:
+                prerendered = [], self._build_overlay_filters(*overlay_args)
+            overlays, overlay_filters = prerendered
             vf_parts.extend(overlay_filters)
 
             vf = ",".join(vf_parts)
 
+            # 합성된 결과를 본 출력과 부가 출력으로 나눈다 (사진 디코딩 1회)
+            frame_size = self._output_size(aspect_ratio)
+            side_plan = plan_side_outputs(len(photo_paths), frame_size=frame_size)
+            side_graph, side_labels = branch_side_outputs("[m0]", "[out]", side_plan)
+            side_paths = {
+                kind: sidecar_path(output_path, suffix) for kind, suffix in SIDE_OUTPUTS.items()
+            }
+
+            threads = self.governor.threads(task_id)
             cmd = [
-                "ffmpeg", "-y",
-                "-f", "concat", "-safe", "0",
-                "-i", filelist_path,
-                "-vf", vf,
+                "ffmpeg", "-y", *filter_thread_args(threads),
+                "-threads", str(threads),
+                *input_args,
+                *overlay_input_args(overlays),
+                "-filter_complex", ";".join([
+                    *overlay_graph(f"[0:v]{vf}", overlays, "[m0]"), *side_graph,
+                ]),
+                "-map", "[out]",
                 "-r", str(BASE_FPS),
-                "-c:v", "libx264",
-                "-preset", "ultrafast",
-                "-crf", "23",
-                "-pix_fmt", "yuv420p",
+                *with_threads(PHOTO_ENCODER_ARGS, threads),
                 "-movflags", "+faststart",
+                "-progress", "pipe:1", "-nostats",
                 output_path,
+                *side_output_args(side_labels, side_paths, side_plan),
             ]
 
             logger.info(f"[{task_id}] photos→timelapse cmd: {' '.join(cmd)}")
-            logger.info(f"[{task_id}] overlay_style={overlay_style}, vf={vf[:200]}")
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            logger.info(
+                f"[{task_id}] overlay_style={overlay_style}, prerendered={len(overlays)}, "
+                f"vf={vf[:200]}"
             )
-            _, stderr = await process.communicate()
 
-            stderr_text = stderr.decode() if stderr else ""
-            logger.info(f"[{task_id}] photos ffmpeg exit: {process.returncode}")
-            if stderr_text:
-                logger.info(f"[{task_id}] stderr (last 500): {stderr_text[-500:]}")
+            returncode, stderr_tail = await self._exec_ffmpeg(task_id, cmd, len(photo_paths))
+            logger.info(f"[{task_id}] photos ffmpeg exit: {returncode}")
 
-            if process.returncode == 0 and os.path.exists(output_path):
-                task["status"] = "completed"
-                task["progress"] = 100
+            if returncode == 0 and os.path.exists(output_path):
+                await self._write_sprite_index(side_paths, len(photo_paths), BASE_FPS, frame_size)
+                await self.registry.update_task(
+                    task_id, status="completed", progress=100, eta_seconds=0,
+                )
             else:
-                task["status"] = "failed"
-                logger.error(f"[{task_id}] photos ffmpeg failed (code {process.returncode})")
+                await self.registry.update_task(
+                    task_id, status="failed", stderr_tail=stderr_tail,
+                )
+                logger.error(
+                    f"[{task_id}] photos ffmpeg failed (code {returncode}): {stderr_tail[-500:]}"
+                )
 
         except Exception as e:
-            task["status"] = "failed"
+            await self.registry.update_task(task_id, status="failed")
             logger.exception(f"[{task_id}] Photo timelapse error: {e}")
         finally:
-            # filelist.txt 정리
-            if os.path.exists(filelist_path):
-                os.remove(filelist_path)
-
-    async def _probe_clean(self, file_path: str, fallback_seconds: float) -> tuple[int, float]:
-        """깨끗한 mp4에서 프레임수/길이 파악."""
-        import json
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=nb_frames,duration",
-            "-show_entries", "format=duration",
-            "-of", "json",
-            file_path,
-        ]
+            # 번호 링크 / filelist 정리 (원본 사진은 그대로)
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+
+
+class SplitProgress:
+    """분할 인코딩 조각들의 진행 프레임 합산 + 저장소 반영 간격 공유."""
+
+    def __init__(self) -> None:
+        self.frames: dict[int, int] = {}
+        self.last_persist = 0.0
+
+    def update(self, part: int, frame: int) -> int:
+        self.frames[part] = frame
+        return sum(self.frames.values())
+
+
+def plan_split(expected_frames: int, parts: int) -> list[tuple[int, int | None]]:
+    """출력 프레임을 parts개 연속 구간으로 나눈다 → [(시작 출력 프레임, 프레임 수)].
+
+    마지막 구간의 프레임 수는 None (원본 끝까지) — 전체 프레임 수가 한 번에 인코딩할 때와 같다.
+    """
+    parts = max(1, min(parts, expected_frames))
+    bounds = [round(i * expected_frames / parts) for i in range(parts + 1)]
+    plan: list[tuple[int, int | None]] = [
+        (bounds[i], bounds[i + 1] - bounds[i]) for i in range(parts - 1)
+    ]
+    plan.append((bounds[parts - 1], None))
+    return plan
+
+
+def plan_side_outputs(
+    total_frames: int,
+    start: int = 0,
+    frames: int | None = None,
+    frame_size: tuple[int, int] | None = None,
+) -> dict:
+    """출력 프레임 [start, start + frames) 구간에서 만들 부가 출력 (frames=None이면 끝까지).
+
+    - poster: 전체 가운데 프레임의 구간 내 번호 (구간에 없으면 생략)
+    - preview: (간격, start, 장수) — 전체 기준 간격마다 1장씩 골라 PREVIEW_SECONDS 루프를
+      만든다. 장수는 구간 안에서 고를 프레임 수 (끝까지면 None). 분할 조각에서 부가 출력이
+      구간을 넘어 원본을 계속 읽지 않도록 -frames:v로 쓴다.
+    - sprite: frame_size(본 출력 해상도)가 있을 때 스크러빙 스프라이트 계획 (sprite_plan).
+      전체 렌더면 그래프에서 바로 격자로 붙이고(tile=True), 분할 조각이면 타일만 내보내
+      join_sprite가 이어 붙인다.
+    """
+    if total_frames <= 0:
+        return {}
+    plan: dict = {}
+    end = total_frames if frames is None else start + frames
+    poster = total_frames // 2
+    if start <= poster and (frames is None or poster < end):
+        plan["poster"] = poster - start
+    step = max(1, math.ceil(total_frames / (PREVIEW_SECONDS * PREVIEW_FPS)))
+    picks = len(range(-start % step, end - start, step))
+    if picks:
+        plan["preview"] = (step, start, None if frames is None else picks)
+    if frame_size is not None:
+        sprite = sprite_plan(total_frames, frame_size)
+        picks = len(range(-start % sprite["step"], end - start, sprite["step"]))
+        if picks:
+            plan["sprite"] = {
+                **sprite,
+                "offset": start,
+                "picks": None if frames is None else picks,
+                "tile": start == 0 and frames is None,
+            }
+    return plan
+
+
+def sprite_plan(total_frames: int, frame_size: tuple[int, int]) -> dict:
+    """스프라이트 격자: 간격(step) 프레임마다 한 타일, 타일 크기(size), 격자(columns × rows)."""
+    step = max(1, math.ceil(total_frames / SPRITE_MAX_TILES))
+    tiles = len(range(0, total_frames, step))
+    width, height = frame_size
+    # scale=W:-2와 같은 규칙 (짝수 높이)
+    tile_height = max(2, round(SPRITE_TILE_WIDTH * height / (width * 2)) * 2)
+    columns = min(SPRITE_COLUMNS, tiles)
+    return {
+        "step": step,
+        "tiles": tiles,
+        "size": (SPRITE_TILE_WIDTH, tile_height),
+        "columns": columns,
+        "rows": math.ceil(tiles / columns),
+    }
+
+
+def sprite_vtt(total_frames: int, output_fps: int, sprite: dict) -> str:
+    """스프라이트 타일 색인 (WebVTT) — 구간마다 SPRITE_VTT_IMAGE#xywh=x,y,w,h."""
+
+    def stamp(frame: int) -> str:
+        millis = round(frame * 1000 / output_fps)
+        hours, rest = divmod(millis, 3_600_000)
+        minutes, rest = divmod(rest, 60_000)
+        return f"{hours:02d}:{minutes:02d}:{rest // 1000:02d}.{rest % 1000:03d}"
+
+    step, (width, height), columns = sprite["step"], sprite["size"], sprite["columns"]
+    cues = ["WEBVTT", ""]
+    for tile in range(sprite["tiles"]):
+        start = tile * step
+        end = min(start + step, total_frames)
+        x, y = tile % columns * width, tile // columns * height
+        cues.extend([
+            f"{stamp(start)} --> {stamp(end)}",
+            f"{SPRITE_VTT_IMAGE}#xywh={x},{y},{width},{height}",
+            "",
+        ])
+    return "\n".join(cues)
+
+
+def branch_side_outputs(source: str, main: str, plan: dict) -> tuple[list[str], dict[str, str]]:
+    """source 라벨을 본 출력(main 라벨)과 부가 출력들로 나누는 필터 그래프 조각.
+
+    Returns (그래프 문장 목록, {종류: 출력 라벨}).
+    """
+    chains: dict[str, str] = {}
+    if "poster" in plan:
+        chains["poster"] = f"select='eq(n,{plan['poster']})'"
+    if "preview" in plan:
+        step, offset, _ = plan["preview"]
+        chains["preview"] = (
+            f"select='not(mod(n+{offset},{step}))',settb=AVTB,"
+            f"setpts=N/{PREVIEW_FPS}/TB,scale={PREVIEW_WIDTH}:-2"
+        )
+    if "sprite" in plan:
+        sprite = plan["sprite"]
+        width, height = sprite["size"]
+        chain = (
+            f"select='not(mod(n+{sprite['offset']},{sprite['step']}))',"
+            f"scale={width}:{height},setsar=1"
+        )
+        if sprite["tile"]:
+            chain += f",tile={sprite['columns']}x{sprite['rows']}"
+        chains["sprite"] = chain
+    branches = "".join(f"[s_{kind}]" for kind in chains)
+    graph = [f"{source}split={1 + len(chains)}{main}{branches}"]
+    graph.extend(f"[s_{kind}]{chain}[{kind}]" for kind, chain in chains.items())
+    return graph, {kind: f"[{kind}]" for kind in chains}
+
+
+def overlay_input_args(overlays: list[OverlayInput]) -> list[str]:
+    """미리 그린 오버레이 입력 (1번 입력부터)."""
+    return [arg for overlay in overlays for arg in ("-i", overlay.path)]
+
+
+def overlay_graph(source: str, overlays: list[OverlayInput], out: str) -> list[str]:
+    """source 체인 결과 위에 overlay 입력들을 차례로 합성해 out 라벨로 내보낸다.
+
+    정지 PNG는 한 프레임뿐이라 overlay가 마지막 프레임을 계속 쓴다 (eof_action=repeat).
+    """
+    if not overlays:
+        return [f"{source}{out}"]
+    graph = [f"{source}[ov0]"]
+    for idx, overlay in enumerate(overlays, start=1):
+        label = out if idx == len(overlays) else f"[ov{idx}]"
+        graph.append(f"[ov{idx - 1}][{idx}:v]overlay={overlay.x}:{overlay.y}{label}")
+    return graph
+
+
+def _streak_label(streak: int) -> str:
+    return "1 Day Streak" if streak == 1 else f"Day {streak} Streak"
+
+
+def _timer_drawtext(
+    timer_mode: str, goal_seconds: int, recording_seconds: int, output_seconds: int,
+    font_size: int,
+) -> str:
+    """영상 재생 시간에 따라 값이 바뀌는 타이머 drawtext (우상단).
+
+    FFmpeg pts 기반: 경과시간 / 출력시간 * 녹화시간만큼 카운트다운(목표시간에서 감소) 또는
+    카운트업(0에서 증가).
+    """
+    speed = recording_seconds / max(1, output_seconds)
+    if timer_mode == "countdown":
+        value = f"max(0\\,{goal_seconds}-t*{speed:.4f})"
+    else:
+        value = f"min({recording_seconds}\\,t*{speed:.4f})"
+    return (
+        f"drawtext=text='%{{eif\\:{value}\\:d}}'"
+        f":fontfile={FONT_PATH}"
+        f":fontsize={font_size}"
+        f":fontcolor=white"
+        f":x=w-tw-14:y=14"
+        f":shadowcolor=black@0.6:shadowx=0:shadowy=1"
+    )
+
+
+def side_output_args(
+    side_labels: dict[str, str], side_paths: dict[str, str], plan: dict,
+) -> list[str]:
+    """부가 출력 파일별 인자 (포스터 JPEG 1장, 저비트레이트 미리보기 mp4, 스프라이트 JPEG)."""
+    args: list[str] = []
+    for kind, label in side_labels.items():
+        args.extend(["-map", label])
+        if kind == "poster":
+            args.extend(["-frames:v", "1", "-q:v", str(POSTER_QUALITY), "-update", "1"])
+        elif kind == "sprite":
+            sprite = plan["sprite"]
+            if sprite["tile"]:
+                args.extend(["-frames:v", "1", "-q:v", str(SPRITE_QUALITY), "-update", "1"])
+            else:
+                # 분할 조각: 타일 프레임을 MJPEG로 모아 두고 join_sprite가 격자로 붙인다
+                if sprite["picks"] is not None:
+                    args.extend(["-frames:v", str(sprite["picks"])])
+                args.extend(["-c:v", "mjpeg", "-q:v", str(SPRITE_QUALITY), "-f", "matroska"])
+        else:
+            picks = plan["preview"][2]
+            if picks is not None:
+                args.extend(["-frames:v", str(picks)])
+            args.extend([
+                "-r", str(PREVIEW_FPS), "-an", *PREVIEW_ENCODER_ARGS, "-movflags", "+faststart",
+            ])
+        args.append(side_paths[kind])
+    return args
+
+
+def _video_output_args(
+    labels: list[str | None],
+    output_paths: list[str],
+    output_fps: int,
+    encoder_args: list[str],
+    frames: int | None = None,
+    faststart: bool = True,
+    stream_dir: str | None = None,
+) -> list[str]:
+    """출력 파일별 인자 (-map 라벨, 프레임 수 제한, 인코더 설정).
+
+    stream_dir이 있으면 첫 출력은 tee muxer로 mp4와 HLS 이벤트 플레이리스트
+    (stream_dir/index.m3u8 + init.mp4 + seg_NNNNN.m4s)에 동시에 쓴다.
+    """
+    args: list[str] = []
+    for idx, (label, path) in enumerate(zip(labels, output_paths, strict=True)):
+        streaming = stream_dir is not None and idx == 0
+        if label or streaming:
+            # tee는 스트림을 명시적으로 매핑해야 한다 (-vf 체인은 0:v에 그대로 적용됨)
+            args.extend(["-map", label or "0:v"])
+        if frames is not None:
+            args.extend(["-frames:v", str(frames)])
+        args.extend(["-r", str(output_fps), "-an", *encoder_args])
+        if streaming:
+            segment = settings.stream_segment_seconds
+            args.extend([
+                "-force_key_frames", f"expr:gte(t,n_forced*{segment})",
+                "-f", "tee", _stream_tee_spec(path, stream_dir, segment, faststart),
+            ])
+            continue
+        if faststart:
+            args.extend(["-movflags", "+faststart"])
+        args.append(path)
+    return args
+
+
+def _stream_tee_spec(output_path: str, stream_dir: str, segment: int, faststart: bool) -> str:
+    mp4 = "[f=mp4:movflags=+faststart]" if faststart else "[f=mp4]"
+    hls = (
+        f"[f=hls:hls_time={segment}:hls_playlist_type=event:hls_segment_type=fmp4"
+        f":hls_fmp4_init_filename=init.mp4"
+        f":hls_segment_filename={os.path.join(stream_dir, 'seg_%05d.m4s')}]"
+    )
+    return f"{mp4}{output_path}|{hls}{os.path.join(stream_dir, STREAM_PLAYLIST_NAME)}"
+
+
+def _write_concat_list(list_path: str, paths: list[str]) -> None:
+    """concat demuxer 입력 목록을 쓴다."""
+    with open(list_path, "w") as f:
+        f.writelines(f"file '{path}'\n" for path in paths)
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _remove_path(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def build_photo_input(photo_paths: list[str], work_dir: str, mode: str = "sequence") -> list[str]:
+    """사진 목록을 1장 = 1프레임(BASE_FPS)으로 읽는 ffmpeg 입력 인자를 만든다 (블로킹).
+
+    - sequence: work_dir에 000001.jpg… 번호 심볼릭 링크를 만들고 image2 demuxer로 읽는다.
+      입력이 하나라 사진마다 세그먼트를 새로 열고 probe하는 비용이 없다.
+    - concat: 기존 방식 — filelist.txt + concat demuxer (사진마다 별도 입력 세그먼트).
+    """
+    os.makedirs(work_dir, exist_ok=True)
+
+    if mode == "concat":
+        frame_duration = 1.0 / BASE_FPS  # 각 사진 = 1/30초 (1프레임)
+        lines: list[str] = []
+        for path in photo_paths:
+            lines.append(f"file '{path}'")
+            lines.append(f"duration {frame_duration:.6f}")
+        # concat demuxer 마지막 항목 처리 (마지막 파일도 한 번 더 기록)
+        if photo_paths:
+            lines.append(f"file '{photo_paths[-1]}'")
+        filelist_path = os.path.join(work_dir, "filelist.txt")
+        with open(filelist_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return ["-f", "concat", "-safe", "0", "-i", filelist_path]
+
+    for idx, path in enumerate(photo_paths, start=1):
+        link = os.path.join(work_dir, f"{idx:06d}.jpg")
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-            )
-            out, _ = await proc.communicate()
-            data = json.loads(out.decode())
-
-            streams = data.get("streams", [])
-            total_frames = 0
-            duration = 0.0
-
-            if streams:
-                val = streams[0].get("nb_frames", "0")
-                if val and val != "N/A":
-                    total_frames = int(val)
-                val = streams[0].get("duration", "N/A")
-                if val and val != "N/A":
-                    duration = float(val)
-
-            if duration <= 0:
-                val = data.get("format", {}).get("duration", "N/A")
-                if val and val != "N/A":
-                    duration = float(val)
-
-            if duration <= 0:
-                duration = fallback_seconds
-
-            if total_frames <= 0 and duration > 0:
-                total_frames = int(duration * 30)
-
-            return total_frames, duration
-        except Exception:
-            return int(fallback_seconds * 30), fallback_seconds
+            os.symlink(os.path.abspath(path), link)
+        except OSError:
+            link_or_copy(path, link)  # 심볼릭 링크를 못 쓰는 파일시스템
+    return [
+        "-f", "image2",
+        "-framerate", str(BASE_FPS),
+        "-start_number", "1",
+        "-i", os.path.join(work_dir, "%06d.jpg"),
+    ]
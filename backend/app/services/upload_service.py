@@ -1,27 +1,43 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import os
 import uuid
+from collections.abc import Callable
 
 from fastapi import UploadFile
 
 from app.config import settings
+from app.repositories.registry import Registry, get_registry
+from app.services.media_probe import media_probe
+from app.services.multipart_stream import IncompleteBodyError, MultipartFileStream
+from app.services.photo_normalizer import RENDER_SUFFIX, photo_normalizer
 
 logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {".mp4", ".mov"}
 ALLOWED_MIME_TYPES = {"video/mp4", "video/quicktime"}
 
-# In-memory 파일 저장소 (MVP: DB 대신 dict 사용)
-file_store: dict[str, dict] = {}
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB 단위로 디스크에 기록 (메모리 사용량 고정)
+# MP4/MOV(ISO BMFF) 첫 박스 타입 — 파일 앞 4~8바이트
+CONTAINER_BOX_TYPES = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+SIGNATURE_BYTES = 8  # 박스 크기(4) + 타입(4)
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+
+class UploadTooLargeError(Exception):
+    """업로드 크기가 max_upload_size_mb를 넘음."""
 
 
 class UploadService:
     """파일 업로드 서비스."""
 
-    async def upload(self, file: UploadFile) -> dict[str, str]:
+    def __init__(self, registry: Registry | None = None) -> None:
+        self.registry = registry or get_registry()
+
+    async def upload(self, file: UploadFile | MultipartFileStream) -> dict[str, str]:
         """파일을 저장하고 fileId를 반환한다."""
         self._validate(file)
 
@@ -32,22 +48,38 @@ class UploadService:
 
         os.makedirs(settings.upload_dir, exist_ok=True)
 
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        content_hash = await self._stream_to_disk(file, file_path)
 
-        # ffprobe로 총 프레임 수 & 길이 파악
-        total_frames, duration = await self._probe_video(file_path)
+        return await self.register_video(
+            file_id, file_path, file.filename, file.content_type, content_hash,
+        )
 
-        file_store[file_id] = {
+    async def register_video(
+        self,
+        file_id: str,
+        file_path: str,
+        original_filename: str | None,
+        mime_type: str | None,
+        content_hash: str,
+    ) -> dict[str, str]:
+        """디스크에 저장된 영상을 검사해 저장소에 등록하고 업로드 응답을 반환한다."""
+        # ffprobe로 총 프레임 수 & 길이 파악 (헤더만)
+        total_frames, duration, frames_exact, (width, height) = await self._probe_video(file_path)
+        saved_filename = os.path.basename(file_path)
+
+        await self.registry.save_file({
             "file_id": file_id,
             "filename": saved_filename,
-            "original_filename": file.filename,
+            "original_filename": original_filename,
             "file_path": file_path,
-            "mime_type": file.content_type,
+            "mime_type": mime_type,
             "total_frames": total_frames,
+            "frames_exact": frames_exact,
             "duration": duration,
-        }
+            "width": width,  # 렌더 비용 추정용 (대기열 정렬)
+            "height": height,
+            "content_hash": content_hash,
+        })
 
         logger.info(f"[{file_id}] uploaded: frames={total_frames}, duration={duration}s")
 
@@ -58,72 +90,182 @@ class UploadService:
             "duration": duration,
         }
 
-    def _validate(self, file: UploadFile) -> None:
-        ext = os.path.splitext(file.filename or "")[1].lower()
-        if ext not in ALLOWED_EXTENSIONS:
-            raise ValueError(f"Unsupported file format: {ext}")
+    def _validate(self, file: UploadFile | MultipartFileStream) -> None:
+        validate_extension(file.filename)
+
+    async def _stream_to_disk(
+        self,
+        file: UploadFile | MultipartFileStream,
+        file_path: str,
+        max_mb: int | None = None,
+        check_head: Callable[[bytes], None] | None = None,
+    ) -> str:
+        """업로드 본문을 청크 단위로 디스크에 기록하고 sha256을 반환한다.
+
+        첫 청크에서 시그니처를(기본: MP4/MOV 컨테이너), 매 청크마다 누적 크기를 검사해
+        조건을 벗어나는 즉시 중단한다. 파일 쓰기/해시는 스레드에서 처리한다.
+        MultipartFileStream이면 네트워크에서 받는 대로 기록하므로 한도 초과도 받는 중에 걸린다.
+        """
+        max_mb = settings.max_upload_size_mb if max_mb is None else max_mb
+        check_head = check_head or check_signature
+        max_bytes = max_mb * 1024 * 1024
+        digest = hashlib.sha256()
+        written = 0
+        f = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if written == 0:
+                    check_head(chunk)
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLargeError(f"File too large: max {max_mb}MB")
+                await asyncio.to_thread(_write_chunk, f, digest, chunk)
+            if written == 0:
+                raise ValueError("Empty file")
+        except BaseException:
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(_remove_quietly, file_path)
+            raise
+        await asyncio.to_thread(f.close)
+        return digest.hexdigest()
+
+    async def get_file(self, file_id: str) -> dict | None:
+        return await self.registry.get_file(file_id)
+
+    async def get_files(self, file_ids: list[str]) -> dict[str, dict]:
+        """여러 파일 메타데이터를 한 번에 조회한다 (없는 ID는 결과에서 빠짐)."""
+        return await self.registry.get_files(file_ids)
+
+    async def upload_photos(self, photos: MultipartFileStream) -> list[dict]:
+        """사진 배치를 저장하고 입력 순서대로 파일별 결과를 반환한다.
+
+        본문에서 받는 대로 한 장씩 저장 위치에 바로 기록하고(임시 파일 없이, 쓰기는 스레드에서),
+        잘못된 사진이나 디스크 오류(OSError)는 해당 항목만 error로 표시한다. 성공한 사진은
+        한 번에 저장소에 등록한다. photo_normalize가 켜져 있으면 렌더 크기로 줄인
+        파생본(render_path)을 photo_upload_concurrency개씩 동시에 만든다.
+        본문이 끊기거나 파일 수가 한도를 넘으면 이미 기록한 파일을 지우고 예외를 올린다.
+        """
+        os.makedirs(settings.upload_dir, exist_ok=True)
+        semaphore = asyncio.Semaphore(max(1, settings.photo_upload_concurrency))
+        results: list[dict] = []
+        pending: list[asyncio.Task[dict]] = []
+        written: list[str] = []
+
+        async def finish(record: dict) -> dict:
+            # 렌더용 파생본 (photo_normalize일 때만, 프로세스 풀에서) — 동시 수 제한
+            async with semaphore:
+                render_path = await photo_normalizer.normalize(record["file_path"])
+            if render_path:
+                record["render_path"] = render_path
+            return record
+
+        try:
+            while True:
+                if len(results) >= settings.photo_upload_max_files:
+                    raise ValueError(f"Too many files: max {settings.photo_upload_max_files}")
+                result = {
+                    "index": len(results), "filename": photos.filename,
+                    "fileId": None, "error": None,
+                }
+                results.append(result)
+                file_id = str(uuid.uuid4())
+                file_path = os.path.join(settings.upload_dir, f"{file_id}.jpg")
+                try:
+                    content_hash = await self._stream_to_disk(
+                        photos, file_path,
+                        max_mb=settings.max_photo_size_mb, check_head=check_jpeg_signature,
+                    )
+                except IncompleteBodyError:
+                    raise
+                except (ValueError, UploadTooLargeError, OSError) as e:
+                    # 부분 파일은 _stream_to_disk가 지웠다 — 이 사진만 실패
+                    result["error"] = str(e)
+                else:
+                    written.append(file_path)
+                    result["fileId"] = file_id
+                    record = self._photo_record(file_id, file_path, photos.filename, content_hash)
+                    pending.append(asyncio.create_task(finish(record)))
+                if not await photos.next_file():
+                    break
+            records = await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await asyncio.to_thread(_remove_photos, written)
+            raise
+        await self.registry.save_files(records)
 
-    def get_file(self, file_id: str) -> dict | None:
-        return file_store.get(file_id)
+        logger.info(f"photos uploaded: {len(records)}/{len(results)} ok")
+        return results
 
-    def store_photo(self, file_id: str, file_path: str) -> None:
-        """사진 파일 정보를 file_store에 등록한다."""
-        file_store[file_id] = {
+    def _photo_record(
+        self, file_id: str, file_path: str, original_filename: str | None, content_hash: str,
+    ) -> dict:
+        return {
             "file_id": file_id,
             "filename": os.path.basename(file_path),
-            "original_filename": os.path.basename(file_path),
+            "original_filename": original_filename or os.path.basename(file_path),
             "file_path": file_path,
             "mime_type": "image/jpeg",
             "total_frames": 1,
             "duration": 0.0,
+            "content_hash": content_hash,
         }
 
-    async def _probe_video(self, file_path: str) -> tuple[int, float]:
-        """ffprobe로 총 프레임 수와 길이(초)를 반환한다."""
-        # 프레임 수 + 길이를 한번에 (count_frames로 정확한 값)
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-count_frames", "-select_streams", "v:0",
-            "-show_entries", "stream=nb_read_frames,duration",
-            "-show_entries", "format=duration",
-            "-of", "json",
-            file_path,
-        ]
+    async def _probe_video(self, file_path: str) -> tuple[int, float, bool, tuple[int, int]]:
+        """헤더 메타데이터로 (총 프레임 수, 길이(초), 프레임 수가 정확한지, 해상도)를 반환한다.
 
-        try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-            )
-            out, _ = await proc.communicate()
-
-            import json
-            data = json.loads(out.decode())
-
-            # 프레임 수
-            total_frames = 0
-            streams = data.get("streams", [])
-            if streams:
-                val = streams[0].get("nb_read_frames", "0")
-                if val and val != "N/A":
-                    total_frames = int(val)
-
-            # 길이: stream duration → format duration 순서로 시도
-            duration = 0.0
-            if streams:
-                val = streams[0].get("duration", "N/A")
-                if val and val != "N/A":
-                    duration = float(val)
-            if duration <= 0:
-                val = data.get("format", {}).get("duration", "N/A")
-                if val and val != "N/A":
-                    duration = float(val)
-
-            # webm은 duration이 N/A일 수 있음 → 프레임수로 추정
-            if duration <= 0 and total_frames > 0:
-                duration = total_frames / 30.0
-                logger.info(f"duration estimated from frames: {duration}s")
-
-            return total_frames, duration
-        except Exception as e:
-            logger.warning(f"ffprobe failed: {e}, using fallback")
-            return 0, 0.0
+        영상을 디코딩하지 않으므로 업로드 응답 시간이 녹화 길이와 무관하다.
+        헤더에 프레임 수가 없으면 길이 × fps 추정값이고, 정확한 값은 렌더 시점에
+        필요할 때만 계산한다 (TimelapseService._resolve_source_frames).
+        """
+        info = await media_probe.probe(file_path)
+        total_frames = info.estimated_frames(fallback_fps=30)
+        duration = info.duration
+
+        # webm은 duration이 N/A일 수 있음 → 프레임수로 추정
+        if duration <= 0 and total_frames > 0:
+            duration = total_frames / 30.0
+            logger.info(f"duration estimated from frames: {duration}s")
+
+        return total_frames, duration, info.frames_exact, (info.width, info.height)
+
+
+def validate_extension(filename: str | None) -> str:
+    """허용된 영상 확장자인지 확인하고 소문자 확장자를 반환한다."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {ext}")
+    return ext
+
+
+def check_signature(head: bytes) -> None:
+    """MP4/MOV 컨테이너 매직 바이트 확인 (확장자만 바꾼 파일 거부)."""
+    if len(head) < SIGNATURE_BYTES or head[4:8] not in CONTAINER_BOX_TYPES:
+        raise ValueError("Invalid video file: not an MP4/MOV container")
+
+
+def check_jpeg_signature(head: bytes) -> None:
+    """JPEG SOI 마커 확인."""
+    if not head.startswith(JPEG_SIGNATURE):
+        raise ValueError("Invalid photo: not a JPEG image")
+
+
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    f.write(chunk)
+    digest.update(chunk)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_photos(paths: list[str]) -> None:
+    """저장한 사진과 (있으면) 렌더용 파생본을 지운다."""
+    for path in paths:
+        _remove_quietly(path)
+        _remove_quietly(os.path.splitext(path)[0] + RENDER_SUFFIX)
@@ -0,0 +1,121 @@
+"""오버레이 합성 벤치마크: 프레임마다 drawtext / drawbox vs 미리 그린 RGBA 자산 + overlay.
+
+사진 N장에 스타일별 오버레이를 두 방식으로 합성해 CPU 시간을 재고, 오버레이가 없는
+기준 렌더(scale + pad)를 빼서 프레임당 오버레이 비용(ms)을 비교한다. 인코딩 비용이
+섞이지 않도록 null muxer로 내보낸다. 자산은 처음 한 번 그리는 시간(cold)과 캐시에서
+꺼내는 시간(warm)을 따로 적는다. 자산 방식에서도 값이 바뀌는 타이머는 drawtext로 남는다.
+
+    cd backend
+    PYTHONPATH=. python benchmarks/overlay.py --count 900 --repeat 3
+
+ffmpeg에 drawtext가 없으면 (libfreetype/harfbuzz 없이 빌드) drawtext 열은 건너뛴다.
+FFMPEG 환경변수로 ffmpeg 바이너리를 지정할 수 있다 (기본: PATH의 ffmpeg).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from app.config import settings
+from app.services.overlay_assets import OverlayInput
+from app.services.timelapse_service import (
+    BASE_FPS,
+    TimelapseService,
+    build_photo_input,
+    overlay_graph,
+    overlay_input_args,
+)
+from app.services.upload_service import UploadService
+from benchmarks.photo_input import make_photos, run
+
+FFMPEG = os.environ.get("FFMPEG", "ffmpeg")
+STYLES = ("none", "timer", "streak", "progress")
+
+
+def has_drawtext() -> bool:
+    out = subprocess.run(
+        [FFMPEG, "-hide_banner", "-filters"], capture_output=True, text=True,
+    ).stdout
+    return any(line.split()[1:2] == ["drawtext"] for line in out.splitlines() if line.strip())
+
+
+def style_params(style: str, aspect_ratio: str, frames: int) -> tuple:
+    """_build_overlay_filters / _prerender_overlay 인자 (60분 목표, 50분 녹화, 7일 스트릭)."""
+    return style, "", 7, 60, 3000, "countdown", max(1, frames // BASE_FPS), aspect_ratio
+
+
+def prerender(
+    service: TimelapseService, params: tuple,
+) -> tuple[tuple[list[OverlayInput], list[str]] | None, float, float]:
+    """((overlay 입력, 남는 필터), 처음 그리는 초, 캐시에서 꺼내는 초)."""
+    start = time.perf_counter()
+    prerendered = asyncio.run(service._prerender_overlay(*params))
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    asyncio.run(service._prerender_overlay(*params))
+    return prerendered, cold, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=900)
+    parser.add_argument("--size", default="1080x1920", help="사진 해상도 (기본: 세로 1080p)")
+    parser.add_argument("--aspect-ratio", default="9:16")
+    parser.add_argument("--repeat", type=int, default=3, help="실행마다 최소 CPU 시간을 쓴다")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="overlay_bench_")
+    settings.upload_dir = work_dir
+    service = TimelapseService(UploadService())
+    drawtext = has_drawtext()
+    try:
+        photos = make_photos(args.count, work_dir, args.size)
+        input_args = build_photo_input(photos, os.path.join(work_dir, "frames"), "sequence")
+        _, scale_filter, pad_filter = service._get_crop_and_scale(args.aspect_ratio)
+        base_vf = f"{scale_filter}:force_original_aspect_ratio=decrease,{pad_filter}"
+
+        def cpu(extra_inputs: list[str], graph: str) -> float:
+            cmd = [
+                FFMPEG, "-y", "-v", "error", *input_args, *extra_inputs,
+                "-filter_complex", graph, "-map", "[out]", "-r", str(BASE_FPS), "-f", "null", "-",
+            ]
+            return min(run(cmd)[1] for _ in range(args.repeat))
+
+        base = cpu([], f"[0:v]{base_vf}[out]")
+        print(f"base (scale+pad): {base / args.count * 1000:.3f} ms/frame cpu")
+        print(f"{'style':>9} | {'drawtext':>9} | {'assets':>9} | {'cold s':>7} | {'warm s':>7}")
+        for style in STYLES:
+            params = style_params(style, args.aspect_ratio, args.count)
+            legacy = "skipped"
+            if drawtext:
+                filters = service._build_overlay_filters(*params)
+                spent = cpu([], f"[0:v]{','.join([base_vf, *filters])}[out]") - base
+                legacy = f"{spent / args.count * 1000:.3f}"
+            prerendered, cold, warm = prerender(service, params)
+            if prerendered is None:
+                print(f"{style:>9} | {legacy:>9} | Pillow not installed")
+                continue
+            overlays, filters = prerendered
+            if filters and not drawtext:
+                print(f"{style:>9} | {legacy:>9} | skipped (needs drawtext)")
+                continue
+            chain = ",".join([base_vf, *filters])
+            graph = ";".join(overlay_graph(f"[0:v]{chain}", overlays, "[out]"))
+            spent = cpu(overlay_input_args(overlays), graph) - base
+            print(
+                f"{style:>9} | {legacy:>9} | {spent / args.count * 1000:>9.3f} | "
+                f"{cold:>7.3f} | {warm:>7.3f}",
+                flush=True,
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
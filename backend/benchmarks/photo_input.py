@@ -0,0 +1,133 @@
+"""사진 타임랩스 입력 방식 벤치마크: concat demuxer vs 번호 시퀀스(image2).
+
+사진 N장을 만들고 두 방식으로 같은 필터/인코더 설정의 렌더를 돌려 벽시계/CPU 시간을 비교한다.
+인코딩 직전 프레임의 md5(framemd5)로 두 방식이 같은 사진을 같은 순서로 내보내는지도 확인한다.
+concat은 duration 반올림 때문에 일부 프레임(과 마지막 프레임)을 중복 출력하므로,
+연속 중복을 걷어낸 뒤 비교한다.
+
+    cd backend
+    PYTHONPATH=. python benchmarks/photo_input.py --counts 500 5000 20000
+
+FFMPEG 환경변수로 ffmpeg 바이너리를 지정할 수 있다 (기본: PATH의 ffmpeg).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+
+from app.services.timelapse_service import (
+    BASE_FPS,
+    PHOTO_ENCODER_ARGS,
+    TimelapseService,
+    build_photo_input,
+)
+from app.services.upload_service import UploadService
+
+FFMPEG = os.environ.get("FFMPEG", "ffmpeg")
+
+
+def make_photos(count: int, dest_dir: str, size: str) -> list[str]:
+    """testsrc로 JPEG count장을 만들고 업로드와 같은 UUID 파일명으로 바꾼다."""
+    src_dir = os.path.join(dest_dir, "src")
+    os.makedirs(src_dir)
+    subprocess.run(
+        [
+            FFMPEG, "-v", "error", "-f", "lavfi",
+            "-i", f"testsrc2=size={size}:rate={BASE_FPS}",
+            "-frames:v", str(count), "-q:v", "4",
+            os.path.join(src_dir, "%06d.jpg"),
+        ],
+        check=True,
+    )
+    paths: list[str] = []
+    for name in sorted(os.listdir(src_dir)):
+        path = os.path.join(dest_dir, f"{uuid.uuid4()}.jpg")
+        os.rename(os.path.join(src_dir, name), path)
+        paths.append(path)
+    os.rmdir(src_dir)
+    return paths
+
+
+def run(cmd: list[str]) -> tuple[float, float]:
+    """(벽시계 초, 자식 프로세스 CPU 초)."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return wall, cpu
+
+
+def render(
+    photos: list[str], work_dir: str, mode: str, vf: str, output: str,
+) -> tuple[float, float]:
+    start = time.perf_counter()
+    input_args = build_photo_input(photos, os.path.join(work_dir, f"{mode}_frames"), mode)
+    setup = time.perf_counter() - start
+    wall, cpu = run([
+        FFMPEG, "-y", "-v", "error", *input_args,
+        "-vf", vf, "-r", str(BASE_FPS), *PHOTO_ENCODER_ARGS, output,
+    ])
+    return setup + wall, cpu
+
+
+def filtered_frames(photos: list[str], work_dir: str, mode: str, vf: str) -> list[str]:
+    """인코더에 들어가는 프레임들의 md5 (연속 중복 제거 전)."""
+    input_args = build_photo_input(photos, os.path.join(work_dir, f"{mode}_md5"), mode)
+    out = subprocess.run(
+        [FFMPEG, "-v", "error", *input_args, "-vf", vf, "-r", str(BASE_FPS), "-f", "framemd5", "-"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return [
+        line.rsplit(",", 1)[-1].strip() for line in out.splitlines() if not line.startswith("#")
+    ]
+
+
+def dedupe(frames: list[str]) -> list[str]:
+    return [f for i, f in enumerate(frames) if i == 0 or frames[i - 1] != f]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 5000, 20000])
+    parser.add_argument("--size", default="1080x1920", help="사진 해상도 (기본: 세로 1080p)")
+    parser.add_argument("--aspect-ratio", default="9:16")
+    args = parser.parse_args()
+
+    _, scale_filter, pad_filter = TimelapseService(UploadService())._get_crop_and_scale(
+        args.aspect_ratio,
+    )
+    vf = f"{scale_filter}:force_original_aspect_ratio=decrease,{pad_filter}"
+
+    print(f"{'photos':>7} | {'mode':>8} | {'wall s':>7} | {'cpu s':>7} | frames | same photos")
+    for count in args.counts:
+        work_dir = tempfile.mkdtemp(prefix="photo_bench_")
+        try:
+            photos = make_photos(count, work_dir, args.size)
+            outputs: dict[str, list[str]] = {}
+            for mode in ("concat", "sequence"):
+                output = os.path.join(work_dir, f"{mode}.mp4")
+                wall, cpu = render(photos, work_dir, mode, vf, output)
+                outputs[mode] = filtered_frames(photos, work_dir, mode, vf)
+                same = "" if mode == "concat" else str(
+                    dedupe(outputs["concat"]) == dedupe(outputs[mode])
+                )
+                print(
+                    f"{count:>7} | {mode:>8} | {wall:>7.2f} | {cpu:>7.2f} | "
+                    f"{len(outputs[mode]):>6} | {same}",
+                    flush=True,
+                )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 import io
+import os
+import uuid
+from types import SimpleNamespace
 
 import pytest
 from httpx import AsyncClient
 
+from tests.conftest import FAKE_MP4
+
 
 class TestCreateTimelapse:
     """POST /api/timelapse - 타임랩스 변환 요청
@@ -25,7 +30,7 @@ class TestCreateTimelapse:
         Then: 202 반환, taskId 포함
         """
         # Given - 먼저 파일 업로드
-        files = {"file": ("test.mp4", io.BytesIO(b"fake-video"), "video/mp4")}
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
         upload_res = await client.post("/api/upload", files=files)
         file_id = upload_res.json()["fileId"]
 
@@ -49,7 +54,7 @@ class TestCreateTimelapse:
         Then: 400 반환
         """
         # Given
-        files = {"file": ("test.mp4", io.BytesIO(b"fake-video"), "video/mp4")}
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
         upload_res = await client.post("/api/upload", files=files)
         file_id = upload_res.json()["fileId"]
 
@@ -79,6 +84,28 @@ class TestCreateTimelapse:
         # Then
         assert response.status_code == 404
 
+    @pytest.mark.asyncio
+    async def test_should_return_404_for_session_without_owner(self, client: AsyncClient) -> None:
+        """sessionId는 로그인한 유저 본인의 세션만 (다른 세션 렌더를 대체로 취소하지 못하게)
+
+        Given: 업로드된 영상
+        When: 비로그인으로 sessionId를 붙여 변환 요청
+        Then: 404, 작업을 만들지 않음
+        """
+        # Given
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
+        file_id = (await client.post("/api/upload", files=files)).json()["fileId"]
+
+        # When
+        response = await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "sessionId": str(uuid.uuid4()),
+        })
+
+        # Then
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Session not found"
+
 
 class TestGetTimelapseStatus:
     """GET /api/timelapse/{taskId} - 변환 상태 조회
@@ -99,7 +126,7 @@ class TestGetTimelapseStatus:
         Then: 200 반환, status/progress 포함
         """
         # Given - 파일 업로드 → 변환 요청
-        files = {"file": ("test.mp4", io.BytesIO(b"fake-video"), "video/mp4")}
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
         upload_res = await client.post("/api/upload", files=files)
         file_id = upload_res.json()["fileId"]
 
@@ -116,7 +143,7 @@ class TestGetTimelapseStatus:
         assert response.status_code == 200
         data = response.json()
         assert data["taskId"] == task_id
-        assert data["status"] in ("processing", "completed", "failed")
+        assert data["status"] in ("queued", "processing", "completed", "failed")
         assert 0 <= data["progress"] <= 100
 
     @pytest.mark.asyncio
@@ -167,7 +194,7 @@ class TestDownloadTimelapse:
         Then: 404 반환
         """
         # Given
-        files = {"file": ("test.mp4", io.BytesIO(b"fake-video"), "video/mp4")}
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
         upload_res = await client.post("/api/upload", files=files)
         file_id = upload_res.json()["fileId"]
 
@@ -182,3 +209,994 @@ class TestDownloadTimelapse:
 
         # Then
         assert response.status_code == 404
+
+
+class TestDownloadValidators:
+    """GET /api/download/{taskId} - Range / ETag / 조건부 GET
+
+    요구사항:
+    ========
+    1. 목적: 모바일 플레이어의 범위 요청과 재요청을 캐시/CDN이 처리할 수 있게
+    2. 응답: 출력 내용 해시 기반 강한 ETag, immutable 장기 캐시, Range 시 206
+    3. 비즈니스 규칙: If-None-Match 일치 시 304, If-Range 불일치 시 전체(200)
+    """
+
+    async def _completed_task(self, content: bytes) -> str:
+        import hashlib
+
+        from app.api.v1 import timelapse as timelapse_mod
+        from app.config import settings
+        service = timelapse_mod.timelapse_service
+        output_path = os.path.join(settings.upload_dir, "done_timelapse.mp4")
+        with open(output_path, "wb") as f:
+            f.write(content)
+        await service.registry.save_task({
+            "task_id": "done-task", "status": "completed", "progress": 100,
+            "output_path": output_path,
+        })
+        return hashlib.sha256(content).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_should_send_strong_etag_and_immutable_cache(
+        self, client: AsyncClient,
+    ) -> None:
+        """완성본 다운로드 헤더
+
+        Given: 완료된 작업
+        When: 다운로드
+        Then: 200, ETag = 내용 sha256, immutable Cache-Control, Accept-Ranges
+        """
+        # Given
+        digest = await self._completed_task(b"0123456789")
+
+        # When
+        response = await client.get("/api/download/done-task")
+
+        # Then
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{digest}"'
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["accept-ranges"] == "bytes"
+
+    @pytest.mark.asyncio
+    async def test_should_return_206_for_range(self, client: AsyncClient) -> None:
+        """범위 요청
+
+        Given: 완료된 작업 (10바이트)
+        When: Range: bytes=2-5
+        Then: 206, 해당 바이트만, Content-Range
+        """
+        # Given
+        await self._completed_task(b"0123456789")
+
+        # When
+        response = await client.get("/api/download/done-task", headers={"Range": "bytes=2-5"})
+
+        # Then
+        assert response.status_code == 206
+        assert response.content == b"2345"
+        assert response.headers["content-range"] == "bytes 2-5/10"
+
+    @pytest.mark.asyncio
+    async def test_should_return_304_when_etag_matches(self, client: AsyncClient) -> None:
+        """조건부 GET
+
+        Given: 클라이언트가 같은 ETag를 가지고 있음
+        When: If-None-Match로 재요청
+        Then: 304, 본문 없음
+        """
+        # Given
+        digest = await self._completed_task(b"0123456789")
+
+        # When
+        response = await client.get(
+            "/api/download/done-task", headers={"If-None-Match": f'W/"other", "{digest}"'},
+        )
+
+        # Then
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == f'"{digest}"'
+
+    @pytest.mark.asyncio
+    async def test_should_ignore_range_when_if_range_is_stale(self, client: AsyncClient) -> None:
+        """If-Range 불일치
+
+        Given: 클라이언트가 가진 ETag가 현재와 다름
+        When: Range + If-Range(이전 ETag)
+        Then: 200, 전체 본문
+        """
+        # Given
+        await self._completed_task(b"0123456789")
+
+        # When
+        response = await client.get(
+            "/api/download/done-task", headers={"Range": "bytes=2-5", "If-Range": '"stale"'},
+        )
+
+        # Then
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+
+
+class TestDownloadDelivery:
+    """다운로드 전송 모드 - 서명 URL / X-Accel-Redirect
+
+    요구사항:
+    ========
+    1. 목적: 큰 MP4 전송이 앱 워커를 점유하지 않도록 정적 서버/프록시에 넘김
+    2. signed: 상태 조회 downloadUrl이 만료 시각이 있는 서명 URL
+    3. accel: /api/download가 본문 없이 X-Accel-Redirect 헤더만 반환
+    """
+
+    async def _completed_task(self) -> str:
+        from app.api.v1 import timelapse as timelapse_mod
+        from app.config import settings
+        output_path = os.path.join(settings.upload_dir, "done_timelapse.mp4")
+        with open(output_path, "wb") as f:
+            f.write(b"0123456789")
+        await timelapse_mod.timelapse_service.registry.save_task({
+            "task_id": "done-task", "status": "completed", "progress": 100,
+            "output_path": output_path,
+        })
+        return output_path
+
+    @pytest.mark.asyncio
+    async def test_should_return_signed_url_in_signed_mode(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """signed 모드 상태 조회
+
+        Given: download_delivery=signed, 완료된 작업
+        When: 상태 조회
+        Then: downloadUrl이 /media/... 서명 URL, downloadExpiresAt 포함
+        """
+        # Given
+        from app.config import settings
+        monkeypatch.setattr(settings, "download_delivery", "signed")
+        monkeypatch.setattr(settings, "media_url_secret", "k")
+        await self._completed_task()
+
+        # When
+        status = (await client.get("/api/timelapse/done-task")).json()
+
+        # Then
+        assert status["downloadUrl"].startswith("/media/done_timelapse.mp4?md5=")
+        assert f"expires={status['downloadExpiresAt']}" in status["downloadUrl"]
+
+    @pytest.mark.asyncio
+    async def test_should_delegate_transfer_in_accel_mode(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """accel 모드 다운로드
+
+        Given: download_delivery=accel, 완료된 작업
+        When: 다운로드
+        Then: 200, 본문 없음, X-Accel-Redirect + ETag + Content-Disposition
+        """
+        # Given
+        from app.config import settings
+        monkeypatch.setattr(settings, "download_delivery", "accel")
+        await self._completed_task()
+
+        # When
+        response = await client.get("/api/download/done-task")
+
+        # Then
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == "/_media/done_timelapse.mp4"
+        assert response.headers["etag"].startswith('"')
+        assert "timelapse.mp4" in response.headers["content-disposition"]
+
+
+class TestSideOutputs:
+    """포스터 / 미리보기 부가 출력
+
+    요구사항:
+    ========
+    1. 목적: 목록/공유 화면이 본 영상을 받지 않고도 썸네일과 짧은 루프를 보여줌
+    2. 응답: 부가 출력이 있으면 상태 조회에 posterUrl / previewUrl
+    3. 다운로드: /api/download/{taskId}/{poster|preview}, 없는 종류는 404
+    """
+
+    async def _completed_task(self) -> None:
+        from app.api.v1 import timelapse as timelapse_mod
+        from app.config import settings
+        output_path = os.path.join(settings.upload_dir, "side_timelapse.mp4")
+        for path, content in (
+            (output_path, b"video"),
+            (os.path.join(settings.upload_dir, "side_timelapse.poster.jpg"), b"\xff\xd8poster"),
+        ):
+            with open(path, "wb") as f:
+                f.write(content)
+        await timelapse_mod.timelapse_service.registry.save_task({
+            "task_id": "side-task", "status": "completed", "progress": 100,
+            "output_path": output_path,
+        })
+
+    @pytest.mark.asyncio
+    async def test_should_expose_existing_side_outputs(self, client: AsyncClient) -> None:
+        """상태 조회의 부가 출력 URL
+
+        Given: 포스터만 있는 완료된 작업
+        When: 상태 조회
+        Then: posterUrl 있음, previewUrl 없음
+        """
+        # Given
+        await self._completed_task()
+
+        # When
+        status = (await client.get("/api/timelapse/side-task")).json()
+
+        # Then
+        assert status["posterUrl"] == "/api/download/side-task/poster"
+        assert status["previewUrl"] is None
+
+    @pytest.mark.asyncio
+    async def test_should_download_poster(self, client: AsyncClient) -> None:
+        """포스터 다운로드
+
+        Given: 포스터가 있는 완료된 작업
+        When: /api/download/side-task/poster, /preview
+        Then: 포스터는 200 image/jpeg + ETag, 미리보기는 404
+        """
+        # Given
+        await self._completed_task()
+
+        # When
+        poster = await client.get("/api/download/side-task/poster")
+        preview = await client.get("/api/download/side-task/preview")
+
+        # Then
+        assert poster.status_code == 200
+        assert poster.headers["content-type"] == "image/jpeg"
+        assert poster.content == b"\xff\xd8poster"
+        assert "etag" in poster.headers
+        assert preview.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_should_serve_thumbnails_index_through_api_in_signed_mode(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """스프라이트 색인은 signed 모드에서도 API 경로
+
+        Given: download_delivery=signed, 스프라이트와 WebVTT 색인이 있는 완료된 작업
+        When: 상태 조회, 색인 다운로드
+        Then: spriteUrl은 서명 URL, thumbnailsUrl은 /api/download/.../thumbnails (text/vtt)
+        """
+        # Given
+        from app.config import settings
+        monkeypatch.setattr(settings, "download_delivery", "signed")
+        monkeypatch.setattr(settings, "media_url_secret", "k")
+        await self._completed_task()
+        for suffix, content in ((".sprite.jpg", b"\xff\xd8"), (".sprite.vtt", b"WEBVTT\n")):
+            with open(os.path.join(settings.upload_dir, f"side_timelapse{suffix}"), "wb") as f:
+                f.write(content)
+
+        # When
+        status = (await client.get("/api/timelapse/side-task")).json()
+        index = await client.get("/api/download/side-task/thumbnails")
+
+        # Then
+        assert status["spriteUrl"].startswith("/media/side_timelapse.sprite.jpg?md5=")
+        assert status["thumbnailsUrl"] == "/api/download/side-task/thumbnails"
+        assert index.headers["content-type"].startswith("text/vtt")
+        assert index.content == b"WEBVTT\n"
+
+
+class TestRenderQueueLimit:
+    """POST /api/timelapse - 렌더 대기열 포화
+
+    요구사항:
+    ========
+    1. 목적: 동시에 몰린 변환 요청이 서버를 과부하시키지 않도록 제한
+    2. 에러: 대기열이 가득 차면 429
+    """
+
+    @pytest.mark.asyncio
+    async def test_should_reject_when_queue_full(self, client: AsyncClient) -> None:
+        """대기열 포화 시 429
+
+        Given: 대기열 최대 길이가 0
+        When: 타임랩스 변환 API 호출
+        Then: 429 반환
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        timelapse_mod.timelapse_service.render_queue.max_pending = 0
+
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
+        upload_res = await client.post("/api/upload", files=files)
+        file_id = upload_res.json()["fileId"]
+
+        # When
+        response = await client.post("/api/timelapse", json={
+            "fileId": file_id,
+            "outputSeconds": 60, "recordingSeconds": 120,
+        })
+
+        # Then
+        assert response.status_code == 429
+
+
+class TestCancelTimelapse:
+    """DELETE /api/timelapse/:taskId - 변환 취소
+
+    요구사항:
+    ========
+    1. 목적: 내보내기 화면을 떠난 사용자의 렌더가 CPU와 디스크를 계속 쓰지 않도록
+    2. 응답: 취소되면 204, 상태 조회 시 cancelled
+    3. 에러: 없는 작업 / 다른 유저의 작업 404, 이미 끝난 작업 / 다른 워커가 맡은 작업 409
+    """
+
+    async def _save(self, status: str, owner_id: str | None = None) -> str:
+        from app.api.v1 import timelapse as timelapse_mod
+        from app.config import settings
+        await timelapse_mod.timelapse_service.registry.save_task({
+            "task_id": "task-1",
+            "status": status,
+            "progress": 0,
+            "output_path": os.path.join(settings.upload_dir, "task-1_timelapse.mp4"),
+            "owner_id": owner_id,
+        })
+        return "task-1"
+
+    @pytest.mark.asyncio
+    async def test_should_cancel_queued_task(self, client: AsyncClient, monkeypatch) -> None:
+        """대기 중인 작업 취소
+
+        Given: 이 워커의 대기열에 있는 queued 작업
+        When: 취소 API 호출
+        Then: 204, 상태 조회 시 cancelled
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        from app.services.render_queue import RenderJob
+        task_id = await self._save("queued")
+        queue = timelapse_mod.timelapse_service.render_queue
+        monkeypatch.setattr(queue, "workers", 0)  # 꺼내 가지 않고 대기만
+        queue.submit(RenderJob(task_id, "video", {}))
+
+        # When
+        response = await client.delete(f"/api/timelapse/{task_id}")
+
+        # Then
+        assert response.status_code == 204
+        status = (await client.get(f"/api/timelapse/{task_id}")).json()
+        assert status["status"] == "cancelled"
+        assert status["downloadUrl"] is None
+
+    @pytest.mark.asyncio
+    async def test_should_return_409_when_already_finished(self, client: AsyncClient) -> None:
+        """이미 끝난 작업은 취소하지 않음
+
+        Given: completed 작업
+        When: 취소 API 호출
+        Then: 409
+        """
+        # Given
+        task_id = await self._save("completed")
+
+        # When
+        response = await client.delete(f"/api/timelapse/{task_id}")
+
+        # Then
+        assert response.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_should_return_409_when_owned_by_another_worker(
+        self, client: AsyncClient,
+    ) -> None:
+        """다른 워커가 맡은 렌더는 취소하지 않음
+
+        Given: 이 워커의 대기열에 없는 processing 작업
+        When: 취소 API 호출
+        Then: 409, 상태는 processing 그대로
+        """
+        # Given
+        task_id = await self._save("processing")
+
+        # When
+        response = await client.delete(f"/api/timelapse/{task_id}")
+
+        # Then
+        assert response.status_code == 409
+        status = (await client.get(f"/api/timelapse/{task_id}")).json()
+        assert status["status"] == "processing"
+
+    @pytest.mark.asyncio
+    async def test_should_return_404_for_task_of_another_user(self, client: AsyncClient) -> None:
+        """다른 유저(또는 비로그인)의 요청으로는 취소하지 않음
+
+        Given: 유저 A가 만든 queued 작업
+        When: 비로그인 / 유저 B로 취소 API 호출
+        Then: 둘 다 404, 상태는 queued 그대로
+        """
+        # Given
+        from app.dependencies import get_optional_user
+        from app.main import app
+        task_id = await self._save("queued", owner_id=str(uuid.uuid4()))
+
+        # When
+        anonymous = await client.delete(f"/api/timelapse/{task_id}")
+        app.dependency_overrides[get_optional_user] = lambda: SimpleNamespace(
+            id=uuid.uuid4(), subscription_status=None,
+        )
+        try:
+            other_user = await client.delete(f"/api/timelapse/{task_id}")
+        finally:
+            app.dependency_overrides.pop(get_optional_user)
+
+        # Then
+        assert anonymous.status_code == 404
+        assert other_user.status_code == 404
+        status = (await client.get(f"/api/timelapse/{task_id}")).json()
+        assert status["status"] == "queued"
+
+    @pytest.mark.asyncio
+    async def test_should_return_404_when_task_not_found(self, client: AsyncClient) -> None:
+        """존재하지 않는 작업
+
+        Given: 없는 taskId
+        When: 취소 API 호출
+        Then: 404
+        """
+        response = await client.delete("/api/timelapse/nonexistent")
+        assert response.status_code == 404
+
+
+class TestRenderResources:
+    """GET /api/render/resources - 렌더 자원 배분 현황
+
+    요구사항:
+    ========
+    1. 목적: 동시 FFmpeg 작업들이 코어 예산을 어떻게 나눠 쓰는지 확인
+    2. 응답: 코어 예산, 배분된 스레드 합, 작업별 배분, 대기열 상태
+    """
+
+    @pytest.mark.asyncio
+    async def test_should_report_allocation_per_job(self, client: AsyncClient) -> None:
+        """실행 중인 작업의 스레드 배분
+
+        Given: 코어 예산 8, 렌더 작업 하나가 배분을 받아 실행 중
+        When: 자원 현황 조회
+        Then: 200, 작업 하나에 8스레드
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        governor = timelapse_mod.timelapse_service.governor
+        governor.cores = 8
+
+        # When
+        with governor.allocate("t1", "render"):
+            response = await client.get("/api/render/resources")
+
+        # Then
+        assert response.status_code == 200
+        data = response.json()
+        assert data["cores"] == 8
+        assert data["allocated_threads"] == 8
+        assert [(job["job_id"], job["threads"]) for job in data["jobs"]] == [("t1", 8)]
+        assert data["running"] == 0 and data["pending"] == 0
+
+
+class TestRenderCacheReuse:
+    """POST /api/timelapse - 렌더 캐시 재사용
+
+    요구사항:
+    ========
+    1. 목적: 같은 원본 + 같은 설정의 재요청은 다시 인코딩하지 않음
+    2. 응답: 캐시 히트 시 즉시 completed 상태의 작업
+    """
+
+    @pytest.mark.asyncio
+    async def test_should_return_completed_task_on_cache_hit(self, client: AsyncClient) -> None:
+        """캐시 히트 시 즉시 완료
+
+        Given: 같은 요청의 결과가 캐시에 있음
+        When: 동일한 타임랩스 변환 재요청
+        Then: 202, 새 작업은 바로 completed + downloadUrl
+        """
+        # Given - 첫 요청이 끝날 때까지 대기 후 결과를 캐시에 등록
+        import asyncio
+
+        from app.api.v1 import timelapse as timelapse_mod
+        service = timelapse_mod.timelapse_service
+
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
+        upload_res = await client.post("/api/upload", files=files)
+        body = {
+            "fileId": upload_res.json()["fileId"],
+            "outputSeconds": 60, "recordingSeconds": 120,
+        }
+        first_id = (await client.post("/api/timelapse", json=body)).json()["taskId"]
+        for _ in range(100):
+            first = await service.get_task(first_id)
+            if first["status"] not in ("queued", "processing"):
+                break
+            await asyncio.sleep(0.01)
+        with open(first["output_path"], "wb") as f:
+            f.write(b"rendered")
+        await service.render_cache.store(first["cache_key"], first["output_path"])
+
+        # When
+        response = await client.post("/api/timelapse", json=body)
+
+        # Then
+        assert response.status_code == 202
+        task_id = response.json()["taskId"]
+        status = (await client.get(f"/api/timelapse/{task_id}")).json()
+        assert status["status"] == "completed"
+        assert status["downloadUrl"] == f"/api/download/{task_id}"
+        assert service.render_cache.hits == 1
+
+
+class TestMultiAspectRatio:
+    """POST /api/timelapse (aspectRatios) - 여러 비율 동시 출력
+
+    요구사항:
+    ========
+    1. 목적: 같은 세션을 여러 비율로 내보낼 때 원본을 한 번만 디코딩
+    2. 입력: aspectRatios (비율 배열)
+    3. 응답: 하나의 taskId, 상태 조회 시 비율별 outputs[].downloadUrl
+    4. 에러: 잘못된 비율 400
+    5. 비즈니스 규칙: 비율별 결과는 단일 요청과 같은 렌더 캐시를 공유
+    """
+
+    async def _upload(self, client: AsyncClient) -> str:
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
+        return (await client.post("/api/upload", files=files)).json()["fileId"]
+
+    @pytest.mark.asyncio
+    async def test_should_reject_invalid_aspect_ratios(self, client: AsyncClient) -> None:
+        """허용되지 않은 비율 거부
+
+        Given: aspectRatios에 "3:2" 포함
+        When: 타임랩스 변환 API 호출
+        Then: 400 반환
+        """
+        # Given
+        file_id = await self._upload(client)
+
+        # When
+        response = await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatios": ["9:16", "3:2"],
+        })
+
+        # Then
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_should_render_only_uncached_ratios_in_one_job(
+        self, client: AsyncClient,
+    ) -> None:
+        """캐시에 없는 비율만 한 작업으로 렌더
+
+        Given: 1:1 결과가 이미 캐시에 있음
+        When: 9:16, 1:1, 4:5 요청
+        Then: 렌더 작업은 1개, variants는 9:16과 4:5
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        service = timelapse_mod.timelapse_service
+        submitted = []
+        service.render_queue.submit = submitted.append
+
+        file_id = await self._upload(client)
+        single_id = (await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatio": "1:1",
+        })).json()["taskId"]
+        single = await service.get_task(single_id)
+        with open(single["output_path"], "wb") as f:
+            f.write(b"square")
+        await service.render_cache.store(single["cache_key"], single["output_path"])
+        submitted.clear()
+
+        # When
+        response = await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatios": ["9:16", "1:1", "4:5"],
+        })
+
+        # Then
+        assert response.status_code == 202
+        assert len(submitted) == 1
+        assert [ratio for ratio, _ in submitted[0].params["variants"]] == ["9:16", "4:5"]
+
+    @pytest.mark.asyncio
+    async def test_should_join_identical_in_flight_request(self, client: AsyncClient) -> None:
+        """같은 비율 조합의 렌더가 진행 중이면 새로 렌더하지 않고 합류
+
+        Given: 9:16 + 1:1 요청이 대기 중
+        When: 같은 요청을 다시 보냄 (클라이언트 재시도)
+        Then: 같은 taskId, 렌더 작업은 1개
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        service = timelapse_mod.timelapse_service
+        submitted = []
+        service.render_queue.submit = submitted.append
+        file_id = await self._upload(client)
+        body = {
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatios": ["9:16", "1:1"],
+        }
+        first = (await client.post("/api/timelapse", json=body)).json()["taskId"]
+
+        # When
+        retry = (await client.post("/api/timelapse", json=body)).json()["taskId"]
+
+        # Then
+        assert retry == first
+        assert len(submitted) == 1
+
+    @pytest.mark.asyncio
+    async def test_should_remove_cached_outputs_with_sidecars_when_queue_full(
+        self, client: AsyncClient,
+    ) -> None:
+        """대기열이 가득 차 거절하면 캐시에서 연결한 비율의 출력과 부가 출력을 모두 지운다
+
+        Given: 포스터가 있는 1:1 결과가 캐시에 있음, 대기열 최대 0
+        When: 9:16, 1:1 요청
+        Then: 429, 새 작업의 1:1 출력 / 포스터가 남지 않음
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        from app.config import settings
+        service = timelapse_mod.timelapse_service
+        service.render_queue.submit = lambda job: None
+        file_id = await self._upload(client)
+        single_id = (await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatio": "1:1",
+        })).json()["taskId"]
+        single = await service.get_task(single_id)
+        with open(single["output_path"], "wb") as f:
+            f.write(b"square")
+        with open(single["output_path"].replace(".mp4", ".poster.jpg"), "wb") as f:
+            f.write(b"poster")
+        await service.render_cache.store(single["cache_key"], single["output_path"])
+        service.render_queue.max_pending = 0
+
+        # When
+        response = await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatios": ["9:16", "1:1"],
+        })
+
+        # Then
+        assert response.status_code == 429
+        assert not [n for n in os.listdir(settings.upload_dir) if "_1x1_timelapse" in n]
+
+    @pytest.mark.asyncio
+    async def test_should_expose_download_url_per_ratio(self, client: AsyncClient) -> None:
+        """완료 시 비율별 다운로드 URL
+
+        Given: 9:16, 1:1 결과가 모두 캐시에 있음
+        When: 두 비율 요청 후 상태 조회 / 비율별 다운로드
+        Then: outputs에 비율별 URL, 각 URL은 해당 비율 파일을 반환
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        service = timelapse_mod.timelapse_service
+        service.render_queue.submit = lambda job: None
+
+        file_id = await self._upload(client)
+        for ratio in ("9:16", "1:1"):
+            task_id = (await client.post("/api/timelapse", json={
+                "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+                "aspectRatio": ratio,
+            })).json()["taskId"]
+            task = await service.get_task(task_id)
+            with open(task["output_path"], "wb") as f:
+                f.write(ratio.encode())
+            await service.render_cache.store(task["cache_key"], task["output_path"])
+
+        # When
+        task_id = (await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120,
+            "aspectRatios": ["9:16", "1:1"],
+        })).json()["taskId"]
+        status = (await client.get(f"/api/timelapse/{task_id}")).json()
+
+        # Then
+        assert status["status"] == "completed"
+        urls = {o["aspectRatio"]: o["downloadUrl"] for o in status["outputs"]}
+        assert urls["1:1"] == f"/api/download/{task_id}?aspectRatio=1:1"
+        for ratio, url in urls.items():
+            assert (await client.get(url)).content == ratio.encode()
+        missing = await client.get(f"/api/download/{task_id}?aspectRatio=4:5")
+        assert missing.status_code == 404
+
+
+class TestStreamTimelapse:
+    """GET /api/stream/{taskId}/{filename} - 렌더 중 HLS 스트리밍
+
+    요구사항:
+    ========
+    1. 목적: 긴 렌더가 끝나기 전에 앞부분을 미리보기
+    2. 입력: POST /api/timelapse에 stream: true
+    3. 응답: 첫 조각이 나오면 상태 조회에 streamUrl, 플레이리스트/조각 파일 제공
+    4. 에러: 스트림 없음/허용되지 않은 파일명 404
+    """
+
+    @pytest.mark.asyncio
+    async def test_should_serve_segments_while_processing(self, client: AsyncClient) -> None:
+        """처리 중에도 나온 조각 제공
+
+        Given: stream 작업이 처리 중이고 플레이리스트와 첫 조각이 있음
+        When: 상태 조회 후 streamUrl / 조각 요청
+        Then: streamUrl 포함, 플레이리스트는 no-cache, 조각은 video/mp4
+        """
+        # Given
+        from app.api.v1 import timelapse as timelapse_mod
+        service = timelapse_mod.timelapse_service
+        service.render_queue.submit = lambda job: None
+
+        files = {"file": ("test.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
+        file_id = (await client.post("/api/upload", files=files)).json()["fileId"]
+        task_id = (await client.post("/api/timelapse", json={
+            "fileId": file_id, "outputSeconds": 60, "recordingSeconds": 120, "stream": True,
+        })).json()["taskId"]
+        assert (await client.get(f"/api/timelapse/{task_id}")).json()["streamUrl"] is None
+
+        stream_dir = service.stream_dir(task_id)
+        os.makedirs(stream_dir)
+        with open(os.path.join(stream_dir, "index.m3u8"), "w") as f:
+            f.write("#EXTM3U\n#EXTINF:2.0,\nseg_00000.m4s\n")
+        with open(os.path.join(stream_dir, "seg_00000.m4s"), "wb") as f:
+            f.write(b"segment")
+
+        # When
+        status = (await client.get(f"/api/timelapse/{task_id}")).json()
+        playlist = await client.get(status["streamUrl"])
+        segment = await client.get(f"/api/stream/{task_id}/seg_00000.m4s")
+
+        # Then
+        assert status["status"] == "queued"
+        assert status["streamUrl"] == f"/api/stream/{task_id}/index.m3u8"
+        assert playlist.headers["cache-control"] == "no-cache"
+        assert segment.headers["content-type"] == "video/mp4"
+        assert segment.content == b"segment"
+
+    @pytest.mark.asyncio
+    async def test_should_reject_unknown_filename(self, client: AsyncClient) -> None:
+        """HLS 파일명 형식이 아니면 404
+
+        Given: 임의의 taskId
+        When: ../ 등 허용되지 않은 파일명 요청
+        Then: 404 반환
+        """
+        # When
+        response = await client.get("/api/stream/some-task/..%2Fsecret.mp4")
+
+        # Then
+        assert response.status_code == 404
+
+
+class TestUploadPhotos:
+    """POST /api/upload-photos - 사진 배치 업로드
+
+    요구사항:
+    ========
+    1. 목적: 긴 세션의 사진 수천 장을 이벤트 루프를 막지 않고 저장
+    2. 입력: multipart/form-data (files: JPEG 여러 개)
+    3. 응답: 성공한 fileIds (요청 순서), 파일별 results
+    4. 에러: 파일 없음 400, 배치 전체 크기 초과 413, 잘못된 사진/크기 초과는 해당 항목만 error
+    """
+
+    @pytest.mark.asyncio
+    async def test_should_report_per_file_results(self, client: AsyncClient) -> None:
+        """잘못된 사진 한 장이 배치 전체를 실패시키지 않음
+
+        Given: JPEG 2장 사이에 JPEG가 아닌 파일 1장
+        When: 사진 업로드 API 호출
+        Then: 201, 성공 2 / 실패 1, fileIds는 요청 순서
+        """
+        # Given
+        jpeg = b"\xff\xd8\xff\xe0" + b"photo"
+        files = [
+            ("files", ("001.jpg", io.BytesIO(jpeg + b"1"), "image/jpeg")),
+            ("files", ("002.jpg", io.BytesIO(b"not a jpeg"), "image/jpeg")),
+            ("files", ("003.jpg", io.BytesIO(jpeg + b"3"), "image/jpeg")),
+        ]
+
+        # When
+        response = await client.post("/api/upload-photos", files=files)
+
+        # Then
+        assert response.status_code == 201
+        data = response.json()
+        assert data["count"] == 2
+        assert data["failed"] == 1
+        results = data["results"]
+        assert [r["filename"] for r in results] == ["001.jpg", "002.jpg", "003.jpg"]
+        assert results[1]["fileId"] is None and results[1]["error"]
+        assert data["fileIds"] == [results[0]["fileId"], results[2]["fileId"]]
+
+    @pytest.mark.asyncio
+    async def test_should_accept_more_than_default_form_limit(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """기본 multipart 한도(1000개)를 넘는 배치 허용, 사진별 크기 제한
+
+        Given: 사진 1001장, 그중 하나는 max_photo_size_mb 초과
+        When: 사진 업로드 API 호출
+        Then: 1000장 성공, 큰 사진만 실패
+        """
+        from app.config import settings
+
+        # Given
+        monkeypatch.setattr(settings, "max_photo_size_mb", 1)
+        jpeg = b"\xff\xd8\xff\xe0" + b"photo"
+        files = [("files", (f"{i:04d}.jpg", io.BytesIO(jpeg), "image/jpeg")) for i in range(1000)]
+        big = jpeg + b"\0" * (1024 * 1024)
+        files.append(("files", ("big.jpg", io.BytesIO(big), "image/jpeg")))
+
+        # When
+        response = await client.post("/api/upload-photos", files=files)
+
+        # Then
+        assert response.status_code == 201
+        data = response.json()
+        assert data["count"] == 1000
+        assert data["results"][-1]["error"].startswith("File too large")
+
+    @pytest.mark.asyncio
+    async def test_should_bound_concurrent_normalize_work(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """파생본 생성도 photo_upload_concurrency개까지만 동시에
+
+        Given: 동시 수 2, 파생본 생성이 오래 걸림
+        When: 사진 10장 업로드
+        Then: 파생본 생성이 동시에 2개를 넘지 않음, 전부 render_path 등록
+        """
+        import asyncio
+
+        from app.config import settings
+        from app.services.photo_normalizer import photo_normalizer
+
+        # Given
+        monkeypatch.setattr(settings, "photo_upload_concurrency", 2)
+        active = peak = 0
+
+        async def slow_normalize(path: str) -> str:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return f"{path}.render.jpg"
+
+        monkeypatch.setattr(photo_normalizer, "normalize", slow_normalize)
+        jpeg = b"\xff\xd8\xff\xe0" + b"photo"
+        files = [("files", (f"{i}.jpg", io.BytesIO(jpeg), "image/jpeg")) for i in range(10)]
+
+        # When
+        response = await client.post("/api/upload-photos", files=files)
+
+        # Then
+        assert response.status_code == 201
+        assert response.json()["count"] == 10
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_should_reject_oversized_batch_before_parsing(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """배치 전체가 photo_upload_max_batch_mb를 넘으면 form 파싱 전에 413
+
+        Given: 배치 한도 0MB, 사진 3장 (합계 200KB)
+        When: 사진 업로드 API 호출
+        Then: 413, 저장된 파일 없음
+        """
+        from app.config import settings
+
+        # Given
+        monkeypatch.setattr(settings, "photo_upload_max_batch_mb", 0)
+        photo = b"\xff\xd8\xff\xe0" + b"\0" * 70 * 1024
+        files = [("files", (f"{i}.jpg", io.BytesIO(photo), "image/jpeg")) for i in range(3)]
+
+        # When
+        response = await client.post("/api/upload-photos", files=files)
+
+        # Then
+        assert response.status_code == 413
+        assert os.listdir(settings.upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_should_report_disk_error_per_file(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """디스크 오류(ENOSPC)도 해당 사진만 실패, 부분 파일은 남지 않음
+
+        Given: 두 번째 사진을 쓰는 중에 OSError
+        When: 사진 3장 업로드
+        Then: 201, 두 번째만 error / 디스크에는 성공한 2장만
+        """
+        import errno
+
+        from app.config import settings
+        from app.services import upload_service
+
+        # Given
+        write_chunk = upload_service._write_chunk
+
+        def failing_write(f, digest, chunk: bytes) -> None:
+            write_chunk(f, digest, chunk)
+            if b"FULL" in chunk:
+                raise OSError(errno.ENOSPC, "No space left on device")
+
+        monkeypatch.setattr(upload_service, "_write_chunk", failing_write)
+        jpeg = b"\xff\xd8\xff\xe0" + b"photo"
+        files = [
+            ("files", ("001.jpg", io.BytesIO(jpeg + b"1"), "image/jpeg")),
+            ("files", ("002.jpg", io.BytesIO(jpeg + b"FULL"), "image/jpeg")),
+            ("files", ("003.jpg", io.BytesIO(jpeg + b"3"), "image/jpeg")),
+        ]
+
+        # When
+        response = await client.post("/api/upload-photos", files=files)
+
+        # Then
+        assert response.status_code == 201
+        results = response.json()["results"]
+        assert [r["fileId"] is not None for r in results] == [True, False, True]
+        assert "No space left" in results[1]["error"]
+        saved = sorted(os.listdir(settings.upload_dir))
+        assert saved == sorted(f"{results[i]['fileId']}.jpg" for i in (0, 2))
+
+    @pytest.mark.asyncio
+    async def test_should_remove_written_photos_when_body_is_cut_off(
+        self, client: AsyncClient,
+    ) -> None:
+        """본문이 중간에 끊기면 400, 이미 기록한 사진도 지움 (등록되지 않은 파일을 남기지 않음)
+
+        Given: 사진 2장 중 두 번째가 끝나기 전에 본문 종료
+        When: 사진 업로드 API 호출
+        Then: 400, 저장된 파일 없음
+        """
+        from app.config import settings
+
+        # Given
+        boundary = "photo-boundary"
+        jpeg = b"\xff\xd8\xff\xe0" + b"photo"
+
+        def part(name: str) -> bytes:
+            return (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="files"; filename="{name}"\r\n'
+                "Content-Type: image/jpeg\r\n\r\n"
+            ).encode() + jpeg
+
+        async def body():
+            yield part("001.jpg") + b"\r\n"
+            yield part("002.jpg")
+
+        # When
+        response = await client.post(
+            "/api/upload-photos", content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+
+        # Then
+        assert response.status_code == 400
+        assert os.listdir(settings.upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_should_return_400_when_no_files(self, client: AsyncClient) -> None:
+        """파일 없음
+
+        Given: 빈 multipart 본문
+        When: 사진 업로드 API 호출
+        Then: 400 반환
+        """
+        # When
+        response = await client.post("/api/upload-photos", data={"other": "x"})
+
+        # Then
+        assert response.status_code == 400
@@ -1,8 +1,25 @@
 import io
+import os
+import time
 
 import pytest
 from httpx import AsyncClient
 
+from app.config import settings
+from tests.conftest import FAKE_MOV, FAKE_MP4
+
+BOUNDARY = "test-boundary"
+
+
+def _multipart_chunks(content: bytes, chunk_size: int) -> list[bytes]:
+    """file 필드 하나짜리 multipart 본문을 chunk_size씩 자른다."""
+    body = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="recording.mp4"\r\n'
+        "Content-Type: video/mp4\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+    return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
 
 class TestUploadFile:
     """POST /api/upload - 영상 파일 업로드
@@ -25,7 +42,7 @@ class TestUploadFile:
         Then: 200 반환, fileId와 filename 포함
         """
         # Given
-        file_content = b"fake-video-content"
+        file_content = FAKE_MP4 + b"-content"
         files = {"file": ("recording.mp4", io.BytesIO(file_content), "video/mp4")}
 
         # When
@@ -46,7 +63,7 @@ class TestUploadFile:
         Then: 200 반환
         """
         # Given
-        files = {"file": ("recording.mp4", io.BytesIO(b"fake-mp4"), "video/mp4")}
+        files = {"file": ("recording.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
 
         # When
         response = await client.post("/api/upload", files=files)
@@ -63,7 +80,7 @@ class TestUploadFile:
         Then: 200 반환
         """
         # Given
-        files = {"file": ("recording.mov", io.BytesIO(b"fake-mov"), "video/quicktime")}
+        files = {"file": ("recording.mov", io.BytesIO(FAKE_MOV), "video/quicktime")}
 
         # When
         response = await client.post("/api/upload", files=files)
@@ -101,3 +118,359 @@ class TestUploadFile:
 
         # Then
         assert response.status_code == 422
+
+
+class TestUploadLimits:
+    """POST /api/upload - 스트리밍 업로드 검증
+
+    요구사항:
+    ========
+    1. 목적: 대용량 업로드를 메모리에 올리지 않고, 잘못된 업로드는 즉시 중단
+    2. 에러: 컨테이너 시그니처 불일치 400, max_upload_size_mb 초과 413
+    3. 제약: 거절된 업로드는 디스크에 남지 않음
+    """
+
+    @pytest.mark.asyncio
+    async def test_should_reject_non_video_content(self, client: AsyncClient) -> None:
+        """확장자만 mp4인 파일 거부
+
+        Given: .mp4 확장자지만 내용은 텍스트
+        When: 업로드 API 호출
+        Then: 400 반환, 저장된 파일 없음
+        """
+        # Given
+        files = {"file": ("recording.mp4", io.BytesIO(b"just some text"), "video/mp4")}
+
+        # When
+        response = await client.post("/api/upload", files=files)
+
+        # Then
+        assert response.status_code == 400
+        assert os.listdir(settings.upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_should_reject_when_stream_exceeds_limit(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """기록 중 한도 초과 시 413
+
+        Given: max_upload_size_mb = 0
+        When: 작은 mp4 업로드 (선언 크기는 미들웨어 허용치 이내)
+        Then: 413 반환, 부분 파일 삭제
+        """
+        # Given
+        monkeypatch.setattr(settings, "max_upload_size_mb", 0)
+        files = {"file": ("recording.mp4", io.BytesIO(FAKE_MP4), "video/mp4")}
+
+        # When
+        response = await client.post("/api/upload", files=files)
+
+        # Then
+        assert response.status_code == 413
+        assert os.listdir(settings.upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_should_reject_declared_oversize_before_body(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """Content-Length가 한도를 넘으면 본문 수신 전에 413
+
+        Given: max_upload_size_mb = 0, 200KB 업로드
+        When: 업로드 API 호출
+        Then: 413 반환
+        """
+        # Given
+        monkeypatch.setattr(settings, "max_upload_size_mb", 0)
+        body = FAKE_MP4 + b"\0" * 200 * 1024
+        files = {"file": ("recording.mp4", io.BytesIO(body), "video/mp4")}
+
+        # When
+        response = await client.post("/api/upload", files=files)
+
+        # Then
+        assert response.status_code == 413
+
+
+    @pytest.mark.asyncio
+    async def test_should_reject_chunked_body_over_limit_while_receiving(
+        self, client: AsyncClient, monkeypatch,
+    ) -> None:
+        """Content-Length 없는(chunked) 본문도 한도를 넘는 순간 413
+
+        Given: max_upload_size_mb = 0, 200KB mp4를 Content-Length 없이 청크로 전송
+        When: 업로드 API 호출
+        Then: 413 반환, 본문을 끝까지 받지 않음, 저장된 파일 없음
+        """
+        # Given
+        monkeypatch.setattr(settings, "max_upload_size_mb", 0)
+        sent = 0
+
+        async def body():
+            nonlocal sent
+            for chunk in _multipart_chunks(FAKE_MP4 + b"\0" * 200 * 1024, 16 * 1024):
+                sent += 1
+                yield chunk
+
+        # When
+        response = await client.post(
+            "/api/upload", content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+
+        # Then
+        assert response.status_code == 413
+        assert sent < 200 * 1024 // (16 * 1024)
+        assert os.listdir(settings.upload_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_should_assemble_file_from_tiny_network_chunks(
+        self, client: AsyncClient,
+    ) -> None:
+        """본문이 몇 바이트씩 나눠 도착해도 그대로 저장 (시그니처 검사 포함)
+
+        Given: mp4 본문을 3바이트씩 Content-Length 없이 전송
+        When: 업로드 API 호출
+        Then: 200, 저장된 파일 내용이 원본과 같음
+        """
+        # Given
+        async def body():
+            for chunk in _multipart_chunks(FAKE_MP4, 3):
+                yield chunk
+
+        # When
+        response = await client.post(
+            "/api/upload", content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+
+        # Then
+        assert response.status_code == 200
+        saved = os.path.join(settings.upload_dir, response.json()["filename"])
+        with open(saved, "rb") as f:
+            assert f.read() == FAKE_MP4
+
+
+class TestResumableUpload:
+    """/api/uploads - 이어 올리기 업로드
+
+    요구사항:
+    ========
+    1. 목적: 끊긴 업로드를 처음부터가 아니라 마지막 오프셋부터 재개
+    2. 흐름: POST 생성 → PATCH(Upload-Offset) 청크 → GET/HEAD 오프셋 → POST complete
+    3. 응답: complete 시 일반 업로드와 같은 fileId
+    4. 에러: 오프셋 불일치 409, 미완료 complete 409, 선언 크기 초과 413, 없는 업로드 404
+    5. 제약: 청크는 .part 파일에 직접 이어 쓰고, 방치된 업로드는 TTL 후 정리
+    """
+
+    @staticmethod
+    async def _create(client: AsyncClient, body: bytes) -> str:
+        response = await client.post(
+            "/api/uploads", json={"filename": "long.mp4", "size": len(body)},
+        )
+        assert response.status_code == 201
+        return response.json()["uploadId"]
+
+    @pytest.mark.asyncio
+    async def test_should_assemble_chunks_into_file(self, client: AsyncClient) -> None:
+        """청크 두 번 + 완료 → fileId로 타임랩스 요청 가능
+
+        Given: 생성된 업로드
+        When: 앞/뒤 청크를 차례로 PATCH 후 complete
+        Then: 원본과 같은 파일, partial 디렉토리 비어 있음, fileId 조회 가능
+        """
+        # Given
+        body = FAKE_MP4 + b"-" * 1000
+        upload_id = await self._create(client, body)
+
+        # When
+        first = await client.patch(
+            f"/api/uploads/{upload_id}", content=body[:500],
+            headers={"Upload-Offset": "0"},
+        )
+        second = await client.patch(
+            f"/api/uploads/{upload_id}", content=body[500:],
+            headers={"Upload-Offset": "500"},
+        )
+        done = await client.post(f"/api/uploads/{upload_id}/complete")
+
+        # Then
+        assert first.json()["offset"] == 500
+        assert second.json()["offset"] == len(body)
+        assert done.status_code == 200
+        file_id = done.json()["fileId"]
+        with open(os.path.join(settings.upload_dir, done.json()["filename"]), "rb") as f:
+            assert f.read() == body
+        assert os.listdir(os.path.join(settings.upload_dir, "partial")) == []
+
+        from app.api.v1 import upload as upload_mod
+        info = await upload_mod.upload_service.get_file(file_id)
+        assert info["original_filename"] == "long.mp4"
+        assert info["content_hash"]
+
+    @pytest.mark.asyncio
+    async def test_should_report_offset_and_reject_mismatch(self, client: AsyncClient) -> None:
+        """재개 지점 조회와 오프셋 불일치
+
+        Given: 300바이트가 기록된 업로드
+        When: HEAD 조회, 잘못된 오프셋(0)으로 PATCH
+        Then: Upload-Offset 300, PATCH는 409 + 현재 오프셋 헤더
+        """
+        # Given
+        body = FAKE_MP4 + b"-" * 1000
+        upload_id = await self._create(client, body)
+        await client.patch(
+            f"/api/uploads/{upload_id}", content=body[:300], headers={"Upload-Offset": "0"},
+        )
+
+        # When
+        head = await client.head(f"/api/uploads/{upload_id}")
+        conflict = await client.patch(
+            f"/api/uploads/{upload_id}", content=body[:300], headers={"Upload-Offset": "0"},
+        )
+
+        # Then
+        assert head.headers["Upload-Offset"] == "300"
+        assert conflict.status_code == 409
+        assert conflict.headers["Upload-Offset"] == "300"
+
+    @pytest.mark.asyncio
+    async def test_should_reject_incomplete_or_oversized(self, client: AsyncClient) -> None:
+        """미완료 complete, 선언 크기 초과, 없는 업로드
+
+        Given: 100바이트로 선언한 업로드
+        When: 바로 complete / 200바이트 PATCH / 없는 uploadId 조회
+        Then: 409 / 413 / 404
+        """
+        # Given
+        body = FAKE_MP4 + b"-" * 100
+        upload_id = await self._create(client, body[:100])
+
+        # When
+        incomplete = await client.post(f"/api/uploads/{upload_id}/complete")
+        oversized = await client.patch(
+            f"/api/uploads/{upload_id}", content=body + body, headers={"Upload-Offset": "0"},
+        )
+        missing = await client.get("/api/uploads/00000000-0000-0000-0000-000000000000")
+
+        # Then
+        assert incomplete.status_code == 409
+        assert oversized.status_code == 413
+        assert missing.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_should_cleanup_abandoned_uploads(self, client: AsyncClient) -> None:
+        """TTL이 지난 partial 업로드 정리
+
+        Given: 마지막 청크가 2시간 전인 업로드
+        When: TTL 1시간으로 정리
+        Then: .part/.json 삭제, 조회 시 404
+        """
+        from app.services.resumable_upload_service import cleanup_stale_uploads
+
+        # Given
+        upload_id = await self._create(client, FAKE_MP4)
+        partial_dir = os.path.join(settings.upload_dir, "partial")
+        old = time.time() - 7200
+        for name in os.listdir(partial_dir):
+            os.utime(os.path.join(partial_dir, name), (old, old))
+
+        # When
+        removed = cleanup_stale_uploads(partial_dir, max_age_seconds=3600)
+
+        # Then
+        assert removed == 1
+        assert os.listdir(partial_dir) == []
+        assert (await client.get(f"/api/uploads/{upload_id}")).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_should_check_signature_across_tiny_chunks(self, client: AsyncClient) -> None:
+        """첫 PATCH가 시그니처보다 짧아도 모일 때까지 기다렸다 검사
+
+        Given: 정상 mp4 업로드와 텍스트 업로드
+        When: 둘 다 3바이트 → 나머지 순서로 PATCH
+        Then: mp4는 완료 200, 텍스트는 두 번째 PATCH에서 400 + 오프셋 0으로 되돌림
+        """
+        # Given
+        good = FAKE_MP4 + b"-" * 100
+        bad = b"just some text, not a video"
+        good_id = await self._create(client, good)
+        bad_id = await self._create(client, bad)
+
+        # When
+        for upload_id, body in ((good_id, good), (bad_id, bad)):
+            first = await client.patch(
+                f"/api/uploads/{upload_id}", content=body[:3], headers={"Upload-Offset": "0"},
+            )
+            assert first.status_code == 200
+        rest_good = await client.patch(
+            f"/api/uploads/{good_id}", content=good[3:], headers={"Upload-Offset": "3"},
+        )
+        rest_bad = await client.patch(
+            f"/api/uploads/{bad_id}", content=bad[3:], headers={"Upload-Offset": "3"},
+        )
+
+        # Then
+        assert rest_good.status_code == 200
+        assert (await client.post(f"/api/uploads/{good_id}/complete")).status_code == 200
+        assert rest_bad.status_code == 400
+        assert (await client.get(f"/api/uploads/{bad_id}")).json()["offset"] == 0
+
+    @pytest.mark.asyncio
+    async def test_should_reject_write_while_another_worker_holds_upload(
+        self, client: AsyncClient,
+    ) -> None:
+        """다른 워커가 같은 업로드에 쓰는 중이면 409 (프로세스 간 락)
+
+        Given: 다른 프로세스처럼 .part에 flock을 잡아 둠
+        When: PATCH / complete
+        Then: 둘 다 409, 락이 풀리면 PATCH 성공
+        """
+        import fcntl
+
+        # Given
+        upload_id = await self._create(client, FAKE_MP4)
+        part_path = os.path.join(settings.upload_dir, "partial", f"{upload_id}.part")
+        fd = os.open(part_path, os.O_WRONLY)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        # When
+        busy = await client.patch(
+            f"/api/uploads/{upload_id}", content=FAKE_MP4, headers={"Upload-Offset": "0"},
+        )
+        busy_complete = await client.post(f"/api/uploads/{upload_id}/complete")
+        os.close(fd)
+        retried = await client.patch(
+            f"/api/uploads/{upload_id}", content=FAKE_MP4, headers={"Upload-Offset": "0"},
+        )
+
+        # Then
+        assert busy.status_code == 409
+        assert busy_complete.status_code == 409
+        assert retried.json()["offset"] == len(FAKE_MP4)
+
+    @pytest.mark.asyncio
+    async def test_should_treat_expired_upload_as_missing_before_cleanup(
+        self, client: AsyncClient,
+    ) -> None:
+        """정리 작업이 아직 돌지 않아도 expiresAt이 지난 업로드는 404
+
+        Given: 마지막 청크가 TTL보다 오래된 업로드 (파일은 남아 있음)
+        When: 조회 / PATCH
+        Then: 둘 다 404
+        """
+        # Given
+        upload_id = await self._create(client, FAKE_MP4)
+        partial_dir = os.path.join(settings.upload_dir, "partial")
+        old = time.time() - settings.resumable_upload_ttl_hours * 3600 - 60
+        for name in os.listdir(partial_dir):
+            os.utime(os.path.join(partial_dir, name), (old, old))
+
+        # When
+        status = await client.get(f"/api/uploads/{upload_id}")
+        patch = await client.patch(
+            f"/api/uploads/{upload_id}", content=FAKE_MP4, headers={"Upload-Offset": "0"},
+        )
+
+        # Then
+        assert status.status_code == 404
+        assert patch.status_code == 404
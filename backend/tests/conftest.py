@@ -6,6 +6,10 @@ from httpx import ASGITransport, AsyncClient
 from app.config import settings
 from app.main import app
 
+# 컨테이너 시그니처(ftyp 박스)만 갖춘 가짜 영상
+FAKE_MP4 = b"\x00\x00\x00\x18ftypisom" + b"fake-video"
+FAKE_MOV = b"\x00\x00\x00\x14ftypqt  " + b"fake-mov"
+
 
 @pytest.fixture(autouse=True)
 def setup_test_env(tmp_path):
@@ -14,19 +18,23 @@ def setup_test_env(tmp_path):
     settings.upload_dir = str(tmp_path / "uploads")
     os.makedirs(settings.upload_dir, exist_ok=True)
 
-    # In-memory store 리셋
-    from app.services.timelapse_service import task_store
-    from app.services.upload_service import file_store
-    file_store.clear()
-    task_store.clear()
+    # In-memory 레지스트리 리셋
+    from app.repositories.registry import InMemoryRegistry, set_registry
+    set_registry(InMemoryRegistry())
 
     # upload/timelapse 서비스가 같은 store를 공유하도록
     from app.api.v1 import timelapse as timelapse_mod
     from app.api.v1 import upload as upload_mod
     upload_mod.upload_service = upload_mod.UploadService()
+    upload_mod.resumable_upload_service = upload_mod.ResumableUploadService(
+        upload_mod.upload_service
+    )
     timelapse_mod.upload_service = upload_mod.upload_service
     timelapse_mod.timelapse_service = timelapse_mod.TimelapseService(upload_mod.upload_service)
 
+    from app.api.v1 import sessions as sessions_mod
+    sessions_mod.session_encoder = sessions_mod.SessionEncoder(timelapse_mod.timelapse_service)
+
     yield
 
 
@@ -0,0 +1,44 @@
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+class TestParseProgress:
+    """TimelapseService._parse_progress - FFmpeg -progress 블록 해석"""
+
+    def test_should_update_progress_speed_and_eta(self) -> None:
+        """진행 블록으로 진행률/속도/ETA 갱신
+
+        Given: 예상 900프레임 중 300프레임 처리, 10초 경과
+        When: 진행 블록 반영
+        Then: progress 33, speed 2.5, eta 20초
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        task: dict = {"progress": 0}
+        block = {"frame": "300", "fps": "30.0", "speed": "2.5x"}
+
+        # When
+        task.update(service._parse_progress(block, expected_frames=900, elapsed=10.0))
+
+        # Then
+        assert task["progress"] == 33
+        assert task["speed"] == 2.5
+        assert task["eta_seconds"] == 20
+
+    def test_should_cap_progress_below_100_until_exit(self) -> None:
+        """프로세스 종료 전에는 100%를 표시하지 않음
+
+        Given: 예상 프레임 수보다 많이 처리된 블록
+        When: 진행 블록 반영
+        Then: progress 99, speed N/A는 무시
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        task: dict = {"progress": 0}
+
+        # When
+        task.update(service._parse_progress({"frame": "950", "speed": "N/A"}, 900, 5.0))
+
+        # Then
+        assert task["progress"] == 99
+        assert "speed" not in task
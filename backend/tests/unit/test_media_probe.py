@@ -0,0 +1,128 @@
+import pytest
+
+from app.services.media_probe import MediaInfo, MediaProbe, media_probe
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+class TestMediaInfo:
+    """MediaInfo - 헤더 기반 프레임 수 추정"""
+
+    def test_should_prefer_header_frame_count(self) -> None:
+        """헤더에 nb_frames가 있으면 그대로 사용
+
+        Given: frame_count 3600, 길이 120초
+        When: estimated_frames 호출
+        Then: 3600, frames_exact True
+        """
+        info = MediaInfo(duration=120.0, frame_count=3600, frame_rate=30.0)
+
+        assert info.estimated_frames(fallback_fps=30) == 3600
+        assert info.frames_exact is True
+
+    def test_should_estimate_from_duration_and_rate(self) -> None:
+        """nb_frames가 없으면 길이 × 프레임레이트
+
+        Given: frame_count 0 (webm), 길이 10초, 24fps / 프레임레이트 미상
+        When: estimated_frames 호출
+        Then: 240 / fallback 30fps로 300
+        """
+        assert MediaInfo(duration=10.0, frame_rate=24.0).estimated_frames(30) == 240
+        assert MediaInfo(duration=10.0).estimated_frames(30) == 300
+        assert MediaInfo(duration=10.0).frames_exact is False
+
+
+class TestMediaProbeCache:
+    """MediaProbe - 파일 식별자 기준 캐시"""
+
+    @pytest.mark.asyncio
+    async def test_should_run_ffprobe_once_per_file(self, tmp_path, monkeypatch) -> None:
+        """같은 파일을 여러 번 probe해도 ffprobe는 한 번
+
+        Given: 파일 하나, ffprobe 호출 횟수를 세는 가짜
+        When: probe 두 번, 파일 내용 변경 후 한 번 더
+        Then: 첫 두 번은 한 번만 호출, 변경 후 다시 호출
+        """
+        # Given
+        path = tmp_path / "a.mp4"
+        path.write_bytes(b"x")
+        probe = MediaProbe()
+        calls: list[tuple] = []
+
+        async def fake_ffprobe(*args: str) -> str:
+            calls.append(args)
+            return '{"streams": [{"nb_frames": "90", "duration": "3.0"}]}'
+
+        monkeypatch.setattr(probe, "_ffprobe", fake_ffprobe)
+
+        # When
+        first = await probe.probe(str(path))
+        second = await probe.probe(str(path))
+
+        # Then
+        assert first == second == MediaInfo(duration=3.0, frame_count=90)
+        assert len(calls) == 1
+
+        # When: 크기가 달라지면 다른 파일로 취급
+        path.write_bytes(b"xy")
+        await probe.probe(str(path))
+
+        # Then
+        assert len(calls) == 2
+
+
+class TestResolveSourceFrames:
+    """TimelapseService._resolve_source_frames - 정확한 프레임 수가 필요할 때만 카운트"""
+
+    @staticmethod
+    def _patch(monkeypatch, info: MediaInfo) -> list[str]:
+        counted: list[str] = []
+
+        async def fake_probe(path: str) -> MediaInfo:
+            return info
+
+        async def fake_count(path: str) -> int:
+            counted.append(path)
+            return 5000
+
+        monkeypatch.setattr(media_probe, "probe", fake_probe)
+        monkeypatch.setattr(media_probe, "exact_frame_count", fake_count)
+        return counted
+
+    @pytest.mark.asyncio
+    async def test_should_skip_count_when_estimate_is_unambiguous(self, monkeypatch) -> None:
+        """추정 오차 범위 안에서 파라미터가 같으면 카운트하지 않음
+
+        Given: nb_frames 없음, 10초 30fps (약 300프레임), 출력 30초 — ±5% 모두 case2
+        When: 프레임 수 결정
+        Then: 추정값 사용, 패킷 카운트 없음
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        counted = self._patch(monkeypatch, MediaInfo(duration=10.0, frame_rate=30.0))
+
+        # When
+        frames, duration = await service._resolve_source_frames("in.webm", 30, 0)
+
+        # Then
+        assert (frames, duration) == (300, 10.0)
+        assert counted == []
+
+    @pytest.mark.asyncio
+    async def test_should_count_packets_near_case_boundary(self, monkeypatch) -> None:
+        """추정값이 case 경계에 걸치면 패킷을 세어 정확한 값 사용
+
+        Given: nb_frames 없음, 추정 900프레임 (출력 30초 × 30fps 경계)
+        When: 프레임 수 결정
+        Then: exact_frame_count 결과 사용
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        counted = self._patch(monkeypatch, MediaInfo(duration=30.0, frame_rate=30.0))
+
+        # When
+        frames, _ = await service._resolve_source_frames("in.webm", 30, 0)
+
+        # Then
+        assert frames == 5000
+        assert counted == ["in.webm"]
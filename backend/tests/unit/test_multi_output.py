@@ -0,0 +1,81 @@
+from app.services.timelapse_service import TimelapseService, _video_output_args
+from app.services.upload_service import UploadService
+
+
+class TestVideoFilterArgs:
+    """TimelapseService._video_filter_args - 샘플링 1회 + 비율별 분기"""
+
+    def test_should_keep_simple_chain_for_single_ratio(self) -> None:
+        """비율 하나면 기존 -vf 체인
+
+        Given: 9:16 하나
+        When: 필터 인자 생성
+        Then: -vf, 라벨 없음
+        """
+        # When
+        args, labels, _ = TimelapseService(UploadService())._video_filter_args(1.5, 30, ["9:16"])
+
+        # Then
+        assert args[0] == "-vf"
+        assert args[1].startswith("fps=1.5000,settb=AVTB,setpts=N/30/TB,crop=")
+        assert labels == [None]
+
+    def test_should_split_sampled_frames_per_ratio(self) -> None:
+        """여러 비율이면 fps 샘플링은 한 번, split 뒤 비율별 crop/scale
+
+        Given: 9:16, 1:1, 4:5
+        When: 필터 인자 생성
+        Then: fps 필터 1개 + split=3, 출력 라벨 [v0] [v1] [v2]
+        """
+        # When
+        args, labels, _ = TimelapseService(UploadService())._video_filter_args(
+            1.5, 30, ["9:16", "1:1", "4:5"],
+        )
+
+        # Then
+        assert args[0] == "-filter_complex"
+        graph = args[1]
+        assert graph.count("fps=") == 1
+        assert "split=3[b0][b1][b2]" in graph
+        assert "scale=720:720" in graph.split(";")[2]
+        assert labels == ["[v0]", "[v1]", "[v2]"]
+
+
+class TestVideoOutputArgs:
+    """_video_output_args - 출력 파일별 인자"""
+
+    def test_should_map_each_label_to_its_output(self) -> None:
+        """출력마다 -map 라벨과 프레임 제한
+
+        Given: 라벨 2개, 조각 프레임 100
+        When: 출력 인자 생성
+        Then: 파일마다 -map, -frames:v, 인코더 인자가 붙음
+        """
+        # When
+        args = _video_output_args(
+            ["[v0]", "[v1]"], ["a.mp4", "b.mp4"], 30, ["-c:v", "libx264"],
+            frames=100, faststart=False,
+        )
+
+        # Then
+        one = ["-frames:v", "100", "-r", "30", "-an", "-c:v", "libx264"]
+        assert args == ["-map", "[v0]", *one, "a.mp4", "-map", "[v1]", *one, "b.mp4"]
+
+    def test_should_tee_first_output_into_hls_when_streaming(self) -> None:
+        """스트리밍이면 첫 출력만 mp4 + HLS tee
+
+        Given: 출력 1개, stream_dir 지정
+        When: 출력 인자 생성
+        Then: -map 0:v, 키프레임 강제, tee에 mp4와 index.m3u8
+        """
+        # When
+        args = _video_output_args(
+            [None], ["/u/a.mp4"], 30, ["-c:v", "libx264"], stream_dir="/u/streams/t",
+        )
+
+        # Then
+        assert args[:2] == ["-map", "0:v"]
+        assert "-force_key_frames" in args
+        assert args[-3:-1] == ["-f", "tee"]
+        assert args[-1].startswith("[f=mp4:movflags=+faststart]/u/a.mp4|[f=hls:")
+        assert args[-1].endswith("]/u/streams/t/index.m3u8")
@@ -0,0 +1,168 @@
+import os
+
+import pytest
+
+from app.config import settings
+from app.services.overlay_assets import BoxLayer, OverlayAssetCache, OverlayInput, TextLayer
+from app.services.timelapse_service import TimelapseService, overlay_graph, overlay_input_args
+from app.services.upload_service import UploadService
+
+WHITE = (255, 255, 255, 255)
+SHADOW = (0, 0, 0, 153)
+
+
+class TestOverlayAssetCache:
+    """OverlayAssetCache - 정적 오버레이 레이어를 모서리별 PNG로"""
+
+    def test_should_crop_each_anchor_group_to_visible_area(self, tmp_path) -> None:
+        """모서리별로 잘라낸 PNG 한 장씩, 위치는 프레임 좌표
+
+        Given: 좌하단 글자 1개, 우상단 상자 2개 (720x1280)
+        When: 정적 레이어 생성
+        Then: 입력 2개, 상자 그룹은 상자 크기 그대로 (x, y)에 놓임, 글자는 좌하단 여백 안
+        """
+        # Given
+        image = pytest.importorskip("PIL.Image")
+        cache = OverlayAssetCache(str(tmp_path), max_age_seconds=3600)
+        layers = [
+            TextLayer("FocusTimelapse", 23, "bottom-left", WHITE, SHADOW, (1, 1)),
+            BoxLayer(526, 14, 180, 6, "top-right", (255, 255, 255, 89)),
+            BoxLayer(526, 14, 150, 6, "top-right", WHITE),
+        ]
+
+        # When
+        inputs = cache.static_layers(layers, (720, 1280))
+
+        # Then
+        text, bar = inputs
+        assert (bar.x, bar.y) == (526, 14)
+        with image.open(bar.path) as png:
+            assert png.size == (180, 6)
+            assert png.getpixel((0, 0))[3] == 255
+            assert png.getpixel((179, 0))[3] == 89
+        with image.open(text.path) as png:
+            assert png.mode == "RGBA"
+            assert 10 <= text.x and text.y + png.size[1] <= 1280 - 10
+
+    def test_should_reuse_cached_asset(self, tmp_path) -> None:
+        """같은 레이어 구성 + 해상도면 다시 그리지 않는다
+
+        Given: 한 번 그린 스트릭 문구
+        When: 같은 구성으로 다시 요청 / 해상도만 바꿔 요청
+        Then: 같은 파일(다시 쓰지 않아 inode 그대로) / 다른 파일
+        """
+        # Given
+        pytest.importorskip("PIL.Image")
+        cache = OverlayAssetCache(str(tmp_path), max_age_seconds=3600)
+        layers = [TextLayer("Day 7 Streak", 36, "top-right", WHITE, SHADOW, (0, 1))]
+        first = cache.static_layers(layers, (720, 1280))[0]
+        written = os.stat(first.path).st_ino
+
+        # When
+        again = cache.static_layers(layers, (720, 1280))[0]
+        other = cache.static_layers(layers, (720, 720))[0]
+
+        # Then
+        assert again == first
+        assert os.stat(first.path).st_ino == written
+        assert other.path != first.path
+
+    def test_should_prune_unused_assets(self, tmp_path) -> None:
+        """max_age 동안 쓰이지 않은 파일 삭제
+
+        Given: 오래된 파일 하나, 최근 파일 하나
+        When: prune
+        Then: 오래된 파일만 삭제
+        """
+        # Given
+        cache = OverlayAssetCache(str(tmp_path), max_age_seconds=60)
+        old, fresh = tmp_path / "old.png", tmp_path / "fresh.png"
+        old.write_bytes(b"x")
+        fresh.write_bytes(b"x")
+        os.utime(old, (0, 0))
+
+        # When
+        cache.prune()
+
+        # Then
+        assert not old.exists()
+        assert fresh.exists()
+
+
+class TestPrerenderOverlay:
+    """TimelapseService._prerender_overlay - 정적 레이어는 자산, 타이머는 drawtext"""
+
+    @pytest.mark.asyncio
+    async def test_should_keep_running_timer_on_drawtext(self) -> None:
+        """값이 바뀌는 타이머만 필터로 남는다
+
+        Given: timer 스타일, 고정 문구 없음
+        When: 오버레이 준비
+        Then: 워터마크 자산 1개 + 카운트다운 drawtext 1개
+        """
+        # Given
+        pytest.importorskip("PIL.Image")
+        service = TimelapseService(UploadService())
+
+        # When
+        overlays, filters = await service._prerender_overlay(
+            "timer", "", 0, 60, 3000, "countdown", 30, "9:16",
+        )
+
+        # Then
+        assert len(overlays) == 1
+        assert overlays[0].path.startswith(os.path.join(settings.upload_dir, "overlay_cache"))
+        assert len(filters) == 1
+        assert filters[0].startswith("drawtext=text='%{eif\\:max(0\\,3600-t*100.0000)\\:d}'")
+
+    @pytest.mark.asyncio
+    async def test_should_fall_back_to_drawtext_when_disabled(self, monkeypatch) -> None:
+        """설정으로 끄면 None (호출 측이 drawtext / drawbox 필터를 쓴다)
+
+        Given: overlay_prerender=False
+        When: 오버레이 준비
+        Then: None
+        """
+        # Given
+        monkeypatch.setattr(settings, "overlay_prerender", False)
+        service = TimelapseService(UploadService())
+
+        # When / Then
+        assert await service._prerender_overlay(
+            "streak", "", 7, 0, 0, "countdown", 30, "9:16",
+        ) is None
+
+
+class TestOverlayGraph:
+    """overlay_input_args / overlay_graph - 자산 입력과 합성 체인"""
+
+    def test_should_chain_overlays_after_source(self) -> None:
+        """1번 입력부터 차례로 overlay, 마지막이 out 라벨
+
+        Given: 자산 2개
+        When: 입력 인자 / 그래프 생성
+        Then: -i 2개, [0:v] 체인 → [ov0] → [ov1] → [m0]
+        """
+        # Given
+        overlays = [OverlayInput("/c/a.png", 14, 1240), OverlayInput("/c/b.png", 526, 14)]
+
+        # When
+        args = overlay_input_args(overlays)
+        graph = overlay_graph("[0:v]scale=720:1280", overlays, "[m0]")
+
+        # Then
+        assert args == ["-i", "/c/a.png", "-i", "/c/b.png"]
+        assert graph == [
+            "[0:v]scale=720:1280[ov0]",
+            "[ov0][1:v]overlay=14:1240[ov1]",
+            "[ov1][2:v]overlay=526:14[m0]",
+        ]
+
+    def test_should_pass_chain_through_without_overlays(self) -> None:
+        """자산이 없으면 체인 그대로
+
+        Given: 자산 0개
+        When: 그래프 생성
+        Then: source + out 라벨 한 줄
+        """
+        assert overlay_graph("[0:v]null", [], "[m0]") == ["[0:v]null[m0]"]
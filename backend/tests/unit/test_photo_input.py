@@ -0,0 +1,56 @@
+import os
+
+from app.services.timelapse_service import BASE_FPS, build_photo_input
+
+
+class TestBuildPhotoInput:
+    """build_photo_input - 사진 타임랩스 ffmpeg 입력 구성"""
+
+    def test_should_link_photos_as_numbered_sequence(self, tmp_path) -> None:
+        """sequence 모드: 요청 순서대로 000001.jpg… 링크 + image2 입력
+
+        Given: UUID 이름의 사진 3장 (이름순 ≠ 요청 순서)
+        When: sequence 모드로 입력 구성
+        Then: 번호 링크가 요청 순서의 원본을 가리키고, -framerate BASE_FPS image2 입력
+        """
+        # Given
+        photos = []
+        for name in ("c.jpg", "a.jpg", "b.jpg"):
+            path = tmp_path / name
+            path.write_bytes(name.encode())
+            photos.append(str(path))
+        work_dir = str(tmp_path / "frames")
+
+        # When
+        args = build_photo_input(photos, work_dir, "sequence")
+
+        # Then
+        assert args == [
+            "-f", "image2", "-framerate", str(BASE_FPS), "-start_number", "1",
+            "-i", os.path.join(work_dir, "%06d.jpg"),
+        ]
+        linked = [open(os.path.join(work_dir, f"{i:06d}.jpg"), "rb").read() for i in (1, 2, 3)]
+        assert linked == [b"c.jpg", b"a.jpg", b"b.jpg"]
+
+    def test_should_write_filelist_in_concat_mode(self, tmp_path) -> None:
+        """concat 모드: 기존 filelist 형식 유지
+
+        Given: 사진 2장
+        When: concat 모드로 입력 구성
+        Then: 사진마다 file/duration, 마지막 사진 한 번 더
+        """
+        # Given
+        photos = [str(tmp_path / "1.jpg"), str(tmp_path / "2.jpg")]
+        work_dir = str(tmp_path / "frames")
+
+        # When
+        args = build_photo_input(photos, work_dir, "concat")
+
+        # Then
+        assert args[:4] == ["-f", "concat", "-safe", "0"]
+        lines = open(args[-1]).read().splitlines()
+        assert lines == [
+            f"file '{photos[0]}'", "duration 0.033333",
+            f"file '{photos[1]}'", "duration 0.033333",
+            f"file '{photos[1]}'",
+        ]
@@ -0,0 +1,131 @@
+import os
+import re
+
+import pytest
+
+from app.config import settings
+from app.services.photo_normalizer import (
+    RENDER_BOXES,
+    normalize_file,
+    photo_normalizer,
+    render_size,
+)
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+class TestRenderSize:
+    """render_size - 모든 출력 비율에서 축소만 일어나는 파생본 크기"""
+
+    def test_should_fit_largest_box_for_phone_photos(self) -> None:
+        """12MP 세로/가로 사진
+
+        Given: 3024x4032 (세로), 4032x3024 (가로)
+        When: 파생본 크기 계산
+        Then: 9:16 박스 기준 720x960 / 16:9 박스 기준 960x720
+        """
+        assert render_size(3024, 4032) == (720, 960)
+        assert render_size(4032, 3024) == (960, 720)
+
+    def test_should_keep_small_photos(self) -> None:
+        """이미 작은 사진은 그대로
+
+        Given: 640x480
+        When: 파생본 크기 계산
+        Then: 640x480
+        """
+        assert render_size(640, 480) == (640, 480)
+
+    def test_should_match_timelapse_scale_filters(self) -> None:
+        """RENDER_BOXES가 _get_crop_and_scale의 scale 크기와 일치
+
+        Given: TimelapseService의 비율별 scale 필터
+        When: 크기 추출
+        Then: RENDER_BOXES와 같음
+        """
+        service = TimelapseService(UploadService())
+        for ratio, box in RENDER_BOXES.items():
+            _, scale_filter, _ = service._get_crop_and_scale(ratio)
+            w, h = map(int, re.match(r"scale=(\d+):(\d+)", scale_filter).groups())
+            assert (w, h) == box
+
+
+class TestNormalize:
+    """PhotoNormalizer - 프로세스 풀에서 파생본 생성"""
+
+    @pytest.mark.asyncio
+    async def test_should_write_render_derivative(self, tmp_path, monkeypatch) -> None:
+        """큰 JPEG → {name}.render.jpg
+
+        Given: photo_normalize 켜짐, 2000x3000 JPEG
+        When: normalize 호출
+        Then: 파생본 경로 반환, 크기 720x1080
+        """
+        image = pytest.importorskip("PIL.Image")
+
+        # Given
+        monkeypatch.setattr(settings, "photo_normalize", True)
+        src = str(tmp_path / "photo.jpg")
+        image.new("RGB", (2000, 3000), "red").save(src, "JPEG")
+
+        # When
+        try:
+            dst = await photo_normalizer.normalize(src)
+        finally:
+            photo_normalizer.shutdown()
+
+        # Then
+        assert dst == str(tmp_path / "photo.render.jpg")
+        with image.open(dst) as img:
+            assert img.size == (720, 1080)
+
+    def test_should_skip_when_already_small(self, tmp_path) -> None:
+        """작은 사진은 파생본을 만들지 않음
+
+        Given: 400x300 JPEG
+        When: normalize_file 호출
+        Then: False, 파일 없음
+        """
+        image = pytest.importorskip("PIL.Image")
+        src = str(tmp_path / "small.jpg")
+        image.new("RGB", (400, 300)).save(src, "JPEG")
+
+        assert normalize_file(src, str(tmp_path / "small.render.jpg")) is False
+        assert not os.path.exists(tmp_path / "small.render.jpg")
+
+    @pytest.mark.asyncio
+    async def test_should_return_none_when_disabled(self, tmp_path) -> None:
+        """photo_normalize 꺼짐 (기본)
+
+        Given: 기본 설정
+        When: normalize 호출
+        Then: None
+        """
+        assert await photo_normalizer.normalize(str(tmp_path / "x.jpg")) is None
+
+
+class TestShutdown:
+    """PhotoNormalizer.shutdown - 앱 종료 시 프로세스 풀 정리"""
+
+    @pytest.mark.asyncio
+    async def test_should_shut_down_pool_when_app_exits(self) -> None:
+        """lifespan 종료 단계에서 풀을 내린다
+
+        Given: 만들어진 파생본 프로세스 풀
+        When: 앱 lifespan 시작 → 종료
+        Then: 풀이 내려가고 참조가 비워짐
+        """
+        from app.main import app, lifespan
+        from app.services.photo_normalizer import photo_normalizer
+
+        # Given
+        pool = photo_normalizer._executor()
+
+        # When
+        async with lifespan(app):
+            pass
+
+        # Then
+        assert photo_normalizer._pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
@@ -0,0 +1,162 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.repositories.registry import InMemoryRegistry, Registry
+
+
+async def _sql_registry() -> Registry:
+    """DATABASE_URL의 Postgres로 SqlRegistry를 만든다 (DB가 없으면 skip)."""
+    pytest.importorskip("asyncpg")
+    from app.database import engine
+    from app.models.render_task import RenderTask
+    from app.models.uploaded_file import UploadedFile
+    from app.repositories.sql_registry import SqlRegistry
+
+    tables = [RenderTask.__table__, UploadedFile.__table__]
+    try:
+        async with asyncio.timeout(5):
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda sync: RenderTask.metadata.create_all(sync, tables))
+    except (OSError, TimeoutError, SQLAlchemyError) as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres unavailable: {e}")
+    return SqlRegistry()
+
+
+@pytest.fixture(params=["memory", "postgres"])
+async def registry(request):
+    """같은 계약을 두 백엔드에 — 메모리 / Postgres (CI의 postgres 서비스)."""
+    if request.param == "memory":
+        yield InMemoryRegistry()
+        return
+    yield await _sql_registry()
+    # 테스트마다 이벤트 루프가 바뀌므로 커넥션 풀을 비운다
+    from app.database import engine
+    await engine.dispose()
+
+
+def _new_id() -> str:
+    # 공유 DB에서도 다른 데이터와 겹치지 않게
+    return str(uuid.uuid4())
+
+
+class TestRegistryContract:
+    """Registry - 메모리 / Postgres 백엔드가 같은 의미로 동작"""
+
+    @pytest.mark.asyncio
+    async def test_should_merge_fields_on_update(self, registry) -> None:
+        """update_task는 지정 필드만 병합
+
+        Given: queued 상태 작업 저장
+        When: status/progress만 갱신
+        Then: 나머지 필드는 유지, 갱신 필드 반영 / 없는 작업은 None
+        """
+        # Given
+        task_id = _new_id()
+        await registry.save_task({"task_id": task_id, "status": "queued", "progress": 0, "x": 1})
+
+        # When
+        updated = await registry.update_task(task_id, status="processing", progress=10)
+
+        # Then
+        assert updated == {"task_id": task_id, "status": "processing", "progress": 10, "x": 1}
+        assert await registry.get_task(task_id) == updated
+        assert await registry.update_task(_new_id(), status="failed") is None
+        await registry.delete_task(task_id)
+        assert await registry.get_task(task_id) is None
+
+    @pytest.mark.asyncio
+    async def test_should_keep_concurrent_updates_of_different_fields(self, registry) -> None:
+        """서로 다른 필드를 동시에 갱신해도 둘 다 남는다 (진행률 / 부가 출력 동시 기록)
+
+        Given: 작업 저장
+        When: progress 갱신 20번과 poster_path 갱신을 동시에
+        Then: 마지막 progress와 poster_path 모두 반영
+        """
+        # Given
+        task_id = _new_id()
+        await registry.save_task({"task_id": task_id, "status": "processing", "progress": 0})
+
+        # When
+        await asyncio.gather(
+            *(registry.update_task(task_id, progress=p) for p in range(1, 21)),
+            registry.update_task(task_id, poster_path="/p.jpg"),
+        )
+
+        # Then
+        task = await registry.get_task(task_id)
+        assert task["poster_path"] == "/p.jpg"
+        assert 1 <= task["progress"] <= 20
+        await registry.delete_task(task_id)
+
+    @pytest.mark.asyncio
+    async def test_should_upsert_whole_task_record(self, registry) -> None:
+        """save_task는 같은 ID면 레코드 전체를 바꾼다 (병합하지 않음)
+
+        Given: 필드 x가 있는 작업
+        When: x 없는 레코드로 다시 save_task
+        Then: x가 사라지고 새 status
+        """
+        # Given
+        task_id = _new_id()
+        await registry.save_task({"task_id": task_id, "status": "queued", "x": 1})
+
+        # When
+        await registry.save_task({"task_id": task_id, "status": "completed"})
+
+        # Then
+        assert await registry.get_task(task_id) == {"task_id": task_id, "status": "completed"}
+        await registry.delete_task(task_id)
+
+    @pytest.mark.asyncio
+    async def test_should_return_copies_not_live_records(self, registry) -> None:
+        """조회 결과 변경은 저장소에 반영되지 않음
+
+        Given: 파일 메타데이터 저장
+        When: 조회한 dict를 수정
+        Then: 다시 조회하면 원래 값 / get_files는 없는 ID를 빼고 반환
+        """
+        # Given
+        file_id = _new_id()
+        await registry.save_file({"file_id": file_id, "file_path": "/a.mp4"})
+
+        # When
+        info = await registry.get_file(file_id)
+        info["file_path"] = "/changed.mp4"
+
+        # Then
+        assert (await registry.get_file(file_id))["file_path"] == "/a.mp4"
+        assert await registry.get_files([file_id, _new_id()]) == {
+            file_id: {"file_id": file_id, "file_path": "/a.mp4"}
+        }
+        assert await registry.get_files([]) == {}
+        await registry.delete_file(file_id)
+        assert await registry.get_file(file_id) is None
+
+    @pytest.mark.asyncio
+    async def test_should_save_file_batch_and_overwrite_existing(self, registry) -> None:
+        """save_files는 배치를 한 번에 저장하고 기존 ID는 덮어쓴다
+
+        Given: 파일 하나 저장
+        When: 그 파일(새 경로) + 새 파일 2개를 save_files
+        Then: 3개 모두 조회, 기존 파일은 새 경로
+        """
+        # Given
+        ids = [_new_id() for _ in range(3)]
+        await registry.save_file({"file_id": ids[0], "file_path": "/old.jpg"})
+
+        # When
+        await registry.save_files([
+            {"file_id": file_id, "file_path": f"/{i}.jpg"} for i, file_id in enumerate(ids)
+        ])
+
+        # Then
+        files = await registry.get_files(ids)
+        assert {fid: info["file_path"] for fid, info in files.items()} == {
+            ids[0]: "/0.jpg", ids[1]: "/1.jpg", ids[2]: "/2.jpg",
+        }
+        for file_id in ids:
+            await registry.delete_file(file_id)
@@ -0,0 +1,184 @@
+import os
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.render_cache import RenderCache
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+def _write(path: str, size: int) -> str:
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+class TestRenderCache:
+    """RenderCache - 내용 주소 기반 렌더 결과 캐시"""
+
+    def test_should_change_key_when_any_param_changes(self) -> None:
+        """파라미터 하나만 달라도 다른 키
+
+        Given: 같은 원본 해시
+        When: aspect_ratio만 다르게 키 생성
+        Then: 키가 다름, 같은 파라미터는 같은 키 (dict 순서 무관)
+        """
+        # Given / When
+        a = RenderCache.make_key("video", ["h1"], {"aspect_ratio": "9:16", "output_seconds": 30})
+        b = RenderCache.make_key("video", ["h1"], {"output_seconds": 30, "aspect_ratio": "9:16"})
+        c = RenderCache.make_key("video", ["h1"], {"aspect_ratio": "1:1", "output_seconds": 30})
+
+        # Then
+        assert a == b
+        assert a != c
+
+    @pytest.mark.asyncio
+    async def test_should_count_hits_and_misses(self, tmp_path) -> None:
+        """저장 후 조회 시 히트, 미저장 키는 미스
+
+        Given: 완료된 출력 파일을 캐시에 등록
+        When: 같은 키 / 다른 키로 materialize
+        Then: 히트 1, 미스 1, 대상 경로에 결과 생성
+        """
+        # Given
+        cache = RenderCache(str(tmp_path / "cache"), max_bytes=10_000, max_age_seconds=3600)
+        output = _write(str(tmp_path / "out.mp4"), 100)
+        await cache.store("k1", output)
+
+        # When
+        hit = cache.materialize("k1", str(tmp_path / "copy.mp4"))
+        miss = cache.materialize("k2", str(tmp_path / "none.mp4"))
+
+        # Then
+        assert hit is True and miss is False
+        assert os.path.getsize(tmp_path / "copy.mp4") == 100
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_should_evict_oldest_over_size_and_expired(self, tmp_path) -> None:
+        """용량 초과 시 오래된 항목부터, 만료 항목은 무조건 삭제
+
+        Given: 최대 250바이트 캐시에 100바이트 항목 3개 (첫 항목이 가장 오래됨)
+        When: 마지막 항목 저장 시 정리
+        Then: 가장 오래된 항목만 삭제
+        """
+        # Given
+        cache = RenderCache(str(tmp_path / "cache"), max_bytes=250, max_age_seconds=3600)
+        for key in ("old", "mid"):
+            await cache.store(key, _write(str(tmp_path / f"{key}.mp4"), 100))
+        past = time.time() - 60
+        os.utime(os.path.join(cache.cache_dir, "old.mp4"), (past, past))
+
+        # When
+        await cache.store("new", _write(str(tmp_path / "new.mp4"), 100))
+
+        # Then
+        assert sorted(os.listdir(cache.cache_dir)) == ["mid.mp4", "new.mp4"]
+
+        # 만료: max_age 0이면 조회도 미스
+        cache.max_age_seconds = 0
+        os.utime(os.path.join(cache.cache_dir, "mid.mp4"), (past, past))
+        assert cache.materialize("mid", str(tmp_path / "x.mp4")) is False
+
+    @pytest.mark.asyncio
+    async def test_should_keep_sidecars_with_entry(self, tmp_path) -> None:
+        """부가 출력은 본 항목과 함께 저장·복원·삭제
+
+        Given: 포스터 부가 출력이 있는 출력 파일, 최대 150바이트 캐시
+        When: 저장 → 복원 → 다른 항목 저장으로 정리
+        Then: 복원 시 포스터도 생기고, 정리 시 포스터도 함께 삭제 (크기에 포함)
+        """
+        # Given
+        cache = RenderCache(
+            str(tmp_path / "cache"), max_bytes=150, max_age_seconds=3600,
+            sidecar_suffixes=(".poster.jpg",),
+        )
+        output = _write(str(tmp_path / "out.mp4"), 60)
+        _write(str(tmp_path / "out.poster.jpg"), 40)
+
+        # When
+        await cache.store("k1", output)
+        hit = cache.materialize("k1", str(tmp_path / "copy.mp4"))
+
+        # Then
+        assert hit is True
+        assert os.path.getsize(tmp_path / "copy.poster.jpg") == 40
+        assert cache.stats()["bytes"] == 100
+
+        # When: 60바이트 항목이 더 들어오면 160 > 150 → 가장 오래된 k1 삭제
+        past = time.time() - 60
+        os.utime(os.path.join(cache.cache_dir, "k1.mp4"), (past, past))
+        await cache.store("k2", _write(str(tmp_path / "other.mp4"), 60))
+
+        # Then
+        assert sorted(os.listdir(cache.cache_dir)) == ["k2.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_should_remove_linked_outputs_on_eviction(self, tmp_path) -> None:
+        """항목을 지우면 같은 파일을 가리키는 작업 출력도 지워 실제로 공간을 비운다
+
+        Given: 작업 출력 디렉토리의 출력(+포스터)을 캐시에 등록하고 다른 작업으로 복원
+        When: 만료로 항목 정리
+        Then: 캐시 항목, 원래 출력, 복원한 출력, 포스터 모두 삭제 / 관계없는 파일은 유지
+        """
+        # Given
+        outputs = tmp_path / "outputs"
+        outputs.mkdir()
+        cache = RenderCache(
+            str(tmp_path / "cache"), max_bytes=10_000, max_age_seconds=3600,
+            sidecar_suffixes=(".poster.jpg",), linked_dir=str(outputs),
+        )
+        output = _write(str(outputs / "a_timelapse.mp4"), 60)
+        _write(str(outputs / "a_timelapse.poster.jpg"), 10)
+        unrelated = _write(str(outputs / "source.mp4"), 30)
+        await cache.store("k1", output)
+        cache.materialize("k1", str(outputs / "b_timelapse.mp4"))
+
+        # When
+        cache.max_age_seconds = 0
+        past = time.time() - 60
+        os.utime(os.path.join(cache.cache_dir, "k1.mp4"), (past, past))
+        await cache.store("k2", _write(str(tmp_path / "other.mp4"), 10))
+
+        # Then
+        assert sorted(os.listdir(outputs)) == ["source.mp4"]
+        assert os.path.exists(unrelated)
+        assert "k1.mp4" not in os.listdir(cache.cache_dir)
+
+
+class TestPhotoCacheKey:
+    """TimelapseService - 사진 렌더 캐시 키"""
+
+    @pytest.mark.asyncio
+    async def test_should_change_key_with_input_mode_and_overlay_renderer(
+        self, monkeypatch,
+    ) -> None:
+        """출력을 바꾸는 설정(입력 방식, 오버레이 미리 그리기)이 바뀌면 다른 키
+
+        Given: 같은 사진, 같은 요청
+        When: 기본 설정 / photo_input_mode=concat / overlay_prerender=False로 각각 요청
+        Then: 세 작업의 캐시 키가 모두 다름
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        service.render_queue.submit = lambda job: None
+        await service.registry.save_file({
+            "file_id": "p1", "file_path": "/p1.jpg", "content_hash": "h1",
+        })
+
+        async def key() -> str:
+            task_id = await service.create_task_from_photos(["p1"], 30, overlay_style="timer")
+            return (await service.get_task(task_id))["cache_key"]
+
+        # When
+        default = await key()
+        monkeypatch.setattr(settings, "photo_input_mode", "concat")
+        concat = await key()
+        monkeypatch.setattr(settings, "overlay_prerender", False)
+        drawtext = await key()
+
+        # Then
+        assert len({default, concat, drawtext}) == 3
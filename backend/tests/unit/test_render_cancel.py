@@ -0,0 +1,191 @@
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.services.render_queue import RenderJob, RenderQueue
+from app.services.timelapse_service import RenderNotOwnedError, TimelapseService
+from app.services.upload_service import UploadService
+
+
+async def _wait_status(service: TimelapseService, task_id: str, status: str) -> dict:
+    for _ in range(200):
+        task = await service.get_task(task_id)
+        if task["status"] == status:
+            return task
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{task_id} never became {status}")
+
+
+async def _save_task(service: TimelapseService, task_id: str, **fields) -> dict:
+    task = {
+        "task_id": task_id,
+        "status": "queued",
+        "progress": 0,
+        "output_path": os.path.join(settings.upload_dir, f"{task_id}.mp4"),
+        **fields,
+    }
+    await service.registry.save_task(task)
+    return task
+
+
+class TestRenderQueueCancel:
+    """RenderQueue.cancel - 대기 / 실행 중 작업 취소"""
+
+    @pytest.mark.asyncio
+    async def test_should_drop_pending_and_cancel_running(self) -> None:
+        """대기 중이면 대기열에서 빠지고, 실행 중이면 태스크가 취소된다
+
+        Given: 워커 1개, 실행 중 1개 + 대기 1개
+        When: 둘 다 취소
+        Then: 대기 작업은 None 반환 + 대기열에서 제거, 실행 작업은 취소된 태스크 반환
+        """
+        # Given
+        async def runner(job: RenderJob) -> None:
+            await asyncio.sleep(60)
+
+        queue = RenderQueue(runner, workers=1, max_pending=10)
+        queue.submit(RenderJob("running", "video", {}))
+        await asyncio.sleep(0)
+        queue.submit(RenderJob("waiting", "video", {}))
+
+        # When
+        dropped = queue.cancel("waiting")
+        running = queue.cancel("running")
+        await asyncio.wait({running})
+
+        # Then
+        assert dropped is None
+        assert queue.position("waiting") is None
+        assert running.cancelled()
+        assert queue.cancel("missing") is None
+
+
+class TestCancelTask:
+    """TimelapseService.cancel_task - FFmpeg 종료 + 부분 출력 정리"""
+
+    @pytest.mark.asyncio
+    async def test_should_kill_process_and_remove_partial_output(
+        self, tmp_path, monkeypatch,
+    ) -> None:
+        """실행 중인 렌더를 취소하면 자식 프로세스가 죽고 출력이 지워진다
+
+        Given: 부분 출력을 쓰고 오래 걸리는 프로세스를 기다리는 렌더
+        When: cancel_task
+        Then: 상태 cancelled, 프로세스 종료, 본 출력 / 부가 출력 / 조각 디렉토리 삭제
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        work = tmp_path / "render"
+        work.mkdir()
+        output_path = str(work / "t1_timelapse.mp4")
+        processes: list[asyncio.subprocess.Process] = []
+
+        async def fake_run_ffmpeg(task_id: str, output_path: str, **_) -> None:
+            os.makedirs(f"{output_path}.parts")
+            for path in (output_path, output_path.replace(".mp4", ".poster.jpg")):
+                with open(path, "wb") as f:
+                    f.write(b"partial")
+            real_exec = asyncio.create_subprocess_exec
+
+            async def spy(*cmd, **kwargs):
+                process = await real_exec(*cmd, **kwargs)
+                processes.append(process)
+                return process
+
+            monkeypatch.setattr(asyncio, "create_subprocess_exec", spy)
+            await service._exec_ffmpeg(task_id, ["sleep", "30"], 0)
+
+        monkeypatch.setattr(service, "_run_ffmpeg", fake_run_ffmpeg)
+        await _save_task(service, "t1", output_path=output_path)
+        service.render_queue.submit(RenderJob("t1", "video", {"output_path": output_path}))
+        await _wait_status(service, "t1", "processing")
+        while not processes:
+            await asyncio.sleep(0.01)
+
+        # When
+        task = await service.cancel_task("t1")
+
+        # Then
+        assert task["status"] == "cancelled"
+        assert processes[0].returncode is not None
+        assert os.listdir(work) == []
+        assert not service.render_queue.is_running("t1")
+
+    @pytest.mark.asyncio
+    async def test_should_leave_finished_task_alone(self) -> None:
+        """이미 끝난 작업은 바꾸지 않는다
+
+        Given: completed 작업
+        When: cancel_task / 없는 작업 cancel_task
+        Then: 그대로 completed / None
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        await _save_task(service, "done", status="completed")
+
+        # When / Then
+        assert (await service.cancel_task("done"))["status"] == "completed"
+        assert await service.cancel_task("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_should_refuse_render_owned_by_another_process(self, tmp_path) -> None:
+        """다른 워커가 맡은 렌더는 취소하지 않고 출력도 남긴다
+
+        Given: processing 상태지만 이 프로세스의 대기열 / 마무리에 없는 작업, 쓰는 중인 출력
+        When: cancel_task
+        Then: RenderNotOwnedError, 상태 processing 유지, 출력 유지
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        output_path = tmp_path / "other_timelapse.mp4"
+        output_path.write_bytes(b"partial")
+        await _save_task(service, "other", status="processing", output_path=str(output_path))
+
+        # When / Then
+        with pytest.raises(RenderNotOwnedError):
+            await service.cancel_task("other")
+        assert (await service.get_task("other"))["status"] == "processing"
+        assert output_path.exists()
+
+
+
+class TestSupersede:
+    """TimelapseService._supersede - 같은 세션의 새 렌더가 이전 렌더를 취소"""
+
+    @pytest.mark.asyncio
+    async def test_should_cancel_previous_render_of_same_session(self) -> None:
+        """같은 sessionId의 새 작업이 들어오면 이전 대기 작업은 cancelled
+
+        Given: 워커 하나가 다른 작업을 실행 중, 세션 s1의 대기 작업 a, 세션 s2의 대기 작업 b
+        When: 세션 s1의 새 작업 c
+        Then: a는 cancelled + 대기열에서 제거, b와 c는 대기
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        service.render_queue.workers = 1
+
+        async def blocked(task_id: str, **_) -> None:
+            await asyncio.sleep(60)
+
+        service._run_ffmpeg = blocked
+        await _save_task(service, "busy")
+        service.render_queue.submit(RenderJob("busy", "video", {}))
+        await _wait_status(service, "busy", "processing")
+        for task_id, session_id in (("a", "s1"), ("b", "s2")):
+            await _save_task(service, task_id, session_id=session_id)
+            service.render_queue.submit(RenderJob(task_id, "video", {}))
+            await service._supersede(session_id, task_id)
+
+        # When
+        await _save_task(service, "c", session_id="s1")
+        service.render_queue.submit(RenderJob("c", "video", {}))
+        await service._supersede("s1", "c")
+
+        # Then
+        assert (await service.get_task("a"))["status"] == "cancelled"
+        assert service.render_queue.position("a") is None
+        assert (await service.get_task("b"))["status"] == "queued"
+        assert service.render_queue.position("c") is not None
+        await service.cancel_task("busy")
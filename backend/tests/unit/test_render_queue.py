@@ -0,0 +1,259 @@
+import asyncio
+
+import pytest
+
+from app.services.render_queue import (
+    FREE_LANE,
+    PRIORITY_LANE,
+    QueueFullError,
+    RenderJob,
+    RenderQueue,
+    render_lane,
+)
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+class TestRenderQueue:
+    """RenderQueue - 동시 실행 수 제한 워커 풀"""
+
+    @pytest.mark.asyncio
+    async def test_should_run_jobs_in_fifo_order_within_worker_limit(self) -> None:
+        """워커 수만큼만 동시에 실행하고 도착 순서대로 처리
+
+        Given: 워커 2개짜리 대기열에 작업 4개 투입
+        When: 모든 작업 완료까지 대기
+        Then: 동시 실행은 최대 2개, 시작 순서는 투입 순서
+        """
+        # Given
+        started: list[str] = []
+        active = 0
+        peak = 0
+        done = asyncio.Event()
+
+        async def runner(job: RenderJob) -> None:
+            nonlocal active, peak
+            started.append(job.task_id)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if len(started) == 4 and active == 0:
+                done.set()
+
+        queue = RenderQueue(runner, workers=2, max_pending=10)
+
+        # When
+        for i in range(4):
+            queue.submit(RenderJob(f"t{i}", "video", {}))
+        await asyncio.wait_for(done.wait(), timeout=1)
+
+        # Then
+        assert started == ["t0", "t1", "t2", "t3"]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_should_report_queue_position_and_reject_when_full(self) -> None:
+        """대기 순번 보고 및 포화 시 거절
+
+        Given: 워커 1개, 대기열 최대 2
+        When: 실행 중 1개 + 대기 2개 투입 후 1개 더 투입
+        Then: 대기 순번 1, 2 / 추가 투입은 QueueFullError
+        """
+        # Given
+        release = asyncio.Event()
+
+        async def runner(job: RenderJob) -> None:
+            await release.wait()
+
+        queue = RenderQueue(runner, workers=1, max_pending=2)
+        queue.submit(RenderJob("running", "video", {}))
+        await asyncio.sleep(0)
+
+        # When
+        queue.submit(RenderJob("a", "video", {}))
+        queue.submit(RenderJob("b", "video", {}))
+
+        # Then
+        assert queue.is_running("running")
+        assert queue.position("a") == 1
+        assert queue.position("b") == 2
+        with pytest.raises(QueueFullError):
+            queue.submit(RenderJob("c", "video", {}))
+        release.set()
+
+
+class TestScheduling:
+    """RenderQueue - priority 레인 + 짧은 작업 우선 + 기아 방지"""
+
+    @pytest.mark.asyncio
+    async def test_should_start_priority_lane_then_cheapest_first(self) -> None:
+        """priority 레인 먼저, 같은 레인에서는 예상 비용이 작은 작업부터
+
+        Given: 워커 1개가 작업 하나를 실행 중
+        When: free 큰 작업 / free 작은 작업 / priority 큰 작업 / priority 작은 작업 투입
+        Then: 대기 순번과 시작 순서가 priority 작은 → priority 큰 → free 작은 → free 큰
+        """
+        # Given
+        release = asyncio.Event()
+        started: list[str] = []
+
+        async def runner(job: RenderJob) -> None:
+            started.append(job.task_id)
+            await release.wait()
+
+        queue = RenderQueue(runner, workers=1, max_pending=10)
+        queue.submit(RenderJob("running", "video", {}))
+        await asyncio.sleep(0)
+
+        # When
+        queue.submit(RenderJob("free-big", "video", {}, cost=5000))
+        queue.submit(RenderJob("free-small", "photos", {}, cost=20))
+        queue.submit(RenderJob("paid-big", "video", {}, cost=5000, lane=PRIORITY_LANE))
+        queue.submit(RenderJob("paid-small", "photos", {}, cost=20, lane=PRIORITY_LANE))
+
+        # Then
+        order = ["paid-small", "paid-big", "free-small", "free-big"]
+        assert [queue.position(task_id) for task_id in order] == [1, 2, 3, 4]
+        assert queue.pending_by_lane() == {PRIORITY_LANE: 2, FREE_LANE: 2}
+        release.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert started == ["running", *order]
+
+    def test_should_run_long_waiting_job_first(self) -> None:
+        """max_wait_seconds를 넘긴 작업은 레인 / 비용과 무관하게 먼저 (도착 순)
+
+        Given: 최대 대기 60초, 61초 기다린 free 큰 작업, 방금 들어온 priority 작은 작업
+        When: 순번 조회
+        Then: free 큰 작업이 1번
+        """
+        # Given
+        queue = RenderQueue(lambda job: None, workers=1, max_pending=10, max_wait_seconds=60)
+        old = RenderJob("free-big", "video", {}, cost=5000)
+        old.enqueued_at -= 61
+        queue._pending.extend([
+            old, RenderJob("paid-small", "photos", {}, cost=1, lane=PRIORITY_LANE),
+        ])
+
+        # When / Then
+        assert queue.position("free-big") == 1
+        assert queue.position("paid-small") == 2
+
+
+class TestRenderLane:
+    """render_lane - 구독 상태 → 레인"""
+
+    def test_should_put_paid_and_trial_in_priority_lane(self) -> None:
+        assert render_lane("paid") == PRIORITY_LANE
+        assert render_lane("trial") == PRIORITY_LANE
+        assert render_lane("free") == FREE_LANE
+        assert render_lane(None) == FREE_LANE
+
+
+class TestVideoCost:
+    """TimelapseService._video_cost - 영상 렌더 예상 비용"""
+
+    def test_should_grow_with_frames_resolution_and_output_fps(self) -> None:
+        """긴 고해상도 녹화(case3, 높은 출력 fps)가 짧은 클립보다 훨씬 큼
+
+        Given: 30초 720p 클립, 4시간 1080p 녹화 (해상도 모름 → 1080p 가정)
+        When: 30초 출력 비용 추정
+        Then: 4시간 녹화가 수백 배 이상, 비율을 더하면 비용 증가
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        clip = {"total_frames": 900, "width": 1280, "height": 720}
+        recording = {"total_frames": 4 * 3600 * 30, "duration": 4 * 3600.0}
+
+        # When
+        small = service._video_cost(clip, 30, ["9:16"])
+        large = service._video_cost(recording, 30, ["9:16"])
+
+        # Then
+        assert large > small * 300
+        assert service._video_cost(clip, 30, ["9:16", "1:1"]) > small
+
+
+class TestEnqueue:
+    """TimelapseService 작업 투입 - 대기열 자리 확보와 실패 시 되돌리기"""
+
+    @pytest.mark.asyncio
+    async def test_should_not_leave_phantom_task_when_queue_fills_concurrently(
+        self, tmp_path,
+    ) -> None:
+        """동시에 들어온 같은 요청 중 자리를 못 잡은 쪽은 흔적 없이 거절, 재시도는 실제 작업에 합류
+
+        Given: 워커 1개가 다른 작업 실행 중, 대기열 최대 1
+        When: 같은 영상 요청 2개를 동시에 create_task → 거절된 쪽 재시도
+        Then: 하나만 대기열에, 다른 하나는 QueueFullError(레코드 없음) / 재시도는 대기 중인 작업
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        service.render_queue.workers = 1
+        service.render_queue.max_pending = 1
+        release = asyncio.Event()
+
+        async def blocked(task_id: str, **_) -> None:
+            await release.wait()
+
+        service._run_ffmpeg = blocked
+        busy = {"task_id": "busy", "status": "queued", "output_path": str(tmp_path / "b.mp4")}
+        await service.registry.save_task(busy)
+        await service._enqueue(busy, RenderJob("busy", "video", {}))
+        while not service.render_queue.is_running("busy"):
+            await asyncio.sleep(0.01)
+        source = tmp_path / "source.mp4"
+        source.write_bytes(b"mp4")
+        await service.upload_service.registry.save_file({
+            "file_id": "f1", "file_path": str(source), "content_hash": "h1",
+            "total_frames": 300, "duration": 10.0,
+        })
+
+        # When
+        results = await asyncio.gather(
+            *(service.create_task("f1", 30, 600) for _ in range(2)), return_exceptions=True,
+        )
+        retry = await service.create_task("f1", 30, 600)
+
+        # Then
+        accepted = [r for r in results if isinstance(r, str)]
+        assert len(accepted) == 1
+        assert sum(isinstance(r, QueueFullError) for r in results) == 1
+        assert retry == accepted[0]
+        assert service.render_queue.contains(retry)
+        assert list(service._inflight.values()) == [retry]
+        records = [t for t in service.registry.tasks.values() if t.get("file_id") == "f1"]
+        assert [t["task_id"] for t in records] == [retry]
+        release.set()
+        await service.cancel_task(retry)
+
+    @pytest.mark.asyncio
+    async def test_should_join_in_flight_render_of_same_owner_only(self, tmp_path) -> None:
+        """같은 요청이라도 다른 유저의 렌더에는 합류하지 않는다 (서로의 작업을 취소할 수 없도록)
+
+        Given: 유저 A의 렌더가 대기 중 (워커 0개)
+        When: 같은 영상 요청을 유저 A / 유저 B가 다시 보냄
+        Then: A는 기존 작업 ID, B는 새 작업
+        """
+        # Given
+        service = TimelapseService(UploadService())
+        service.render_queue.workers = 0
+        source = tmp_path / "source.mp4"
+        source.write_bytes(b"mp4")
+        await service.upload_service.registry.save_file({
+            "file_id": "f2", "file_path": str(source), "content_hash": "h2",
+            "total_frames": 300, "duration": 10.0,
+        })
+        first = await service.create_task("f2", 30, 600, owner_id="a")
+
+        # When
+        same_owner = await service.create_task("f2", 30, 600, owner_id="a")
+        other_owner = await service.create_task("f2", 30, 600, owner_id="b")
+
+        # Then
+        assert same_owner == first
+        assert other_owner != first
+        assert (await service.get_task(other_owner))["owner_id"] == "b"
+        for task_id in (first, other_owner):
+            await service.cancel_task(task_id)
@@ -0,0 +1,284 @@
+import asyncio
+import contextlib
+import json
+import os
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services.render_journal import RenderJournal
+from app.services.render_queue import QueueFullError, RenderJob
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+def _crash(journal: RenderJournal, task_id: str) -> None:
+    """프로세스가 죽은 것처럼 기록은 남기고 락만 놓는다."""
+    os.close(journal._fds.pop(task_id))
+
+
+def _interrupted_render(tmp_path, attempts: int = 0, started: bool = True) -> tuple[str, str]:
+    """다른(죽은) 프로세스가 렌더하다 끊긴 영상 작업 — 기록 + 원본 + 쓰다 만 출력.
+
+    started=False면 대기열에서 아직 꺼내지 않은 채 죽은 작업.
+    """
+    task_id = str(uuid.uuid4())
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"mp4")
+    output_path = os.path.join(settings.upload_dir, f"{task_id}_timelapse.mp4")
+    with open(output_path, "wb") as f:
+        f.write(b"half")
+    os.makedirs(f"{output_path}.parts")
+    task = {
+        "task_id": task_id, "status": "processing", "progress": 40,
+        "output_path": output_path, "cache_key": "key", "lane": "free",
+    }
+    dead = RenderJournal(os.path.join(settings.upload_dir, "render_journal"))
+    dead.record(task, RenderJob(task_id, "video", {
+        "input_path": str(source), "output_path": output_path,
+    }, cost=12.5), attempts, started=started)
+    _crash(dead, task_id)
+    return task_id, output_path
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """렌더가 끝나지 않는 TimelapseService (다시 넣은 작업이 대기열에 머문다)."""
+    service = TimelapseService(UploadService())
+
+    async def blocked(task_id: str, **_) -> None:
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(service, "_run_ffmpeg", blocked)
+    return service
+
+
+class TestRenderJournal:
+    """RenderJournal - 주인이 살아 있는 기록은 건드리지 않는다"""
+
+    def test_should_claim_only_entries_of_dead_owner(self, tmp_path) -> None:
+        """락을 잡은 프로세스가 있으면 건너뛰고, 죽으면 넘겨받는다
+
+        Given: 다른 기록기(워커)가 작업 2개를 기록, 그중 하나는 락을 놓음(죽음)
+        When: claim_orphans
+        Then: 락이 풀린 작업 하나만, RenderJob으로 복원 / 끝난 작업 release 후 기록 없음
+        """
+        # Given
+        owner = RenderJournal(str(tmp_path))
+        owner.record({"task_id": "alive"}, RenderJob("alive", "video", {}))
+        owner.record({"task_id": "dead"}, RenderJob("dead", "photos", {"a": 1}, cost=3.0))
+        _crash(owner, "dead")
+
+        # When
+        entries = RenderJournal(str(tmp_path)).claim_orphans()
+
+        # Then
+        assert [entry["job"].task_id for entry in entries] == ["dead"]
+        assert entries[0]["job"].params == {"a": 1}
+        assert entries[0]["job"].cost == 3.0
+        owner.release("alive")
+        assert RenderJournal(str(tmp_path)).task_ids() == {"dead"}
+
+
+class TestRecover:
+    """TimelapseService.recover - 재시작 후 중단된 렌더 복구"""
+
+    @pytest.mark.asyncio
+    async def test_should_requeue_interrupted_render(self, service, tmp_path) -> None:
+        """저장소에서 사라진 processing 작업을 기록으로 되살려 다시 대기열에
+
+        Given: 죽은 프로세스의 작업 기록 + 쓰다 만 출력 / 분할 조각, 빈 메모리 저장소
+        When: recover
+        Then: 작업 queued(recovered=1)로 조회 가능, 부분 출력 삭제, 대기열에 다시 들어감
+        """
+        # Given
+        task_id, output_path = _interrupted_render(tmp_path)
+
+        # When
+        stats = await service.recover()
+
+        # Then
+        assert stats["requeued"] == 1
+        task = await service.get_task(task_id)
+        assert task["recovered"] == 1
+        assert task["status"] in ("queued", "processing")
+        assert not os.path.exists(output_path)
+        assert not os.path.exists(f"{output_path}.parts")
+        assert service.render_queue.position(task_id) or service.render_queue.is_running(task_id)
+        assert await service.cancel_task(task_id)
+
+    @pytest.mark.asyncio
+    async def test_should_fail_after_repeated_interruptions(self, service, tmp_path) -> None:
+        """재시작마다 끊기는 작업은 실패 처리
+
+        Given: 이미 render_recovery_max_attempts번 끊긴 작업
+        When: recover
+        Then: failed, 기록 삭제
+        """
+        # Given
+        task_id, _ = _interrupted_render(tmp_path, attempts=settings.render_recovery_max_attempts)
+
+        # When
+        stats = await service.recover()
+
+        # Then
+        assert stats["failed"] == 1
+        task = await service.get_task(task_id)
+        assert task["status"] == "failed"
+        assert "interrupted by restart" in task["stderr_tail"]
+        assert service.journal.task_ids() == set()
+
+    @pytest.mark.asyncio
+    async def test_should_not_count_crash_while_still_queued(self, service, tmp_path) -> None:
+        """대기열에서 꺼내기 전에 죽은 작업은 끊긴 횟수에 세지 않는다
+
+        Given: 이미 render_recovery_max_attempts번 끊겼고, 이번에는 대기 중에 죽은 작업
+        When: recover
+        Then: 실패가 아니라 다시 대기열에 (recovered 그대로), 실행이 시작되면 기록에 started
+        """
+        # Given
+        max_attempts = settings.render_recovery_max_attempts
+        task_id, _ = _interrupted_render(tmp_path, attempts=max_attempts, started=False)
+
+        # When
+        stats = await service.recover()
+
+        # Then
+        assert stats["requeued"] == 1
+        assert (await service.get_task(task_id))["recovered"] == max_attempts
+        for _ in range(100):
+            # 주인이 제자리에서 다시 쓰는 중이면 비어 있을 수 있다
+            with open(service.journal._path(task_id)) as f, contextlib.suppress(ValueError):
+                if json.load(f)["started"]:
+                    break
+            await asyncio.sleep(0.01)
+        else:
+            raise AssertionError("journal entry never marked started")
+        await service.cancel_task(task_id)
+
+    @pytest.mark.asyncio
+    async def test_should_sweep_orphaned_artifacts(self, service) -> None:
+        """주인 없는 작업 파일 정리, 완료된 작업 출력은 보존
+
+        Given: 레코드 없는 작업의 출력 / 사진 입력 디렉토리, 완료된 작업의 출력
+        When: recover
+        Then: 레코드 없는 작업 파일만 삭제, 업로드 원본과 완료된 출력은 그대로
+        """
+        # Given
+        orphan, done = str(uuid.uuid4()), str(uuid.uuid4())
+        upload_dir = settings.upload_dir
+        orphan_output = os.path.join(upload_dir, f"{orphan}_timelapse.mp4")
+        orphan_frames = os.path.join(upload_dir, f"{orphan}_frames")
+        done_output = os.path.join(upload_dir, f"{done}_timelapse.mp4")
+        source = os.path.join(upload_dir, f"{uuid.uuid4()}.mp4")
+        for path in (orphan_output, done_output, source):
+            with open(path, "wb") as f:
+                f.write(b"mp4")
+        os.makedirs(orphan_frames)
+        await service.registry.save_task({
+            "task_id": done, "status": "completed", "output_path": done_output,
+        })
+
+        # When
+        stats = await service.recover()
+
+        # Then
+        assert stats["removed"] == 2
+        assert not os.path.exists(orphan_output)
+        assert not os.path.exists(orphan_frames)
+        assert os.path.exists(done_output)
+        assert os.path.exists(source)
+
+
+class TestDrain:
+    """TimelapseService.drain - 종료 시 실행 중인 렌더 마무리 / 다음 프로세스로 넘기기"""
+
+    @pytest.mark.asyncio
+    async def test_should_stop_accepting_and_keep_pending_jobs(self, service) -> None:
+        """종료 준비 후에는 새 작업을 거절하고 대기 작업을 꺼내지 않는다
+
+        Given: 대기 중인 작업 하나 (워커 0개로 실행 안 함)
+        When: 실행 중인 작업 없이 drain
+        Then: 새 작업 QueueFullError, 대기 작업은 기록째 남음
+        """
+        # Given
+        service.render_queue.workers = 0
+        task = {"task_id": "waiting", "status": "queued", "output_path": "/nonexistent.mp4"}
+        await service.registry.save_task(task)
+        await service._enqueue(task, RenderJob("waiting", "video", {}))
+
+        # When
+        stats = await service.drain(grace_seconds=1)
+
+        # Then
+        assert stats == {"finished": 0, "checkpointed": 0, "handed_over": 1}
+        with pytest.raises(QueueFullError):
+            service.render_queue.submit(RenderJob("new", "video", {}))
+        assert service.journal.task_ids() == {"waiting"}
+
+    @pytest.mark.asyncio
+    async def test_should_hand_over_pending_job_on_every_deploy(self, tmp_path) -> None:
+        """대기 중에 넘긴 작업은 배포를 몇 번 거쳐도 실패하지 않는다
+
+        Given: 대기 중인 작업 하나 (워커 0개로 실행 안 함)
+        When: drain → 프로세스 종료 → 새 프로세스 recover를 render_recovery_max_attempts + 2번
+        Then: 매번 checkpointed로 넘겨지고 다시 대기열에, recovered는 0 그대로
+        """
+        # Given
+        task_id = str(uuid.uuid4())
+        source = tmp_path / "source.mp4"
+        source.write_bytes(b"mp4")
+        output_path = os.path.join(settings.upload_dir, f"{task_id}_timelapse.mp4")
+        task = {"task_id": task_id, "status": "queued", "output_path": output_path}
+        process = TimelapseService(UploadService())
+        process.render_queue.workers = 0
+        await process.registry.save_task(task)
+        await process._enqueue(task, RenderJob(task_id, "video", {
+            "input_path": str(source), "output_path": output_path,
+        }))
+
+        # When / Then
+        for _ in range(settings.render_recovery_max_attempts + 2):
+            stats = await process.drain(grace_seconds=0)
+            with open(process.journal._path(task_id)) as f:
+                assert json.load(f)["checkpointed"]
+            for fd in process.journal._fds.values():
+                os.close(fd)
+            process = TimelapseService(UploadService())
+            process.render_queue.workers = 0
+            recovered = await process.recover()
+            assert stats["handed_over"] == 1
+            assert recovered["requeued"] == 1
+        assert (await process.get_task(task_id))["recovered"] == 0
+        await process.cancel_task(task_id)
+
+    @pytest.mark.asyncio
+    async def test_should_checkpoint_render_past_grace_period(self, service, tmp_path) -> None:
+        """유예 시간 안에 안 끝난 렌더는 멈추고 다음 프로세스가 다시 대기열에 넣는다
+
+        Given: 끝나지 않는 렌더가 실행 중
+        When: 유예 0.05초로 drain → 프로세스 종료(락 해제) → 새 프로세스가 recover
+        Then: 체크포인트 1건, 새 프로세스에서 queued로 복구 (끊긴 횟수에 세지 않음)
+        """
+        # Given
+        task_id, output_path = _interrupted_render(tmp_path)
+        await service.recover()
+        for _ in range(100):
+            if service.render_queue.is_running(task_id):
+                break
+            await asyncio.sleep(0.01)
+
+        # When
+        stats = await service.drain(grace_seconds=0.05)
+        for fd in service.journal._fds.values():
+            os.close(fd)
+        next_process = TimelapseService(UploadService())
+        next_process._run_ffmpeg = service._run_ffmpeg
+        recovered = await next_process.recover()
+
+        # Then
+        assert stats["checkpointed"] == 1
+        assert recovered["requeued"] == 1
+        assert (await next_process.get_task(task_id))["recovered"] == 1
+        await next_process.cancel_task(task_id)
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+from app.services.resource_governor import ResourceGovernor, filter_thread_args
+
+
+class TestAllocate:
+    """ResourceGovernor.allocate - 코어 예산을 동시 작업 수로 나눔"""
+
+    def test_should_split_budget_among_running_jobs(self) -> None:
+        """함께 도는 작업이 늘수록 몫이 줄고, 끝나면 반납
+
+        Given: 코어 예산 8
+        When: 작업 a, b, c를 차례로 시작 / 모두 끝남
+        Then: 8 / 4 / 2스레드, 끝난 뒤 배분 없음 (배분 없는 작업은 예산 전체)
+        """
+        # Given
+        governor = ResourceGovernor(8)
+
+        # When / Then
+        with governor.allocate("a", "render") as a:
+            with governor.allocate("b", "render") as b:
+                with governor.allocate("c", "segment") as c:
+                    assert (a.threads, b.threads, c.threads) == (8, 4, 2)
+                    assert governor.stats()["allocated_threads"] == 14
+        assert governor.stats()["jobs"] == []
+        assert governor.threads("a") == 8
+
+    def test_should_reserve_share_for_expected_jobs(self) -> None:
+        """곧 함께 돌 작업 수(demand)만큼 미리 나눔, 최소 1스레드
+
+        Given: 코어 예산 8
+        When: demand 4로 시작 / 예산보다 많은 demand
+        Then: 2스레드 / 1스레드
+        """
+        # Given
+        governor = ResourceGovernor(8)
+
+        # When / Then
+        with governor.allocate("a", "render", demand=4) as a:
+            assert a.threads == 2
+        with governor.allocate("b", "render", demand=16) as b:
+            assert b.threads == 1
+
+
+class TestPreexec:
+    """ResourceGovernor.preexec - 백그라운드 작업의 우선순위 낮추기"""
+
+    def test_should_lower_priority_of_background_process(self) -> None:
+        """nice가 있는 작업의 자식 프로세스만 우선순위가 낮아짐
+
+        Given: nice 0 작업, nice 5 작업
+        When: 각 preexec로 자식 프로세스 실행
+        Then: 앞은 preexec 없음, 뒤는 자식의 nice가 부모 + 5
+        """
+        # Given
+        governor = ResourceGovernor(2)
+        base = os.nice(0)
+
+        # When
+        with governor.allocate("fg", "render"), governor.allocate("bg", "segment", nice=5):
+            assert governor.preexec("fg") is None
+            result = subprocess.run(
+                [sys.executable, "-c", "import os; print(os.nice(0))"],
+                capture_output=True, text=True, preexec_fn=governor.preexec("bg"),
+            )
+
+        # Then
+        assert int(result.stdout) == min(19, base + 5)
+
+
+class TestFilterThreadArgs:
+    """filter_thread_args - 필터 그래프 스레드 수 (전역 옵션)"""
+
+    def test_should_cover_simple_and_complex_graphs(self) -> None:
+        assert filter_thread_args(3) == ["-filter_threads", "3", "-filter_complex_threads", "3"]
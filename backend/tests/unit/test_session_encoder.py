@@ -0,0 +1,377 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services.session_encoder import (
+    FrameOffsetMismatchError,
+    SessionClosedError,
+    SessionEncoder,
+    render_overlay,
+)
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+@pytest.fixture
+async def encoder(tmp_path, monkeypatch):
+    """ffmpeg 대신 출력 파일만 만드는 가짜 실행기를 쓰는 SessionEncoder + 사진 10장."""
+    monkeypatch.setattr(settings, "session_segment_frames", 4)
+    upload_service = UploadService()
+    encoder = SessionEncoder(TimelapseService(upload_service))
+    commands: list[list[str]] = []
+    preexecs: list = []
+
+    async def fake_run(cmd: list[str], preexec_fn=None) -> tuple[int, str]:
+        commands.append(cmd)
+        preexecs.append(preexec_fn)
+        with open(cmd[-1], "wb") as f:
+            f.write(b"mp4")
+        return 0, ""
+
+    monkeypatch.setattr(encoder, "_run", fake_run)
+    encoder.commands = commands
+    encoder.preexecs = preexecs
+
+    file_ids = []
+    for i in range(10):
+        fid = str(uuid.uuid4())
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(b"\xff\xd8\xff")
+        await upload_service.registry.save_file(
+            upload_service._photo_record(fid, str(path), path.name, f"hash{i}")
+        )
+        file_ids.append(fid)
+    encoder.file_ids = file_ids
+    return encoder
+
+
+class TestAppendFrames:
+    """SessionEncoder.append_frames - 녹화 중 세그먼트 미리 인코딩"""
+
+    @pytest.mark.asyncio
+    async def test_should_encode_full_segments_in_background(self, encoder) -> None:
+        """세그먼트 분량이 찰 때마다 인코딩
+
+        Given: session_segment_frames = 4
+        When: 사진 3장, 6장을 차례로 추가
+        Then: 9장 중 8장이 세그먼트 2개로 인코딩, 1장은 대기 — 낮춘 우선순위로 실행
+        """
+        # Given
+        session_id = str(uuid.uuid4())
+
+        # When
+        await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[:3])
+        await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[3:9])
+        await asyncio.gather(*encoder._tasks.values())
+
+        # Then
+        status = await encoder.status(session_id)
+        assert status == {"frames": 9, "segments": 2, "segments_done": 2, "incremental": True}
+        assert len(encoder.commands) == 2
+        assert all(preexec is not None for preexec in encoder.preexecs)
+
+    @pytest.mark.asyncio
+    async def test_should_reject_stale_offset(self, encoder) -> None:
+        """재전송 중복 방지
+
+        Given: 3장이 기록된 세션
+        When: offset 0으로 다시 전송
+        Then: FrameOffsetMismatchError (expected 3)
+        """
+        session_id = str(uuid.uuid4())
+        await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[:3], offset=0)
+
+        with pytest.raises(FrameOffsetMismatchError) as exc:
+            await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[:3], offset=0)
+        assert exc.value.expected == 3
+
+
+class TestFinalize:
+    """SessionEncoder.finalize - 꼬리 세그먼트 + 이어 붙이기"""
+
+    @pytest.mark.asyncio
+    async def test_should_join_segments_without_reencoding(self, encoder) -> None:
+        """종료 시 남은 프레임만 인코딩하고 -c copy로 이어 붙임
+
+        Given: 10장 (세그먼트 4+4, 남은 2장)
+        When: finalize
+        Then: 종료 후 추가 프레임 거부, 꼬리 세그먼트 1개 인코딩 후 concat copy, 작업 completed
+        """
+        # Given
+        session_id = str(uuid.uuid4())
+        await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids)
+        await asyncio.gather(*encoder._tasks.values())
+
+        # When
+        task_id = await encoder.finalize(session_id, output_seconds=30)
+        with pytest.raises(SessionClosedError):
+            await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[:1])
+        await asyncio.gather(*encoder._finishers)
+
+        # Then
+        task = await encoder.timelapse_service.get_task(task_id)
+        assert task["status"] == "completed"
+        assert len(encoder.commands) == 4  # 세그먼트 3개 + join
+        join = encoder.commands[-1]
+        assert join[join.index("-c") + 1] == "copy"
+
+    @pytest.mark.asyncio
+    async def test_should_wait_for_segments_encoding_on_another_worker(
+        self, encoder, monkeypatch,
+    ) -> None:
+        """다른 워커가 인코딩 중인 세그먼트는 끝날 때까지 기다렸다가 이어 붙임 (재인코딩 없음)
+
+        Given: 다른 워커(같은 세션 디렉토리)가 세그먼트 1, 2를 인코딩 중, 남은 2장
+        When: 이 워커에서 finalize
+        Then: 꼬리만 인코딩하고 대기 → 다른 워커가 끝내면 join, 작업 completed
+        """
+        from app.services import session_encoder as module
+
+        # Given
+        monkeypatch.setattr(module, "SEGMENT_POLL_SECONDS", 0.01)
+        monkeypatch.setattr(settings, "session_segment_workers", 2)
+        other = SessionEncoder(encoder.timelapse_service)
+        release = asyncio.Event()
+
+        async def slow_run(cmd: list[str], preexec_fn=None) -> tuple[int, str]:
+            await release.wait()
+            with open(cmd[-1], "wb") as f:
+                f.write(b"mp4")
+            return 0, ""
+
+        monkeypatch.setattr(other, "_run", slow_run)
+        session_id = str(uuid.uuid4())
+        await other.append_frames(session_id, "9:16", "none", encoder.file_ids)
+        while not all(seg.get("claim") for seg in encoder._load(session_id)["segments"]):
+            await asyncio.sleep(0.01)
+
+        # When
+        task_id = await encoder.finalize(session_id, output_seconds=30)
+        await asyncio.sleep(0.1)
+        joined_early = any("concat" in cmd for cmd in encoder.commands)
+        release.set()
+        await asyncio.gather(*other._tasks.values())
+        await asyncio.gather(*encoder._finishers)
+
+        # Then
+        assert not joined_early
+        assert len(encoder.commands) == 2  # 꼬리 세그먼트 + join
+        task = await encoder.timelapse_service.get_task(task_id)
+        assert task["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_should_take_over_segments_after_lease_expires(
+        self, encoder, monkeypatch,
+    ) -> None:
+        """lease가 지난 세그먼트(맡은 워커가 죽음)는 이 워커가 이어받아 인코딩
+
+        Given: 다른 워커가 세그먼트 1, 2를 맡은 채 멈춤, lease 0초
+        When: finalize
+        Then: 세 세그먼트 모두 이 워커가 인코딩 후 join, 작업 completed
+        """
+        # Given
+        monkeypatch.setattr(settings, "session_segment_lease_seconds", 0)
+        monkeypatch.setattr(settings, "session_segment_workers", 2)
+        other = SessionEncoder(encoder.timelapse_service)
+        stuck = asyncio.Event()
+
+        async def hung_run(cmd: list[str], preexec_fn=None) -> tuple[int, str]:
+            await stuck.wait()
+            return 1, ""
+
+        monkeypatch.setattr(other, "_run", hung_run)
+        session_id = str(uuid.uuid4())
+        await other.append_frames(session_id, "9:16", "none", encoder.file_ids)
+        while not all(seg.get("claim") for seg in encoder._load(session_id)["segments"]):
+            await asyncio.sleep(0.01)
+
+        # When
+        task_id = await encoder.finalize(session_id, output_seconds=30)
+        await asyncio.gather(*encoder._finishers)
+
+        # Then
+        assert len(encoder.commands) == 4  # 세그먼트 3개 + join
+        task = await encoder.timelapse_service.get_task(task_id)
+        assert task["status"] == "completed"
+        for t in other._tasks.values():
+            t.cancel()
+        await asyncio.gather(*other._tasks.values(), return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_should_fall_back_to_full_render_for_final_only_overlay(
+        self, encoder, monkeypatch,
+    ) -> None:
+        """종료 시점 값이 필요한 오버레이(timer)는 미리 인코딩하지 않고 전체 렌더
+
+        Given: overlay_style = timer, 사진 5장
+        When: finalize
+        Then: 세그먼트 인코딩 없음, create_task_from_photos로 전체 fileId 전달
+        """
+        # Given
+        session_id = str(uuid.uuid4())
+        await encoder.append_frames(session_id, "9:16", "timer", encoder.file_ids[:5])
+        captured = {}
+
+        async def fake_create(file_ids, output_seconds, aspect_ratio, **kwargs):
+            captured.update(file_ids=file_ids, kwargs=kwargs)
+            return "task-full"
+
+        monkeypatch.setattr(encoder.timelapse_service, "create_task_from_photos", fake_create)
+
+        # When
+        task_id = await encoder.finalize(session_id, output_seconds=30, recording_seconds=600)
+
+        # Then
+        assert task_id == "task-full"
+        assert captured["file_ids"] == encoder.file_ids[:5]
+        assert captured["kwargs"]["recording_seconds"] == 600
+        assert encoder.commands == []
+
+    @pytest.mark.asyncio
+    async def test_should_map_session_theme_to_render_overlay(
+        self, encoder, monkeypatch,
+    ) -> None:
+        """기본 세션 테마(stopwatch)는 녹화 경과 시간을 세는 타이머로 전체 렌더
+
+        Given: FocusSession 기본값 overlay_style = stopwatch, 사진 5장, 600초 녹화
+        When: 30초 영상으로 finalize
+        Then: 미리 인코딩하지 않음, timer / countup으로 넘기고 타이머는 0→600초로 증가
+        """
+        # Given
+        session_id = str(uuid.uuid4())
+        result = await encoder.append_frames(
+            session_id, "9:16", "stopwatch", encoder.file_ids[:5],
+        )
+        captured = {}
+
+        async def fake_create(file_ids, output_seconds, aspect_ratio, **kwargs):
+            captured.update(kwargs, output_seconds=output_seconds, aspect_ratio=aspect_ratio)
+            return "task-full"
+
+        monkeypatch.setattr(encoder.timelapse_service, "create_task_from_photos", fake_create)
+
+        # When
+        await encoder.finalize(session_id, output_seconds=30, recording_seconds=600)
+
+        # Then
+        assert result["incremental"] is False
+        assert (captured["overlay_style"], captured["timer_mode"]) == ("timer", "countup")
+        filters = encoder.timelapse_service._build_overlay_filters(
+            captured["overlay_style"], "", 0, 0, captured["recording_seconds"],
+            captured["timer_mode"], captured["output_seconds"], captured["aspect_ratio"],
+        )
+        assert "%{eif\\:min(600\\,t*20.0000)\\:d}" in filters[-1]
+        assert encoder.commands == []
+
+    @pytest.mark.asyncio
+    async def test_should_reopen_session_when_render_is_rejected(
+        self, encoder, monkeypatch,
+    ) -> None:
+        """대기열이 가득 차 렌더를 만들지 못하면 세션을 되돌려 다시 종료할 수 있다
+
+        Given: overlay_style = timer, 사진 5장, 첫 작업 생성이 QueueFullError
+        When: finalize → 실패 후 다시 finalize
+        Then: 첫 시도는 QueueFullError, 재시도는 같은 프레임으로 작업 생성
+        """
+        from app.services.render_queue import QueueFullError
+
+        # Given
+        session_id = str(uuid.uuid4())
+        await encoder.append_frames(session_id, "9:16", "timer", encoder.file_ids[:5])
+        calls: list[list[str]] = []
+
+        async def fake_create(file_ids, output_seconds, aspect_ratio, **kwargs):
+            calls.append(file_ids)
+            if len(calls) == 1:
+                raise QueueFullError("Render queue is full")
+            return "task-retry"
+
+        monkeypatch.setattr(encoder.timelapse_service, "create_task_from_photos", fake_create)
+
+        # When
+        with pytest.raises(QueueFullError):
+            await encoder.finalize(session_id, output_seconds=30)
+        task_id = await encoder.finalize(session_id, output_seconds=30)
+
+        # Then
+        assert task_id == "task-retry"
+        assert calls == [encoder.file_ids[:5]] * 2
+
+    def test_should_leave_progress_bar_theme_unmapped(self) -> None:
+        """목표 시간이 없는 progress-bar 테마는 진행 바 렌더로 바꾸지 않는다
+
+        Given: progress-bar / minimal 테마
+        When: 렌더 오버레이로 변환
+        Then: progress-bar는 그대로(워터마크만, 미리 인코딩 가능), minimal은 none
+        """
+        assert render_overlay("progress-bar") == ("progress-bar", "countdown")
+        assert SessionEncoder.incremental("progress-bar")
+        assert render_overlay("minimal") == ("none", "countdown")
+
+    @pytest.mark.asyncio
+    async def test_should_stop_and_clean_up_when_cancelled(self, encoder, monkeypatch) -> None:
+        """마무리 중인 세션 렌더를 취소하면 세션 디렉토리와 출력이 지워진다
+
+        Given: 세그먼트가 끝난 10장 세션, 이어 붙이기가 끝나지 않는 상태
+        When: finalize 후 cancel_task
+        Then: 작업 cancelled, 세션 디렉토리 삭제, 마무리 태스크 종료
+        """
+        # Given
+        session_id = str(uuid.uuid4())
+        await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[:8])
+        await asyncio.gather(*encoder._tasks.values())
+        joining = asyncio.Event()
+
+        async def hanging_join(cmd: list[str], preexec_fn=None) -> tuple[int, str]:
+            joining.set()
+            await asyncio.sleep(60)
+            return 0, ""
+
+        monkeypatch.setattr(encoder, "_run", hanging_join)
+        task_id = await encoder.finalize(session_id, output_seconds=30)
+        await asyncio.wait_for(joining.wait(), timeout=1)
+
+        # When
+        task = await encoder.timelapse_service.cancel_task(task_id)
+
+        # Then
+        assert task["status"] == "cancelled"
+        assert not os.path.exists(encoder._dir(session_id))
+        assert not encoder._finishers
+
+    @pytest.mark.asyncio
+    async def test_should_cancel_running_segments_when_cancelled(
+        self, encoder, monkeypatch,
+    ) -> None:
+        """세그먼트 인코딩 중에 세션 렌더를 취소하면 세그먼트 인코딩도 멈춘다
+
+        Given: 세그먼트 인코딩이 끝나지 않는 8장 세션
+        When: finalize 후 cancel_task
+        Then: 세그먼트 태스크 모두 종료, 세션 디렉토리 삭제
+        """
+        # Given
+        encoding = asyncio.Event()
+
+        async def hanging_encode(cmd: list[str], preexec_fn=None) -> tuple[int, str]:
+            encoding.set()
+            await asyncio.sleep(60)
+            return 0, ""
+
+        monkeypatch.setattr(encoder, "_run", hanging_encode)
+        session_id = str(uuid.uuid4())
+        await encoder.append_frames(session_id, "9:16", "none", encoder.file_ids[:8])
+        segments = list(encoder._tasks.values())
+        await asyncio.wait_for(encoding.wait(), timeout=1)
+        task_id = await encoder.finalize(session_id, output_seconds=30)
+        await asyncio.sleep(0)
+
+        # When
+        await encoder.timelapse_service.cancel_task(task_id)
+
+        # Then
+        assert all(t.done() for t in segments)
+        assert not encoder._tasks
+        assert not os.path.exists(encoder._dir(session_id))
@@ -0,0 +1,134 @@
+from app.services.timelapse_service import (
+    branch_side_outputs,
+    plan_side_outputs,
+    side_output_args,
+    sprite_plan,
+    sprite_vtt,
+)
+
+
+class TestPlanSideOutputs:
+    """plan_side_outputs - 포스터/미리보기 프레임 선택"""
+
+    def test_should_pick_middle_poster_and_preview_step(self) -> None:
+        """전체 렌더 계획
+
+        Given: 출력 450프레임 (3초 × 10fps = 30장)
+        When: 계획 생성
+        Then: 포스터는 225번, 미리보기는 15프레임마다, 장수 제한 없음
+        """
+        # When
+        plan = plan_side_outputs(450)
+
+        # Then
+        assert plan == {"poster": 225, "preview": (15, 0, None)}
+
+    def test_should_split_plan_across_parts(self) -> None:
+        """분할 조각별 계획
+
+        Given: 출력 450프레임을 150프레임씩 3조각
+        When: 조각마다 계획 생성
+        Then: 포스터는 가운데 조각에만, 미리보기 장수 합계는 30
+        """
+        # When
+        plans = [
+            plan_side_outputs(450, 0, 150),
+            plan_side_outputs(450, 150, 150),
+            plan_side_outputs(450, 300, None),
+        ]
+
+        # Then
+        assert [plan.get("poster") for plan in plans] == [None, 75, None]
+        assert plans[0]["preview"] == (15, 0, 10)
+        assert plans[1]["preview"] == (15, 150, 10)
+        assert plans[2]["preview"] == (15, 300, None)
+
+    def test_should_return_empty_for_no_frames(self) -> None:
+        """프레임이 없으면 부가 출력 없음"""
+        assert plan_side_outputs(0) == {}
+
+
+class TestBranchSideOutputs:
+    """branch_side_outputs / side_output_args - 같은 그래프에서 분기"""
+
+    def test_should_split_main_into_side_branches(self) -> None:
+        """본 출력 체인 끝에서 split
+
+        Given: 포스터 + 미리보기 계획 (조각, 장수 10)
+        When: 그래프 조각과 출력 인자 생성
+        Then: split=3, 포스터는 1장 JPEG, 미리보기는 -frames:v 10으로 조각 구간에서 멈춤
+        """
+        # Given
+        plan = {"poster": 75, "preview": (15, 150, 10)}
+
+        # When
+        graph, labels = branch_side_outputs("[m0]", "[v0]", plan)
+        args = side_output_args(labels, {"poster": "p.jpg", "preview": "p.mp4"}, plan)
+
+        # Then
+        assert graph[0] == "[m0]split=3[v0][s_poster][s_preview]"
+        assert graph[1] == "[s_poster]select='eq(n,75)'[poster]"
+        assert graph[2].startswith("[s_preview]select='not(mod(n+150,15))'")
+        assert labels == {"poster": "[poster]", "preview": "[preview]"}
+        assert args[:4] == ["-map", "[poster]", "-frames:v", "1"]
+        assert args[args.index("[preview]") + 1:args.index("[preview]") + 3] == ["-frames:v", "10"]
+
+
+class TestSprite:
+    """sprite_plan / sprite_vtt - 스크러빙 스프라이트 격자와 WebVTT 색인"""
+
+    def test_should_cap_tiles_and_keep_aspect(self) -> None:
+        """타일 수 상한과 타일 크기
+
+        Given: 출력 450프레임, 720x1280
+        When: 스프라이트 계획
+        Then: 5프레임마다 90타일, 160x284 타일, 10열 9행
+        """
+        # When
+        sprite = sprite_plan(450, (720, 1280))
+
+        # Then
+        assert sprite == {
+            "step": 5, "tiles": 90, "size": (160, 284), "columns": 10, "rows": 9,
+        }
+
+    def test_should_tile_in_graph_only_for_whole_render(self) -> None:
+        """전체 렌더는 그래프에서 격자, 분할 조각은 타일 프레임만
+
+        Given: 출력 450프레임, 720x720
+        When: 전체 / 첫 조각 계획으로 그래프 생성
+        Then: 전체는 tile=10x9 + JPEG 1장, 조각은 tile 없이 -frames:v 30 MJPEG
+        """
+        # When
+        whole = plan_side_outputs(450, frame_size=(720, 720))
+        part = plan_side_outputs(450, 0, 150, (720, 720))
+        whole_graph, labels = branch_side_outputs("[m0]", "[v0]", whole)
+        part_graph, _ = branch_side_outputs("[m0]", "[v0]", part)
+        part_args = side_output_args(
+            {"sprite": "[sprite]"}, {"sprite": "s.mkv"}, part,
+        )
+
+        # Then
+        assert whole_graph[-1].endswith("scale=160:160,setsar=1,tile=10x9[sprite]")
+        assert "tile=" not in part_graph[-1]
+        assert labels["sprite"] == "[sprite]"
+        assert part_args[2:4] == ["-frames:v", "30"]
+        assert part_args[-3:] == ["-f", "matroska", "s.mkv"]
+
+    def test_should_index_tiles_by_time(self) -> None:
+        """타일별 시간 구간과 격자 좌표
+
+        Given: 출력 450프레임 30fps, 720x1280
+        When: WebVTT 생성
+        Then: 첫 타일 0~0.167초 (0,0), 11번째 타일은 둘째 줄 첫 칸, 마지막은 15초에서 끝
+        """
+        # When
+        vtt = sprite_vtt(450, 30, sprite_plan(450, (720, 1280)))
+
+        # Then
+        lines = vtt.splitlines()
+        assert lines[0] == "WEBVTT"
+        assert lines[2:4] == ["00:00:00.000 --> 00:00:00.167", "sprite#xywh=0,0,160,284"]
+        assert "sprite#xywh=0,284,160,284" in lines
+        assert lines[-2] == "00:00:14.833 --> 00:00:15.000"
+        assert vtt.count("-->") == 90
@@ -0,0 +1,79 @@
+import os
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings, settings
+from app.services.signed_url import sign, signed_media_url, verify
+
+
+class TestSign:
+    """sign - nginx secure_link 호환 서명"""
+
+    def test_should_match_nginx_secure_link_md5(self) -> None:
+        """nginx 문서의 openssl 계산과 같은 값
+
+        Given: `echo -n '2147483647/s/link127.0.0.1 secret' | openssl md5 -binary | base64url`
+        When: 같은 입력으로 서명
+        Then: 같은 문자열
+        """
+        assert sign("/s/link127.0.0.1", 2147483647, "secret") == "_e4Nc3iduzkWRm01TBBNYw"
+
+
+class TestSignedMediaUrl:
+    """signed_media_url - 출력 파일의 서명 URL"""
+
+    def test_should_build_verifiable_url_under_prefix(self, monkeypatch) -> None:
+        """upload_dir 기준 경로 + 검증 가능한 서명
+
+        Given: prefix /media, TTL 3600초
+        When: upload_dir/abc_timelapse.mp4의 URL 생성
+        Then: /media/abc_timelapse.mp4, 만료는 TTL 이후로 올림, 서명 검증 통과 / 변조 시 실패
+        """
+        # Given
+        monkeypatch.setattr(settings, "media_url_prefix", "/media")
+        monkeypatch.setattr(settings, "media_url_secret", "k")
+        monkeypatch.setattr(settings, "media_url_ttl_seconds", 3600)
+        path = os.path.join(settings.upload_dir, "abc_timelapse.mp4")
+
+        # When
+        url, expires = signed_media_url(path, now=1_000_000)
+
+        # Then
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        assert parts.path == "/media/abc_timelapse.mp4"
+        assert expires >= 1_000_000 + 3600 and expires % 300 == 0
+        assert int(query["expires"][0]) == expires
+        assert verify(parts.path, query["md5"][0], expires, "k", now=1_000_000)
+        assert not verify("/media/other.mp4", query["md5"][0], expires, "k", now=1_000_000)
+        assert not verify(parts.path, query["md5"][0], expires, "k", now=expires + 1)
+
+    def test_should_return_same_url_within_bucket(self, monkeypatch) -> None:
+        """폴링 간격 안에서는 같은 URL (캐시 적중)
+
+        Given: 같은 파일
+        When: 10초 간격으로 두 번 생성
+        Then: 같은 URL
+        """
+        # Given
+        path = os.path.join(settings.upload_dir, "abc_timelapse.mp4")
+
+        # When / Then
+        assert signed_media_url(path, now=1_000_001)[0] == signed_media_url(path, now=1_000_011)[0]
+
+
+class TestMediaUrlSecret:
+    """MEDIA_URL_SECRET - signed 모드의 필수 설정"""
+
+    def test_should_refuse_signed_delivery_without_secret(self) -> None:
+        """서명 키 없이 signed 모드면 설정 로드(앱 시작) 실패
+
+        Given: download_delivery=signed
+        When: media_url_secret 없이 / 있게 설정 생성
+        Then: 없으면 ValidationError, 있으면 그 키를 그대로 사용
+        """
+        with pytest.raises(ValidationError, match="MEDIA_URL_SECRET"):
+            Settings(download_delivery="signed", media_url_secret="")
+        assert Settings(download_delivery="signed", media_url_secret="k").media_url_secret == "k"
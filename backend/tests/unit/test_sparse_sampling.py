@@ -0,0 +1,55 @@
+import pytest
+
+from app.config import settings
+from app.services.media_probe import media_probe
+from app.services.timelapse_service import TimelapseService
+from app.services.upload_service import UploadService
+
+
+def _service(monkeypatch, keyframe_interval: float) -> TimelapseService:
+    service = TimelapseService(UploadService())
+
+    async def fake_probe(file_path: str) -> float:
+        return keyframe_interval
+
+    monkeypatch.setattr(media_probe, "keyframe_interval", fake_probe)
+    return service
+
+
+class TestChooseSampling:
+    """TimelapseService._choose_sampling - sparse 샘플링 자동 선택"""
+
+    @pytest.mark.asyncio
+    async def test_should_use_keyframes_when_gop_fits_sample_interval(self, monkeypatch) -> None:
+        """키프레임 간격이 샘플 간격 이하이면 keyframe 모드
+
+        Given: pick_every 40, 샘플 간격 1.33초, 키프레임 간격 1초
+        When: 샘플링 방식 결정
+        Then: keyframe
+        """
+        # Given
+        service = _service(monkeypatch, keyframe_interval=1.0)
+
+        # When
+        sampling = await service._choose_sampling("in.mp4", "case1", 40, 0.75)
+
+        # Then
+        assert sampling == "keyframe"
+
+    @pytest.mark.asyncio
+    async def test_should_decode_all_when_gop_too_long_or_dense(self, monkeypatch) -> None:
+        """키프레임이 너무 드물거나 pick_every가 작으면 전체 디코딩
+
+        Given: 키프레임 간격 2초 (샘플 간격 1.33초보다 김)
+        When: sparse / dense / case2 / off 각각 결정
+        Then: 모두 full
+        """
+        # Given
+        service = _service(monkeypatch, keyframe_interval=2.0)
+
+        # When / Then
+        assert await service._choose_sampling("in.mp4", "case1", 40, 0.75) == "full"
+        assert await service._choose_sampling("in.mp4", "case1", 4, 7.5) == "full"
+        assert await service._choose_sampling("in.mp4", "case2", 1, 30) == "full"
+        monkeypatch.setattr(settings, "sparse_sampling", "off")
+        assert await service._choose_sampling("in.mp4", "case3", 60, 0.5) == "full"
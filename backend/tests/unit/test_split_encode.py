@@ -0,0 +1,81 @@
+from app.config import settings
+from app.services.resource_governor import with_threads
+from app.services.timelapse_service import (
+    VIDEO_ENCODER_ARGS,
+    TimelapseService,
+    plan_split,
+)
+from app.services.upload_service import UploadService
+
+
+class TestPlanSplit:
+    """plan_split - 출력 프레임을 연속 구간으로 분할"""
+
+    def test_should_cover_all_frames_contiguously(self) -> None:
+        """구간이 빈틈/겹침 없이 이어짐
+
+        Given: 출력 900프레임, 4조각
+        When: 분할 계획
+        Then: 시작 0/225/450/675, 마지막 조각은 끝까지(None)
+        """
+        assert plan_split(900, 4) == [(0, 225), (225, 225), (450, 225), (675, None)]
+
+    def test_should_not_create_more_parts_than_frames(self) -> None:
+        """프레임보다 조각이 많으면 줄임
+
+        Given: 출력 3프레임, 8조각 요청
+        When: 분할 계획
+        Then: 3조각
+        """
+        assert plan_split(3, 8) == [(0, 1), (1, 1), (2, None)]
+
+
+class TestSplitCount:
+    """TimelapseService._split_count - 조각 수 결정"""
+
+    def test_should_use_cores_and_duration(self, monkeypatch) -> None:
+        """배분된 코어 수와 원본 길이 중 작은 쪽
+
+        Given: 32코어 예산, 조각당 최소 300초, 이 작업 하나
+        When: 1시간 / 10분 / 2분 원본
+        Then: 12 / 2 / 1
+        """
+        # Given
+        monkeypatch.setattr("os.cpu_count", lambda: 32)
+        monkeypatch.setattr(settings, "split_min_segment_seconds", 300)
+        service = TimelapseService(UploadService())
+
+        # When / Then
+        with service.governor.allocate("t", "render"):
+            cores = service.governor.threads("t")
+            assert service._split_count(3600, cores) == 12
+            assert service._split_count(600, cores) == 2
+            assert service._split_count(120, cores) == 1
+
+    def test_should_share_cores_with_queued_jobs(self, monkeypatch) -> None:
+        """함께 돌 작업이 많으면 배분된 코어만큼만 / off면 분할 안 함
+
+        Given: 32코어 예산, 함께 돌 작업 8개
+        When: 1시간 원본
+        Then: 4조각, split_encode=off면 1
+        """
+        # Given
+        monkeypatch.setattr("os.cpu_count", lambda: 32)
+        service = TimelapseService(UploadService())
+
+        # When / Then
+        with service.governor.allocate("t", "render", demand=8):
+            cores = service.governor.threads("t")
+            assert service._split_count(3600, cores) == 4
+            monkeypatch.setattr(settings, "split_encode", "off")
+            assert service._split_count(3600, cores) == 1
+
+
+class TestWithThreads:
+    """with_threads - 조각별 인코더 스레드 수"""
+
+    def test_should_replace_threads_value(self) -> None:
+        args = with_threads(VIDEO_ENCODER_ARGS, 4)
+
+        assert args[args.index("-threads") + 1] == "4"
+        assert VIDEO_ENCODER_ARGS[VIDEO_ENCODER_ARGS.index("-threads") + 1] == "0"